@@ -0,0 +1,99 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+#
+#    benchmark_parsing.py - Benchmark of the Felo file parser
+#
+#    Copyright © 2006 Torsten Bronger <bronger@physik.rwth-aachen.de>
+#
+#    This file is part of the Felo program.
+#
+#    Felo is free software; you can redistribute it and/or modify it under
+#    the terms of the MIT licence:
+#
+#    Permission is hereby granted, free of charge, to any person obtaining a
+#    copy of this software and associated documentation files (the "Software"),
+#    to deal in the Software without restriction, including without limitation
+#    the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#    and/or sell copies of the Software, and to permit persons to whom the
+#    Software is furnished to do so, subject to the following conditions:
+#
+#    The above copyright notice and this permission notice shall be included in
+#    all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+
+"""Benchmark for the bout parser.  It generates a large synthetic Felo file
+and measures how many lines per second are parsed, both with the fast path
+for bout lines in canonical form and with the general regular expression
+alone (which is how the parser worked before the fast path existed).
+
+Usage: benchmark_parsing.py [number of bouts]
+"""
+
+import sys, os, time, tempfile, codecs
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+import felo_rating
+from synthetic import write_synthetic_felo_file
+
+def time_parsing(filename):
+    """Parses the Felo file and returns the best wall-clock time of three
+    runs, and the number of lines.
+    """
+    best_time = None
+    for i in range(3):
+        felo_file = codecs.open(filename, encoding="utf-8")
+        start_time = time.time()
+        felo_rating.parse_felo_file(felo_file)
+        duration = time.time() - start_time
+        felo_file.close()
+        if best_time is None or duration < best_time:
+            best_time = duration
+    number_of_lines = len(codecs.open(filename, encoding="utf-8").readlines())
+    return best_time, number_of_lines
+
+def time_tokenizing(filename, with_fast_path):
+    """Tokenizes all bout lines of the Felo file and returns the wall-clock
+    time and the number of tokenized lines.
+    """
+    lines = [felo_rating.clean_up_line(line) for line in codecs.open(filename, encoding="utf-8")]
+    lines = [line for line in lines if " -- " in line]
+    simple_pattern = felo_rating.simple_bout_line_pattern
+    pattern = felo_rating.bout_line_pattern
+    start_time = time.time()
+    if with_fast_path:
+        for line in lines:
+            (simple_pattern.match(line) or pattern.match(line)).groups()
+    else:
+        for line in lines:
+            pattern.match(line).groups()
+    return time.time() - start_time, len(lines)
+
+if __name__ == '__main__':
+    number_of_bouts = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    filename = os.path.join(tempfile.gettempdir(), "felo-benchmark-parsing.felo")
+    write_synthetic_felo_file(filename, 500, number_of_bouts)
+    try:
+        duration_fast, lines = time_tokenizing(filename, True)
+        duration_regex, lines = time_tokenizing(filename, False)
+        print "Tokenizing %d bout lines:" % lines
+        print "    regular expression only: %10.0f lines/s" % (lines / duration_regex)
+        print "    with fast path:          %10.0f lines/s" % (lines / duration_fast)
+        duration_fast, lines = time_parsing(filename)
+        simple_pattern = felo_rating.simple_bout_line_pattern
+        felo_rating.simple_bout_line_pattern = felo_rating.bout_line_pattern
+        try:
+            duration_regex, lines = time_parsing(filename)
+        finally:
+            felo_rating.simple_bout_line_pattern = simple_pattern
+        print "Parsing the whole file with %d lines:" % lines
+        print "    regular expression only: %10.0f lines/s" % (lines / duration_regex)
+        print "    with fast path:          %10.0f lines/s" % (lines / duration_fast)
+    finally:
+        os.remove(filename)
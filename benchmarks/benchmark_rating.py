@@ -0,0 +1,78 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+#
+#    benchmark_rating.py - Benchmark of the Felo rating calculation
+#
+#    Copyright © 2006 Torsten Bronger <bronger@physik.rwth-aachen.de>
+#
+#    This file is part of the Felo program.
+#
+#    Felo is free software; you can redistribute it and/or modify it under
+#    the terms of the MIT licence:
+#
+#    Permission is hereby granted, free of charge, to any person obtaining a
+#    copy of this software and associated documentation files (the "Software"),
+#    to deal in the Software without restriction, including without limitation
+#    the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#    and/or sell copies of the Software, and to permit persons to whom the
+#    Software is furnished to do so, subject to the following conditions:
+#
+#    The above copyright notice and this permission notice shall be included in
+#    all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+
+"""Benchmark for the core loop of the rating calculation.  It generates a large
+synthetic Felo file with 500 fencers, parses it once, and measures how many
+bouts per second `felo_rating.calculate_felo_ratings` processes.  The parsing
+itself is not included in the timing.  If NumPy is installed, the vectorized
+rating is measured, too.
+
+Usage: benchmark_rating.py [number of bouts]
+"""
+
+import sys, os, time, tempfile, codecs
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+import felo_rating
+from synthetic import write_synthetic_felo_file
+
+def time_rating(filename, vectorized=False):
+    """Calculates the Felo ratings for the Felo file and returns the best
+    wall-clock time of three runs, and the number of bouts.  The file is parsed
+    anew for every run because the calculation changes the fencer objects.
+    """
+    best_time = None
+    for i in range(3):
+        felo_file = codecs.open(filename, encoding="utf-8")
+        parameters, __, fencers, bouts = felo_rating.parse_felo_file(felo_file)
+        felo_file.close()
+        start_time = time.time()
+        felo_rating.calculate_felo_ratings(parameters, fencers, bouts, vectorized=vectorized)
+        duration = time.time() - start_time
+        if best_time is None or duration < best_time:
+            best_time = duration
+    return best_time, len(bouts)
+
+if __name__ == '__main__':
+    number_of_bouts = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    filename = os.path.join(tempfile.gettempdir(), "felo-benchmark-rating.felo")
+    write_synthetic_felo_file(filename, 500, number_of_bouts)
+    try:
+        duration, number_of_bouts = time_rating(filename)
+        print "Rating %d bouts of 500 fencers:" % number_of_bouts
+        print "    total time:     %10.2f s" % duration
+        print "    throughput:     %10.0f bouts/s" % (number_of_bouts / duration)
+        if felo_rating.numpy:
+            duration, number_of_bouts = time_rating(filename, vectorized=True)
+            print "Rating them with NumPy:"
+            print "    total time:     %10.2f s" % duration
+            print "    throughput:     %10.0f bouts/s" % (number_of_bouts / duration)
+    finally:
+        os.remove(filename)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+#
+#    check_outcome_tables.py - Regression check of the outcome tables
+#
+#    Copyright © 2006 Torsten Bronger <bronger@physik.rwth-aachen.de>
+#
+#    This file is part of the Felo program.
+#
+#    Felo is free software; you can redistribute it and/or modify it under
+#    the terms of the MIT licence:
+#
+#    Permission is hereby granted, free of charge, to any person obtaining a
+#    copy of this software and associated documentation files (the "Software"),
+#    to deal in the Software without restriction, including without limitation
+#    the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#    and/or sell copies of the Software, and to permit persons to whom the
+#    Software is furnished to do so, subject to the following conditions:
+#
+#    The above copyright notice and this permission notice shall be included in
+#    all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+
+"""Regression check of the outcome tables.  For bouts to 5, 10, and 15 points,
+it asserts that
+
+1. `felo_rating.OutcomeTable.write` reproduces the shipped ``auf*.dat`` file
+   byte for byte from the table returned by `felo_rating.outcome_table`,
+
+2. the table calculated by `felo_rating.calculate_outcome_table` has the same
+   rows as the shipped one, and that `felo_rating.OutcomeTable.row` chooses
+   the same row for every expectation value in both tables as the linear
+   search of earlier versions, see `linear_row`, and
+
+3. its values agree with the shipped ones.  The shipped tables were produced
+   by sampling, so they are only equal within the sampling noise.
+
+Usage: check_outcome_tables.py
+"""
+
+import sys, os, StringIO
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+import felo_rating
+
+def linear_row(table, expectation):
+    """Returns the row of the outcome table for the given expectation value the
+    way earlier versions of `felo_rating.prognosticate_bout` found it: the
+    first row whose expectation value is closer than 0.0051, or else the last
+    row.
+    """
+    for i, result in enumerate(table.results):
+        if abs(expectation - result) < 0.0051:
+            return i
+    return len(table.results) - 1
+
+def check_outcome_table(fenced_to):
+    """Checks the outcome table for bouts to the given number of points, and
+    returns the largest differences of the winning chance and of the point
+    difference between the calculated and the shipped table.
+    """
+    shipped_filename = os.path.join(felo_rating.datapath, "auf%d.dat" % fenced_to)
+    shipped_contents = open(shipped_filename).read()
+    written_table = StringIO.StringIO()
+    felo_rating.outcome_table(fenced_to).write(written_table)
+    assert written_table.getvalue() == shipped_contents, "%s isn't reproduced" % shipped_filename
+    shipped_table = felo_rating.OutcomeTable(StringIO.StringIO(shipped_contents))
+    calculated_table = felo_rating.calculate_outcome_table(fenced_to)
+    assert list(calculated_table.results) == list(shipped_table.results), \
+        "The calculated table for %d points has other rows than %s" % (fenced_to, shipped_filename)
+    for i in range(10001):
+        expectation = i / 10000.
+        row = linear_row(shipped_table, expectation)
+        assert shipped_table.row(expectation) == row, \
+            "Another row than before is chosen for %g in %s" % (expectation, shipped_filename)
+        assert calculated_table.row(expectation) == row, \
+            "Another row is chosen for %g in the calculated table for %d points" % (expectation, fenced_to)
+    winning_chance_difference = max(abs(calculated - shipped) for calculated, shipped in
+                                    zip(calculated_table.winning_chances, shipped_table.winning_chances))
+    point_difference_difference = max(abs(calculated - shipped) for calculated, shipped in
+                                      zip(calculated_table.point_differences, shipped_table.point_differences))
+    assert winning_chance_difference < 1e-3 and point_difference_difference < 1e-2, \
+        "The calculated table for %d points deviates from %s" % (fenced_to, shipped_filename)
+    return winning_chance_difference, point_difference_difference
+
+if __name__ == '__main__':
+    for fenced_to in (5, 10, 15):
+        winning_chance_difference, point_difference_difference = check_outcome_table(fenced_to)
+        print "Bouts to %d points: OK (calculated table deviates by %g in the winning chance and by %g in the " \
+            "point difference)" % (fenced_to, winning_chance_difference, point_difference_difference)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+#
+#    synthetic.py - Synthetic Felo files for the benchmarks
+#
+#    Copyright © 2006 Torsten Bronger <bronger@physik.rwth-aachen.de>
+#
+#    This file is part of the Felo program.
+#
+#    Felo is free software; you can redistribute it and/or modify it under
+#    the terms of the MIT licence:
+#
+#    Permission is hereby granted, free of charge, to any person obtaining a
+#    copy of this software and associated documentation files (the "Software"),
+#    to deal in the Software without restriction, including without limitation
+#    the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#    and/or sell copies of the Software, and to permit persons to whom the
+#    Software is furnished to do so, subject to the following conditions:
+#
+#    The above copyright notice and this permission notice shall be included in
+#    all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+
+"""Generator for large synthetic Felo files, used by the benchmark scripts.
+
+The fencers get a hidden "true" strength, and the bout results are drawn
+according to it, so that the resulting Felo ratings are meaningful.  Bout days
+mix pool bouts to 5 points, direct elimination bouts to 10 and 15 points, team
+relay bouts, continuation lines without a date, and a few bouts against
+foreign fencers.
+"""
+
+import random, datetime, codecs
+
+def write_synthetic_felo_file(filename, number_of_fencers, number_of_bouts, seed=0):
+    """Writes a synthetic Felo file.
+
+    :Parameters:
+      - `filename`: path of the Felo file to be written
+      - `number_of_fencers`: number of fencers in the initial ratings section
+      - `number_of_bouts`: number of bouts in the bouts section
+      - `seed`: seed of the random number generator
+
+    :type filename: string
+    :type number_of_fencers: int
+    :type number_of_bouts: int
+    :type seed: int
+    """
+    random_generator = random.Random(seed)
+    names = [u"Fencer %d" % i for i in range(number_of_fencers)]
+    strengths = dict((name, random_generator.gauss(1600, 200)) for name in names)
+    felo_file = codecs.open(filename, "w", "utf-8")
+    print>>felo_file, u"groupname\tSynthetic"
+    print>>felo_file, u"earliest date in plot\t1980-01-01"
+    print>>felo_file
+    print>>felo_file, 52 * u"="
+    for i, name in enumerate(names):
+        if i % 20 == 0:
+            # freshman
+            print>>felo_file, u"%s\t0" % name
+        else:
+            print>>felo_file, u"%s\t%d" % (name, int(strengths[name]))
+    print>>felo_file
+    print>>felo_file, 52 * u"="
+    date = datetime.date(1990, 1, 1)
+    bouts_written = 0
+    while bouts_written < number_of_bouts:
+        date += datetime.timedelta(days=random_generator.randint(1, 10))
+        date_column = date.isoformat()
+        for i in range(min(random_generator.randint(20, 200), number_of_bouts - bouts_written)):
+            first_fencer, second_fencer = random_generator.sample(names, 2)
+            if random_generator.random() < 0.01:
+                second_fencer = u"Foreign <%d>" % random_generator.randint(1300, 1900)
+                strength_second = 1600
+            else:
+                strength_second = strengths[second_fencer]
+            expectation = 1 / (1 + 10**((strength_second - strengths[first_fencer])/400.0))
+            kind = random_generator.random()
+            if kind < 0.1:
+                total_points = random_generator.randint(1, 12)
+                points_first = int(round(expectation * total_points))
+                score = u"%d:%d *" % (points_first, total_points - points_first)
+            else:
+                fenced_to = 5 if kind < 0.7 else random_generator.choice([10, 15])
+                winner_first = random_generator.random() < expectation
+                loser_points = random_generator.randint(0, fenced_to - 1)
+                if winner_first:
+                    score = u"%d:%d" % (fenced_to, loser_points)
+                else:
+                    score = u"%d:%d" % (loser_points, fenced_to)
+            print>>felo_file, u"%s\t%s -- %s\t%s" % (date_column, first_fencer, second_fencer, score)
+            date_column = u"\t"
+            bouts_written += 1
+        print>>felo_file
+    felo_file.close()
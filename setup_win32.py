@@ -68,7 +68,7 @@ bout result list.  The program offers a graphical user interface (using wxWidget
       download_url = 'http://sourceforge.net/projects/felo/',
       keywords = 'fencing sports Felo rating',
       license = 'MIT License',
-      options = {'py2exe': {'includes': 'felo_rating'}},
+      options = {'py2exe': {'includes': 'felo_rating, felo_plot'}},
       classifiers = [
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
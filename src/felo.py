@@ -32,7 +32,7 @@ __version__ = "$Revision$"
 # $HeadURL$
 distribution_version = "1.0.3"
 
-import re, os, codecs, sys, time, StringIO, textwrap, platform, webbrowser, shutil
+import re, os, codecs, sys, time, StringIO, textwrap, platform, webbrowser, shutil, multiprocessing
 datapath = os.path.abspath(os.path.dirname(sys.argv[0]))
 import gettext, locale
 locale.setlocale(locale.LC_ALL, '')
@@ -203,7 +203,7 @@ class AboutWindow(wx.Dialog):
         self.Destroy()
 
 class ProgressFrame(wx.Frame):
-    def __init__(self, message, title, *args, **keyw):
+    def __init__(self, message, title, cancellation=None, *args, **keyw):
         wx.Frame.__init__(self, None, wx.ID_ANY, title=title, *args, **keyw)
         self.SetIcon(App.icon)
         panel = wx.Panel(self, wx.ID_ANY)
@@ -214,6 +214,11 @@ class ProgressFrame(wx.Frame):
         self.gauge.SetBezelFace(3)
         self.gauge.SetShadowWidth(3)
         vbox_main.Add(self.gauge, flag=wx.ALIGN_CENTER)
+        if cancellation:
+            self.cancellation = cancellation
+            cancel_button = wx.Button(panel, wx.ID_CANCEL)
+            self.Bind(wx.EVT_BUTTON, self.OnCancel, cancel_button)
+            vbox_main.Add(cancel_button, flag=wx.ALIGN_CENTER | wx.TOP, border=20)
         hbox_top = wx.BoxSizer(wx.HORIZONTAL)
         hbox_top.Add(vbox_main, flag=wx.ALL | wx.ALIGN_CENTER, border=25)
         panel.SetSizer(hbox_top)
@@ -222,6 +227,9 @@ class ProgressFrame(wx.Frame):
     def update(self, ratio):
         self.gauge.SetValue(int(round(ratio*100)))
         wx.Yield()
+    def OnCancel(self, event):
+        self.cancellation.cancel()
+        event.GetEventObject().Disable()
 
 class Frame(wx.Frame):
     def __init__(self, *args, **keyw):
@@ -279,6 +287,9 @@ class Frame(wx.Frame):
         self.SetTitle(u"Felo – "+os.path.split(self.felo_filename)[1])
         self.editor.Bind(wx.stc.EVT_STC_CHANGE, self.OnChange)
         self.felo_file_changed = False
+        self.parsing_cache = felo_rating.ParsingCache()
+        self.rating_checkpoints = felo_rating.RatingCheckpoints()
+        self.bootstrapping_warm_start = felo_rating.BootstrappingWarmStart()
         self.SendSizeEvent()
         if len(sys.argv) > 1:
             self.open_felo_file(sys.argv[1])
@@ -380,7 +391,7 @@ class Frame(wx.Frame):
         felo_file_contents = StringIO.StringIO(self.editor.GetText())
         felo_file_contents.name = self.felo_filename
         try:
-            parameters, __, fencers, bouts = felo_rating.parse_felo_file(felo_file_contents)
+            parameters, __, fencers, bouts = self.parsing_cache.parse_felo_file(felo_file_contents)
         except felo_rating.LineError, e:
             self.editor.GotoLine(e.linenumber - 1)
             wx.MessageBox(_(u"Error in line %(linenumber)d: %(description)s") %
@@ -402,7 +413,8 @@ class Frame(wx.Frame):
         if not bouts:
             self.report_empty_bouts()
             return
-        fencerlist, __ = felo_rating.calculate_felo_ratings(parameters, fencers, bouts)
+        fencerlist, __ = felo_rating.calculate_felo_ratings(parameters, fencers, bouts,
+                                                            checkpoints=self.rating_checkpoints)
         result_frame = ResultFrame(_(u"Felo ratings ") + parameters["groupname"], fencerlist)
         result_frame.Show()
     def OnGenerateHTML(self, event):
@@ -424,11 +436,14 @@ class Frame(wx.Frame):
         html_dialog.Destroy()
         if result != wx.ID_OK:
             return
-        file_list = u""
+        # Only the files whose contents have changed since the last time are
+        # written, and only they must be uploaded.
+        manifest = felo_rating.OutputManifest(parameters["output folder"], base_filename)
         try:
+            if not os.path.isdir(parameters["output folder"]):
+                raise IOError
             html_filename = os.path.join(parameters["output folder"], base_filename+".html")
-            html_file = codecs.open(html_filename, "w", "utf-8")
-            file_list += base_filename+".html\n"
+            html_file = StringIO.StringIO()
             print>>html_file, u"""<?xml version="1.0" encoding="utf-8"?>
 <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
 <html xmlns="http://www.w3.org/1999/xhtml">
@@ -439,35 +454,49 @@ class Frame(wx.Frame):
 /*]]>*/
 </style></head><body>\n\n<h1>%(title)s</h1>\n<h2>%(date)s</h2>\n\n<table><tbody>""" % \
                 {"title": _(u"Felo ratings ")+parameters["groupname"], "date": _(u"as of ")+last_date}
-            fencerlist, suffixes = felo_rating.calculate_felo_ratings(parameters, fencers, bouts, plot=make_plot)
+            fencerlist, suffixes = felo_rating.calculate_felo_ratings(parameters, fencers, bouts, plot=make_plot,
+                                                                      checkpoints=self.rating_checkpoints,
+                                                                      manifest=manifest)
+            referenced_files = [base_filename+".html"]
+            for fencer in fencerlist:
+                print>>html_file, u"<tr><td class='name'>%s</td><td class='felo-rating'>%d</td></tr>" % \
+                    (fencer.name, fencer.felo_rating)
+            print>>html_file, u"</tbody></table>"
+            for suffix in suffixes:
+                print>>html_file, u"<p class='felo-plot'><img class='felo-plot' src='%s.png' alt='%s' /></p>" % \
+                    (base_filename+suffix, _(u"Felo ratings plot for ")+parameters["groupname"])
+                referenced_files.append(base_filename + suffix + ".png")
+                if os.path.isfile(os.path.join(parameters["output folder"], base_filename+suffix+".pdf")):
+                    print>>html_file, _(u"<p class='printable-notice'>Also in a <a href='%s.pdf'>"
+                                        u"printable version</a>.</p>") % (base_filename+suffix)
+                    referenced_files.append(base_filename + suffix + ".pdf")
+            print>>html_file, u"</body></html>"
+            manifest.write_text(base_filename+".html", html_file.getvalue())
         except felo_rating.ExternalProgramError, e:
             wx.MessageBox(e.description, _(u"External program not found"), wx.OK | wx.ICON_ERROR, self)
             return
+        except felo_rating.PlotError, e:
+            manifest.save()
+            wx.MessageBox(e.description, _(u"Plots failed"), wx.OK | wx.ICON_ERROR, self)
+            return
         except IOError:
             wx.MessageBox(_(u"Could not write to file or directory.\n(I tried to write to '%s'.)")
                             % parameters["output folder"], _(u"Couldn't write file"),
                           wx.OK | wx.ICON_ERROR, self)
             return
-        for fencer in fencerlist:
-            print>>html_file, u"<tr><td class='name'>%s</td><td class='felo-rating'>%d</td></tr>" % \
-                (fencer.name, fencer.felo_rating)
-        print>>html_file, u"</tbody></table>"
-        for suffix in suffixes:
-            print>>html_file, u"<p class='felo-plot'><img class='felo-plot' src='%s.png' alt='%s' /></p>" % \
-                (base_filename+suffix, _(u"Felo ratings plot for ")+parameters["groupname"])
-            file_list += base_filename + suffix + ".png\n"
-            if os.path.isfile(os.path.join(parameters["output folder"], base_filename+suffix+".pdf")):
-                print>>html_file, _(u"<p class='printable-notice'>Also in a <a href='%s.pdf'>"
-                                    u"printable version</a>.</p>") % (base_filename+suffix)
-                file_list += base_filename + suffix + ".pdf\n"
-        print>>html_file, u"</body></html>"
-        html_file.close()
+        manifest.save()
         if HTML_preview:
             html_window = HtmlPreviewFrame(self, _(u"Preview HTML"), html_filename)
             html_window.Show()
-        wx.MessageBox(_(u"The following files must be uploaded from\n%s\nto the web server:\n\n") %
-                      parameters["output folder"] + file_list,
-                      _(u"Upload file list"), wx.OK | wx.ICON_INFORMATION, self)
+        file_list = u"".join(filename + u"\n" for filename in referenced_files if filename in manifest.changed_files)
+        if file_list:
+            wx.MessageBox(_(u"The following files must be uploaded from\n%s\nto the web server:\n\n") %
+                          parameters["output folder"] + file_list,
+                          _(u"Upload file list"), wx.OK | wx.ICON_INFORMATION, self)
+        else:
+            wx.MessageBox(_(u"No file in\n%s\nhas changed since it was last generated, so nothing must be "
+                            u"uploaded to the web server.") % parameters["output folder"],
+                          _(u"Upload file list"), wx.OK | wx.ICON_INFORMATION, self)
     def OnBootstrapping(self, event):
         parameters, fencers, bouts = self.parse_editor_contents()
         if not parameters:
@@ -481,12 +510,27 @@ class Frame(wx.Frame):
                                wx.ICON_QUESTION, self)
         if answer == wx.NO:
             return
-        progress_window = ProgressFrame(_(u"I'm bootstrapping, please be patient") + u" …", _(u"Bootstrapping"))
+        cancellation = felo_rating.CancellationToken()
+        progress_window = ProgressFrame(_(u"I'm bootstrapping, please be patient") + u" …", _(u"Bootstrapping"),
+                                        cancellation)
         progress_window.Show()
         wx.Yield()
         try:
+            statistics = {}
             felo_rating.calculate_felo_ratings(parameters, fencers, bouts, bootstrapping=True,
-                                               bootstrapping_callback = progress_window.update)
+                                               bootstrapping_callback = progress_window.update,
+                                               warm_start=self.bootstrapping_warm_start, cancellation=cancellation,
+                                               statistics=statistics)
+            if statistics["bootstrapping residual"] >= parameters["threshold bootstrapping"]:
+                if not cancellation.cancelled:
+                    raise felo_rating.BootstrappingError(_(u"The bootstrapping didn't converge."))
+                answer = wx.MessageBox(_(u"The bootstrapping was cancelled.  In the best result so far, the Felo "
+                                         u"numbers may still change by %g.  Do you wish to take it anyway?") %
+                                       statistics["bootstrapping residual"], _(u"Bootstrapping cancelled"),
+                                       wx.YES_NO | wx.NO_DEFAULT | wx.ICON_QUESTION, self)
+                if answer == wx.NO:
+                    progress_window.Destroy()
+                    return
             for fencer in fencers.values():
                 if not fencer.freshman:
                     fencer.initial_felo_rating = fencer.felo_rating
@@ -511,7 +555,8 @@ class Frame(wx.Frame):
                                wx.ICON_QUESTION, self)
         if answer == wx.NO:
             return
-        felo_rating.calculate_felo_ratings(parameters, fencers, bouts, estimate_freshmen=True)
+        felo_rating.calculate_felo_ratings(parameters, fencers, bouts, estimate_freshmen=True,
+                                           checkpoints=self.rating_checkpoints)
         for fencer in fencers.values():
             if fencer.freshman:
                 fencer.initial_felo_rating = fencer.felo_rating
@@ -531,5 +576,10 @@ class App(wx.App):
         self.SetTopWindow(self.frame)
         return True
 
-app = App()
-app.MainLoop()
+if __name__ == "__main__":
+    # On Windows, the worker processes for the plots and the bootstrapping
+    # import this module anew, or start the exe anew in the py2exe build.  They
+    # must not open another main window.
+    multiprocessing.freeze_support()
+    app = App()
+    app.MainLoop()
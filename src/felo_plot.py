@@ -0,0 +1,547 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+#
+#    felo_plot.py - Plots of the Felo ratings without external programs
+#
+#    Copyright © 2006 Torsten Bronger <bronger@physik.rwth-aachen.de>
+#
+#    This file is part of the Felo program.
+#
+#    Felo is free software; you can redistribute it and/or modify it under
+#    the terms of the MIT licence:
+#
+#    Permission is hereby granted, free of charge, to any person obtaining a
+#    copy of this software and associated documentation files (the "Software"),
+#    to deal in the Software without restriction, including without limitation
+#    the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#    and/or sell copies of the Software, and to permit persons to whom the
+#    Software is furnished to do so, subject to the following conditions:
+#
+#    The above copyright notice and this permission notice shall be included in
+#    all copies or substantial portions of the Software.
+#
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+
+"""Plots of the development of the Felo ratings, drawn without external
+programs.  `RatingPlot` draws a plot on a canvas, which writes it as a PNG
+file (`PNGCanvas`) or as a PDF file (`PDFCanvas`).
+
+:author: Torsten Bronger
+:copyright: 2006, Torsten Bronger
+:license: MIT license
+:contact: Torsten Bronger <bronger@physik.rwth-aachen.de>
+"""
+__docformat__ = "restructuredtext en"
+
+__all__ = ["RatingPlot", "PNGCanvas", "PDFCanvas"]
+
+__version__ = "$Revision$"
+# $HeadURL$
+
+import datetime, math, zlib, struct, unicodedata, locale
+preferred_encoding = locale.getpreferredencoding()
+
+# The 5×7 pixel font of the PNG plots.  Every character from " " to "~" has
+# five columns, and every column is a byte whose bit i is the pixel in row i.
+bitmap_font_columns = (
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462" "3649562050" "0008070300"
+    "001c224100" "0041221c00" "2a1c7f1c2a" "08083e0808" "0050300000" "0808080808" "0060600000" "2010080402"
+    "3e5149453e" "00427f4000" "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0814224100" "1414141414" "0041221408" "0201510906"
+    "324979413e" "7e1111117e" "7f49494936" "3e41414122" "7f4141221c" "7f49494941" "7f09090901" "3e4149497a"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040" "7f020c027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f" "3f4038403f"
+    "6314081463" "0708700807" "6151494543" "007f414100" "0204081020" "0041417f00" "0402010204" "4040404040"
+    "0001020400" "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "0c5252523e"
+    "7f08040478" "00447d4000" "2040443d00" "7f10284400" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020" "3c4040207c" "1c2040201c" "3c4030403c"
+    "4428102844" "0c5050503c" "4464544c44" "0008364100" "00007f0000" "0041360800" "1008081008")
+bitmap_font_extra_columns = {u"ß": "7e01494936", u"\u0131": "00447c4000", u"\u0237": "2040443c00"}
+# Pixels of the diacritical marks as (column, row) pairs, with the rows
+# counted from the top of the glyph, i.e. negative rows are above it.
+bitmap_font_marks = {u"\u0300": ((1, -2), (2, -1)),                           # grave
+                     u"\u0301": ((3, -2), (2, -1)),                           # acute
+                     u"\u0302": ((2, -2), (1, -1), (3, -1)),                  # circumflex
+                     u"\u0303": ((2, -2), (4, -2), (1, -1), (3, -1)),         # tilde
+                     u"\u0308": ((1, -1), (3, -1)),                           # diaeresis
+                     u"\u030a": ((1, -2), (2, -2), (3, -2), (1, -1), (3, -1)), # ring
+                     u"\u030c": ((1, -2), (3, -2), (2, -1)),                  # caron
+                     u"\u0327": ((2, 7), (1, 8))}                             # cedilla
+
+bitmap_glyphs = {}
+
+def bitmap_glyph(character):
+    """Returns the pixels of one character in the bitmap font of the PNG
+    plots.  Characters with diacritical marks are composed of the base
+    character and the marks.  Unknown characters are replaced with "?".  The
+    glyphs are cached in `bitmap_glyphs`.
+
+    :Parameters:
+      - `character`: the character
+
+    :type character: unicode
+
+    :Return:
+      - the pixels as (column, row) pairs, with the rows counted from the top
+        of the glyph
+
+    :rtype: list of (int, int)
+    """
+    try:
+        return bitmap_glyphs[character]
+    except KeyError:
+        pass
+    characters = unicodedata.normalize("NFD", unicode(character))
+    base, marks = characters[0], characters[1:]
+    if marks and base in u"ij":
+        # Without the dot, so that there is room for the mark
+        base = {u"i": u"\u0131", u"j": u"\u0237"}[base]
+    if base in bitmap_font_extra_columns:
+        columns = bitmap_font_extra_columns[base]
+    elif u" " <= base <= u"~":
+        index = (ord(base) - 32) * 10
+        columns = bitmap_font_columns[index:index + 10]
+    else:
+        columns, marks = bitmap_font_columns[310:320], u""
+    pixels = [(column, row) for column in range(5) for row in range(7)
+              if int(columns[2 * column:2 * column + 2], 16) & (1 << row)]
+    # Lower-case letters are two rows lower, so their marks are, too.
+    shift = 0 if base.isupper() else 2
+    for mark in marks:
+        pixels.extend((column, row + (shift if row < 0 else 0)) for column, row in bitmap_font_marks.get(mark, ()))
+    bitmap_glyphs[character] = pixels
+    return pixels
+
+def text_width(text, font_size):
+    """Returns the width of a text in Helvetica.  Only digits and the usual
+    separators of numbers and dates have their exact widths; for all other
+    characters, it is a good average.
+
+    :Parameters:
+      - `text`: the text
+      - `font_size`: the size of the font
+
+    :type text: unicode
+    :type font_size: float
+
+    :Return:
+      - the width of the text, in the same unit as `font_size`
+
+    :rtype: float
+    """
+    widths = {u"-": 0.333, u".": 0.278, u"/": 0.278, u":": 0.278, u" ": 0.278, u",": 0.278}
+    return sum(widths.get(character, 0.556) for character in text) * font_size
+
+class PNGCanvas(object):
+    """Canvas for `RatingPlot` which draws into pixels and writes a PNG file.
+    The coordinates are pixels, counted from the upper left corner.
+
+    :ivar width: the width in pixels
+    :ivar height: the height in pixels
+    :ivar line_height: the height of one line of text
+
+    :type width: int
+    :type height: int
+    :type line_height: float
+    """
+    line_height = 11
+    def __init__(self, width=800, height=600):
+        """Class constructor.
+
+        :Parameters:
+          - `width`: the width in pixels
+          - `height`: the height in pixels
+
+        :type width: int
+        :type height: int
+        """
+        self.width, self.height = width, height
+        self.__pixels = bytearray("\xff" * (3 * width * height))
+        self.__color_channels = {}
+    def __channels(self, color):
+        """Returns a run as long as the image is wide or high in every color
+        channel of the given color, so that slices of them can be assigned to
+        the pixels.
+        """
+        try:
+            return self.__color_channels[color]
+        except KeyError:
+            channels = self.__color_channels[color] = [bytearray([value]) * max(self.width, self.height)
+                                                       for value in color]
+            return channels
+    def __fill_columns(self, columns, color, width, period=1):
+        """Fills vertical runs of pixels.
+
+        :Parameters:
+          - `columns`: the runs as column, top row, and bottom row
+          - `color`: the color as red, green, and blue, from 0 to 255
+          - `width`: the number of pixel columns per run; the additional ones
+            are on the right
+          - `period`: only every so many rows are filled
+
+        :type columns: iterable of (int, int, int)
+        :type color: (int, int, int)
+        :type width: int
+        :type period: int
+        """
+        pixels, stride = self.__pixels, 3 * self.width * period
+        # I set every color channel of a whole run in one go with extended
+        # slices, which is much faster than setting pixel by pixel.
+        channels = self.__channels(color)
+        for column, top, bottom in columns:
+            top, bottom = max(top, 0), min(bottom, self.height - 1)
+            length = (bottom - top) // period + 1
+            if length <= 0:
+                continue
+            for x in range(max(column, 0), min(column + width, self.width)):
+                start = 3 * (top * self.width + x)
+                stop = start + (length - 1) * stride + 1
+                for i, channel in enumerate(channels):
+                    pixels[start + i:stop + i:stride] = channel[:length]
+    def __fill_rows(self, rows, color, period=1):
+        """Fills horizontal runs of pixels, see `__fill_columns`.
+
+        :Parameters:
+          - `rows`: the runs as row, left column, and right column
+          - `color`: the color as red, green, and blue, from 0 to 255
+          - `period`: only every so many columns are filled
+
+        :type rows: iterable of (int, int, int)
+        :type color: (int, int, int)
+        :type period: int
+        """
+        pixels = self.__pixels
+        channels = self.__channels(color)
+        for row, left, right in rows:
+            if not 0 <= row < self.height:
+                continue
+            left, right = max(left, 0), min(right, self.width - 1)
+            length = (right - left) // period + 1
+            if length <= 0:
+                continue
+            start = 3 * (row * self.width + left)
+            stop = start + (length - 1) * 3 * period + 1
+            for i, channel in enumerate(channels):
+                pixels[start + i:stop + i:3 * period] = channel[:length]
+    def __monotonic_line(self, points, color, width):
+        """Draws a polyline whose x coordinates don't decrease.  For every pixel
+        column, it is drawn as one vertical run from the lowest to the highest
+        point of the polyline in this column.  This is exact for polylines
+        which are functions of x, and fast even if they zigzag a lot.
+        """
+        first_column = int(round(points[0][0]))
+        extents = [None] * (int(round(points[-1][0])) - first_column + 1)
+        def add(column, y):
+            extent = extents[column - first_column]
+            if extent is None:
+                extents[column - first_column] = [y, y]
+            elif y < extent[0]:
+                extent[0] = y
+            elif y > extent[1]:
+                extent[1] = y
+        add(first_column, points[0][1])
+        for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+            column_0, column_1 = int(round(x0)), int(round(x1))
+            for column in range(column_0, column_1):
+                # The y coordinate where the line crosses to the next column
+                y = y0 + (y1 - y0) * (column + 0.5 - x0) / (x1 - x0)
+                add(column, y)
+                add(column + 1, y)
+            add(column_1, y1)
+        # Adjacent columns with the same run form a rectangle, which is filled
+        # row by row if it is wider than high.
+        offset = (width - 1) // 2
+        rectangles = []
+        for i, extent in enumerate(extents):
+            if extent is not None:
+                column, top, bottom = first_column + i - offset, int(round(extent[0])) - offset, \
+                    int(round(extent[1])) + width // 2
+                if rectangles and rectangles[-1][1] == column - 1 and rectangles[-1][2:] == [top, bottom]:
+                    rectangles[-1][1] = column
+                else:
+                    rectangles.append([column, column, top, bottom])
+        for left, right, top, bottom in rectangles:
+            if right + width - 1 - left > bottom - top:
+                self.__fill_rows([(row, left, right + width - 1) for row in range(top, bottom + 1)], color)
+            else:
+                self.__fill_columns([(column, top, bottom) for column in range(left, right + 1)], color, width)
+    def text_width(self, text):
+        """Returns the width of the given text.
+
+        :Parameters:
+          - `text`: the text
+
+        :type text: unicode
+
+        :Return:
+          - the width of the text
+
+        :rtype: float
+        """
+        return 6 * len(text)
+    def line(self, points, color, width=1, dashed=False):
+        """Draws a polyline.
+
+        :Parameters:
+          - `points`: the corners of the polyline
+          - `color`: the color as red, green, and blue, from 0 to 255
+          - `width`: the width of the line
+          - `dashed`: whether the line is dashed
+
+        :type points: list of (float, float)
+        :type color: (int, int, int)
+        :type width: float
+        :type dashed: boolean
+        """
+        width = max(int(round(width)), 1)
+        if dashed:
+            # The dashes are three pixels long, and so are the gaps.  Dashes of
+            # horizontal and vertical lines are drawn in one go, all others as
+            # lines of their own.
+            offset = (width - 1) // 2
+            for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+                if x0 == x1 or y0 == y1:
+                    column, row = int(round(min(x0, x1))), int(round(min(y0, y1)))
+                    end_column, end_row = int(round(max(x0, x1))), int(round(max(y0, y1)))
+                    for dash_offset in range(3):
+                        if x0 == x1:
+                            self.__fill_columns([(column - offset, row + dash_offset, end_row)], color, width, 6)
+                        else:
+                            self.__fill_rows([(row - offset + i, column + dash_offset, end_column)
+                                              for i in range(width)], color, 6)
+                    continue
+                length = math.hypot(x1 - x0, y1 - y0)
+                for i in range(0, int(length) + 1, 6):
+                    start, end = i / length if length else 0, min(i + 3, length) / length if length else 0
+                    self.line([(x0 + (x1 - x0) * start, y0 + (y1 - y0) * start),
+                               (x0 + (x1 - x0) * end, y0 + (y1 - y0) * end)], color, width)
+            return
+        # The polyline is split into parts whose x coordinates go in one
+        # direction only.
+        part = [points[0]]
+        direction = 0
+        for point in points[1:]:
+            step = point[0] - part[-1][0]
+            if step * direction < 0:
+                self.__monotonic_line(part if direction > 0 else part[::-1], color, width)
+                part = [part[-1]]
+            if step:
+                direction = step
+            part.append(point)
+        self.__monotonic_line(part if direction >= 0 else part[::-1], color, width)
+    def text(self, x, y, text, anchor="start", rotated=False):
+        """Writes black text.
+
+        :Parameters:
+          - `x`: the x coordinate of the anchor point
+          - `y`: the y coordinate of the anchor point.  It is the vertical middle
+            of the line of text.
+          - `text`: the text
+          - `anchor`: ``"start"``, ``"middle"``, or ``"end"``, depending on
+            which point of the text is at the anchor point
+          - `rotated`: if True, the text is rotated by 90° counterclockwise
+
+        :type x: float
+        :type y: float
+        :type text: unicode
+        :type anchor: string
+        :type rotated: boolean
+        """
+        length = int(round({"start": 0, "middle": 0.5, "end": 1}[anchor] * self.text_width(text)))
+        x, y = int(round(x)), int(round(y))
+        pixels, image_width, image_height = self.__pixels, self.width, self.height
+        black = bytearray(3)
+        for i, character in enumerate(text):
+            for column, row in bitmap_glyph(character):
+                along, across = 6 * i + column - length, row - 3
+                pixel_x, pixel_y = (x + across, y - along) if rotated else (x + along, y + across)
+                if 0 <= pixel_x < image_width and 0 <= pixel_y < image_height:
+                    index = 3 * (pixel_y * image_width + pixel_x)
+                    pixels[index:index + 3] = black
+    def write(self, filename):
+        """Writes the PNG file.
+
+        :Parameters:
+          - `filename`: the path to the file
+
+        :type filename: string
+        """
+        def chunk(type_, data):
+            return struct.pack(">I", len(data)) + type_ + data + \
+                struct.pack(">I", zlib.crc32(type_ + data) & 0xffffffff)
+        row_length = 3 * self.width
+        pixels = str(self.__pixels)
+        image_data = "".join("\0" + pixels[i:i + row_length] for i in range(0, len(pixels), row_length))
+        png_file = open(filename, "wb")
+        try:
+            png_file.write("\x89PNG\r\n\x1a\n" +
+                           chunk("IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)) +
+                           chunk("IDAT", zlib.compress(image_data)) + chunk("IEND", ""))
+        finally:
+            png_file.close()
+
+class PDFCanvas(object):
+    """Canvas for `RatingPlot` which writes a one-page PDF file.  The
+    coordinates are points, counted from the upper left corner.  See
+    `PNGCanvas` for the methods.
+    """
+    font_size = 10
+    line_height = 1.2 * font_size
+    def __init__(self, width=842, height=595):
+        # The default is landscape A4.
+        self.width, self.height = width, height
+        self.__operators = []
+    def text_width(self, text):
+        return text_width(text, self.font_size)
+    def line(self, points, color, width=1, dashed=False):
+        operators = ["%.3f %.3f %.3f RG %g w %s" % (color[0] / 255.0, color[1] / 255.0, color[2] / 255.0, width,
+                                                    "[3 3] 0 d" if dashed else "[] 0 d")]
+        command = "m"
+        for x, y in points:
+            operators.append("%.2f %.2f %s" % (x, self.height - y, command))
+            command = "l"
+        operators.append("S")
+        self.__operators.append(" ".join(operators))
+    def text(self, x, y, text, anchor="start", rotated=False):
+        length = {"start": 0, "middle": 0.5, "end": 1}[anchor] * self.text_width(text)
+        # Shift from the middle of the line to the baseline
+        baseline = 0.35 * self.font_size
+        if rotated:
+            matrix = "0 1 -1 0 %.2f %.2f" % (x + baseline, self.height - y - length)
+        else:
+            matrix = "1 0 0 1 %.2f %.2f" % (x - length, self.height - y - baseline)
+        text = text.encode("cp1252", "replace").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        self.__operators.append("BT /F1 %g Tf %s Tm (%s) Tj ET" % (self.font_size, matrix, text))
+    def write(self, filename):
+        content = zlib.compress("\n".join(self.__operators))
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+                   "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+                   "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 4 0 R "
+                   "/Resources << /Font << /F1 5 0 R >> >> >>" % (self.width, self.height),
+                   "<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content),
+                   "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+        pdf = "%PDF-1.4\n"
+        offsets = []
+        for i, object_ in enumerate(objects):
+            offsets.append(len(pdf))
+            pdf += "%d 0 obj\n%s\nendobj\n" % (i + 1, object_)
+        xref_offset = len(pdf)
+        pdf += "xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        pdf += "".join("%010d 00000 n \n" % offset for offset in offsets)
+        pdf += "trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+        pdf_file = open(filename, "wb")
+        try:
+            pdf_file.write(pdf)
+        finally:
+            pdf_file.close()
+
+class RatingPlot(object):
+    """Plot of the development of the Felo ratings of some fencers, drawn
+    without external programs.  It looks like the plots of gnuplot: the
+    dates are on the x axis, the legend is on the right, and there is a grid
+    at the tics.  The curve of a fencer connects the days on which he had
+    bouts.
+
+    :ivar days: the day numbers (see ``datetime.date.toordinal``) of the data
+      points
+    :ivar tic_days: the day numbers which get labels on the x axis
+    :ivar curves: the names of the fencers, and their Felo ratings on all
+      `days`.  A rating may be ``None`` if the fencer didn't fence on that day.
+    :ivar tic_format: the ``strftime`` format of the labels on the x axis
+
+    :type days: list of int
+    :type tic_days: list of int
+    :type curves: list of (unicode, list of float)
+    :type tic_format: string
+    """
+    colors = [(255, 0, 0), (0, 160, 0), (0, 0, 255), (255, 0, 255), (0, 190, 190), (160, 82, 45), (255, 165, 0),
+              (128, 0, 128), (128, 128, 0), (128, 128, 128)]
+    def __init__(self, days, tic_days, curves, tic_format="%Y-%m-%d"):
+        """Class constructor.
+
+        :Parameters:
+          - `days`: the day numbers of the data points
+          - `tic_days`: the day numbers which get labels on the x axis
+          - `curves`: the names of the fencers, and their Felo ratings on all
+            `days`
+          - `tic_format`: the ``strftime`` format of the labels on the x axis
+
+        :type days: list of int
+        :type tic_days: list of int
+        :type curves: list of (unicode, list of float)
+        :type tic_format: string
+        """
+        self.days, self.tic_days, self.curves, self.tic_format = days, tic_days, curves, tic_format
+    @staticmethod
+    def __tics(minimum, maximum):
+        """Returns round values for the tics of the y axis, which include the
+        given range.
+        """
+        if maximum <= minimum:
+            minimum, maximum = minimum - 1, maximum + 1
+        step = (maximum - minimum) / 8.0
+        magnitude = 10**math.floor(math.log10(step))
+        step = min(factor * magnitude for factor in (1, 2, 5, 10) if factor * magnitude >= step)
+        first, last = int(math.floor(minimum / step)), int(math.ceil(maximum / step))
+        return [i * step for i in range(first, last + 1)]
+    def draw(self, canvas):
+        """Draws the plot on a canvas.
+
+        :Parameters:
+          - `canvas`: the canvas
+
+        :type canvas: `PNGCanvas` or `PDFCanvas`
+        """
+        values = [value for __, curve in self.curves for value in curve if value is not None]
+        y_tics = self.__tics(min(values), max(values)) if values else self.__tics(0, 1)
+        y_labels = [u"%g" % tic for tic in y_tics]
+        x_labels = [datetime.date.fromordinal(day).strftime(self.tic_format).decode(preferred_encoding)
+                    for day in self.tic_days]
+        line_height = canvas.line_height
+        key_width = max([canvas.text_width(name) for name, __ in self.curves] + [0]) + 3 * line_height
+        left = line_height + max(canvas.text_width(label) for label in y_labels) + line_height / 2
+        right = canvas.width - line_height - key_width
+        top = line_height
+        bottom = canvas.height - line_height - max([canvas.text_width(label) for label in x_labels] + [0]) - \
+            line_height / 2
+        first_day, last_day = (self.days[0], self.days[-1]) if self.days else (0, 1)
+        if last_day == first_day:
+            first_day, last_day = first_day - 1, last_day + 1
+        def x(day):
+            return left + (right - left) * (day - first_day) / float(last_day - first_day)
+        def y(value):
+            return bottom - (bottom - top) * (value - y_tics[0]) / float(y_tics[-1] - y_tics[0])
+        grey, black = (160, 160, 160), (0, 0, 0)
+        for tic, label in zip(self.tic_days, x_labels):
+            canvas.line([(x(tic), top), (x(tic), bottom)], grey, 0.5, dashed=True)
+            canvas.text(x(tic), bottom + line_height / 2, label, "end", rotated=True)
+        for tic, label in zip(y_tics, y_labels):
+            canvas.line([(left, y(tic)), (right, y(tic))], grey, 0.5, dashed=True)
+            canvas.text(left - line_height / 2, y(tic), label, "end")
+        for i, (name, curve) in enumerate(self.curves):
+            color = self.colors[i % len(self.colors)]
+            points = [(x(day), y(value)) for day, value in zip(self.days, curve) if value is not None]
+            if len(points) > 1:
+                canvas.line(points, color, 2)
+            key_y = top + (i + 0.5) * line_height
+            canvas.line([(right + line_height, key_y), (right + 2.5 * line_height, key_y)], color, 2)
+            canvas.text(right + 3 * line_height, key_y, name)
+        canvas.line([(left, top), (right, top), (right, bottom), (left, bottom), (left, top)], black, 1)
+    def write(self, filename_prefix):
+        """Writes the plot as PNG and PDF file.
+
+        :Parameters:
+          - `filename_prefix`: the path of the files without the extensions
+
+        :type filename_prefix: string
+        """
+        for canvas, extension in ((PNGCanvas(), ".png"), (PDFCanvas(), ".pdf")):
+            self.draw(canvas)
+            canvas.write(filename_prefix + extension)
@@ -1,4 +1,5 @@
 #!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
 #
 #    felo_rating.py - Core library of the Felo program
 #
@@ -42,6 +43,10 @@
   this module
 :var column_separator: column separator in a Felo file
 :var part_separator: string of characters that can serve as part separators
+:var bout_line_pattern: regular expression for a line in the bouts section.
+:var simple_bout_line_pattern: regular expression for a line in the bouts
+  section in its canonical form.  It is used as a fast path before
+  bout_line_pattern.
 :var apparent_expectation_values: This list of lists is the solution for the
   winning-hit problem.  The winner of a bout is rated too highly because he
   ends the bout with his point.  This array contains the actually "measured"
@@ -51,26 +56,39 @@
   The list contains 101 lists, for result values 0, 0.01, 0.02, ... 1.  (This
   happens to be the first element of each list, too.)  Every list contains 15
   values, for bouts fenced to 1, 2, ... 15 points.
+:var winning_hit_table: the same values in a dense table.  It is extended
+  automatically if bouts to more than 15 points occur.
 
 
 :type datapath: string
 :type distribution_version: string
 :type column_separator: string
 :type part_separator: string
+:type bout_line_pattern: SRE_Pattern
+:type simple_bout_line_pattern: SRE_Pattern
 :type apparent_expectation_values: list
+:type winning_hit_table: `WinningHitTable`
 """
 __docformat__ = "restructuredtext en"
 
-__all__ = ["Bout", "Fencer", "parse_felo_file", "write_felo_file", "calculate_felo_ratings",
-           "expectation_value", "prognosticate_bout", "write_back_fencers",
+__all__ = ["Bout", "BoutTable", "Fencer", "parse_felo_file", "write_felo_file", "calculate_felo_ratings",
+           "calculate_felo_ratings_from_file", "rate_bouts", "bootstrap_felo_ratings", "bootstrapping_report",
+           "bootstrap_felo_ratings_in_parallel", "connected_components", "ParsingCache", "RatingCheckpoints",
+           "RatingHistory", "OutputManifest",
+           "BootstrappingWarmStart", "CancellationToken", "RatingEngine",
+           "expectation_value", "prognosticate_bout", "prognosticate_bouts",
+           "OutcomeTable", "calculate_outcome_table", "outcome_table", "PredictionMatrix", "simulate_tournaments",
+           "write_back_fencers",
            "write_back_fencers_to_file",
-           "Error", "LineError", "BootstrappingError"]
+           "Error", "LineError", "BootstrappingError", "ChronologyError",
+           "SnapshotError", "PlotError"]
 
 __version__ = "$Revision$"
 # $HeadURL$
 distribution_version = "1.0.3"
 
-import codecs, re, os.path, datetime, time, shutil, glob, tempfile
+import codecs, re, os.path, datetime, time, shutil, glob, tempfile, hashlib, StringIO, marshal, array, itertools, \
+    bisect, math, multiprocessing, multiprocessing.pool, heapq, csv, sys
 # This strange construction is necessary because on Windows, the file may be
 # put into a ZIP file (by py2exe), so we have to delete the last *two* parts of
 # the path.
@@ -79,6 +97,11 @@ while not os.path.isdir(datapath):
     datapath = os.path.dirname(datapath)
 from subprocess import call, Popen, PIPE
 import gettext, locale
+import felo_plot
+try:
+    import numpy
+except ImportError:
+    numpy = None
 if os.name == 'nt':
     t = gettext.translation('felo', datapath+"/po", fallback=True)
 else:
@@ -154,6 +177,8 @@ class Bout(object):
 
     :type date_pattern: SRE_Pattern
     """
+    __slots__ = ("date", "index", "first_fencer", "second_fencer", "points_first", "points_second",
+                 "fenced_to")
     date_pattern = re.compile("\s*(?P<year>\\d{4})-(?P<month>\\d{1,2})-(?P<day>\\d{1,2})"
                               "(?:\\.(?P<index>\\d+))")
     def __init__(self, year, month, day, index=0, first_fencer="", second_fencer="",
@@ -217,6 +242,257 @@ class Bout(object):
                                   where ".II" is the optional index.
                                   @type: string""")
 
+class BoutTable(object):
+    """Container for many bouts, stored column-wise in typed arrays rather than
+    as Bout objects.  This needs only a fraction of the memory of a list of
+    Bout objects, and it can be sorted and traversed quickly.
+
+    For code which still works with Bout objects, it behaves like a list of
+    bouts: It supports ``len()``, indexing, iteration, ``append()``,
+    ``extend()``, and ``sort()``.  Bout objects are created on demand for this,
+    so modifying them doesn't change the table.
+
+    Fencers are stored as integer IDs.  The names belonging to the IDs are
+    kept in `names`.
+
+    :ivar ordinals: the dates of the bouts as proleptic Gregorian ordinals
+    :ivar indices: the indices of the bouts within their day
+    :ivar first_fencers: the IDs of the first fencers
+    :ivar second_fencers: the IDs of the second fencers
+    :ivar points_first: the points of the first fencers
+    :ivar points_second: the points of the second fencers
+    :ivar fenced_to: the winning points of the bouts, with 0 for team relay
+      bouts
+    :ivar names: the fencer names, with the fencer ID as the list index
+    :ivar fencer_ids: mapping of fencer names to fencer IDs
+
+    :type ordinals: array.array
+    :type indices: array.array
+    :type first_fencers: array.array
+    :type second_fencers: array.array
+    :type points_first: array.array
+    :type points_second: array.array
+    :type fenced_to: array.array
+    :type names: list
+    :type fencer_ids: dict
+
+    :cvar column_names: the names of the array attributes
+
+    :type column_names: tuple
+    """
+    column_names = ("ordinals", "indices", "first_fencers", "second_fencers", "points_first", "points_second",
+                    "fenced_to")
+    def __init__(self, bouts=()):
+        """Class constructor.
+
+        :Parameters:
+          - `bouts`: bouts with which the table is initially filled
+
+        :type bouts: iterable
+        """
+        for column_name in self.column_names:
+            setattr(self, column_name, array.array("i"))
+        self.names = []
+        self.fencer_ids = {}
+        self.extend(bouts)
+    def fencer_id(self, name):
+        """Returns the ID of a fencer.  If the fencer doesn't have one yet, a new
+        one is assigned.
+
+        :Parameters:
+          - `name`: name of the fencer
+
+        :type name: string
+
+        :Return:
+          - the ID of the fencer
+
+        :rtype: int
+        """
+        try:
+            return self.fencer_ids[name]
+        except KeyError:
+            self.fencer_ids[name] = fencer_id = len(self.names)
+            self.names.append(name)
+            return fencer_id
+    def add(self, ordinal, index, first_fencer, second_fencer, points_first, points_second, fenced_to):
+        """Appends a bout given by its data.  This is faster than `append`
+        because no Bout object is involved.  The parameters correspond to the
+        attributes of `Bout`, except for the date, which is given as an
+        ordinal.
+        """
+        self.ordinals.append(ordinal)
+        self.indices.append(index)
+        self.first_fencers.append(self.fencer_id(first_fencer))
+        self.second_fencers.append(self.fencer_id(second_fencer))
+        self.points_first.append(points_first)
+        self.points_second.append(points_second)
+        self.fenced_to.append(fenced_to)
+    def append(self, bout):
+        """Appends a bout.
+
+        :Parameters:
+          - `bout`: the bout to be appended
+
+        :type bout: Bout
+        """
+        self.add(bout.date.toordinal(), bout.index, bout.first_fencer, bout.second_fencer,
+                 bout.points_first, bout.points_second, bout.fenced_to)
+    def extend(self, bouts):
+        """Appends many bouts.
+
+        :Parameters:
+          - `bouts`: the bouts to be appended
+
+        :type bouts: iterable
+        """
+        for bout in bouts:
+            self.append(bout)
+    def __len__(self):
+        return len(self.ordinals)
+    def __getitem__(self, i):
+        """Returns a newly created Bout object for the bout with the given
+        index.  Negative indices are allowed.
+        """
+        date = datetime.date.fromordinal(self.ordinals[i])
+        return Bout(date.year, date.month, date.day, self.indices[i], self.names[self.first_fencers[i]],
+                    self.names[self.second_fencers[i]], self.points_first[i], self.points_second[i],
+                    self.fenced_to[i])
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self[i]
+    def sort(self):
+        """Sorts the bouts chronologically, with early bouts first.  Like
+        ``list.sort()``, it is stable, i.e. bouts with the same date and index
+        remain in their order.
+        """
+        keys = zip(self.ordinals, self.indices)
+        order = sorted(xrange(len(keys)), key=keys.__getitem__)
+        if order != range(len(keys)):
+            for column_name in self.column_names:
+                column = getattr(self, column_name)
+                setattr(self, column_name, array.array(column.typecode, [column[i] for i in order]))
+    def __getstate__(self):
+        """Pickles the columns as byte strings, which is much more compact than
+        the default pickling of arrays.
+        """
+        return dict([(column_name, getattr(self, column_name).tostring()) for column_name in self.column_names] +
+                    [("names", self.names)])
+    def __setstate__(self, state):
+        for column_name in self.column_names:
+            column = array.array("i")
+            column.fromstring(state[column_name])
+            setattr(self, column_name, column)
+        self.names = list(state["names"])
+        self.fencer_ids = dict((name, i) for i, name in enumerate(self.names))
+    def day_digests(self, seed=""):
+        """Calculates a chain of digests over the bout days of the table, which
+        must be sorted.  The digest of a day covers all bouts of this day and,
+        through the digest of the previous day, all bouts before it.  Thus, two
+        tables have the same digest for a certain day exactly if they are equal
+        up to and including this day.  The fencers enter the digests by name,
+        so their IDs don't matter.
+
+        :Parameters:
+          - `seed`: byte string which is included in all digests, e.g. for
+            things which influence the meaning of the bouts
+
+        :type seed: str
+
+        :Return:
+          - list of tuples with the date ordinal of the day, the number of bouts
+            up to and including this day, and the digest, in chronological order
+
+        :rtype: list
+        """
+        ordinals, names = self.ordinals, self.names
+        digest = hashlib.sha1(seed).digest()
+        day_digests = []
+        start = 0
+        while start < len(ordinals):
+            ordinal = ordinals[start]
+            end = bisect.bisect_right(ordinals, ordinal, start)
+            day_hash = hashlib.sha1(digest)
+            for column_name in self.column_names:
+                if column_name not in ("first_fencers", "second_fencers"):
+                    day_hash.update(getattr(self, column_name)[start:end].tostring())
+            for column in (self.first_fencers, self.second_fencers):
+                day_hash.update(u"\0".join([names[i] for i in column[start:end]]).encode("utf-8"))
+                day_hash.update("\n")
+            digest = day_hash.digest()
+            day_digests.append((ordinal, end, digest))
+            start = end
+        return day_digests
+    def rows(self, fencers, start=0):
+        """Iterates over the bouts in the order of the table, yielding their
+        data rather than Bout objects, together with the bout set and bout day
+        boundaries.  This is what the Felo rating calculation needs.
+
+        The fencer IDs are resolved to Fencer objects with one list lookup
+        each, so that the calculation doesn't need to look up names.
+
+        :Parameters:
+          - `fencers`: all fencers, see `Fencer`.  It must contain all fencers
+            of the table.
+          - `start`: index of the first bout to be yielded
+
+        :type fencers: dict
+        :type start: int
+
+        :Return:
+          - iterator over tuples with the first fencer, the second fencer, the
+            points of the first fencer, the points of the second fencer,
+            fenced_to, the date ordinal, whether this is the last bout with
+            this date and index, and whether this is the last bout of this
+            day.
+
+        :rtype: iterator
+        """
+        ordinals, indices = self.ordinals, self.indices
+        fencers_by_id = [fencers[name] for name in self.names]
+        last = len(ordinals) - 1
+        for i, (ordinal, index, first_fencer, second_fencer, points_first, points_second, fenced_to) in \
+                enumerate(itertools.islice(itertools.izip(ordinals, indices, self.first_fencers,
+                                                          self.second_fencers, self.points_first,
+                                                          self.points_second, self.fenced_to), start, None),
+                          start):
+            if i == last:
+                last_of_set = last_of_day = True
+            else:
+                last_of_day = ordinals[i+1] != ordinal
+                last_of_set = last_of_day or indices[i+1] != index
+            yield fencers_by_id[first_fencer], fencers_by_id[second_fencer], points_first, points_second, \
+                fenced_to, ordinal, last_of_set, last_of_day
+
+def bout_rows(bouts, fencers, start=0):
+    """Iterates over bouts and yields their data in the same form as
+    `BoutTable.rows`.  For a `BoutTable`, its `rows` method is used directly.
+
+    :Parameters:
+      - `bouts`: bouts in chronological order
+      - `fencers`: all fencers, see `Fencer`
+      - `start`: number of bouts to be skipped at the beginning
+
+    :type bouts: iterable
+    :type fencers: dict
+    :type start: int
+
+    :Return:
+      - iterator over tuples, see `BoutTable.rows`
+
+    :rtype: iterator
+    """
+    if isinstance(bouts, BoutTable):
+        for row in bouts.rows(fencers, start):
+            yield row
+        return
+    for bout, next_bout in successive_pairs(itertools.islice(bouts, start, None)):
+        ordinal = bout.date.toordinal()
+        last_of_day = next_bout is None or next_bout.date.toordinal() != ordinal
+        last_of_set = last_of_day or next_bout.index != bout.index
+        yield fencers[bout.first_fencer], fencers[bout.second_fencer], bout.points_first, bout.points_second, \
+            bout.fenced_to, ordinal, last_of_set, last_of_day
+
 apparent_expectation_values = \
     [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
      [0.01, 0.006766, 0.00751687, 0.00801342, 0.00834527, 0.00858217, 0.00875974, 0.00889779,
@@ -418,7 +694,197 @@ apparent_expectation_values = \
       0.990992, 0.990902, 0.990826, 0.990763, 0.990708, 0.990661, 0.990619],
      [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
 
-def set_preliminary_felo_ratings(fencers, bout, parameters):
+def winning_hit_values(maximal_points, resolution=100, minimal_points=1):
+    """Calculates apparent expectation values of the winning-hit problem, see
+    `apparent_expectation_values`.  Every point of a bout is won by the first
+    fencer with the probability p, which is the ideal expectation value.  The
+    bout ends as soon as one fencer has the winning points.  The apparent
+    expectation value is the expected fraction of all points that the first
+    fencer has at the end.  If the first fencer wins n:k, the probability of
+    this result is binomial(n-1+k, k) p^n (1-p)^k.
+
+    With the default resolution, the values for up to 15 points are the same as
+    in `apparent_expectation_values`, but not rounded.
+
+    :Parameters:
+      - `maximal_points`: the highest number of winning points
+      - `resolution`: the number of steps between the ideal expectation values
+        0 and 1
+      - `minimal_points`: the lowest number of winning points
+
+    :type maximal_points: int
+    :type resolution: int
+    :type minimal_points: int
+
+    :Return:
+      - ``resolution + 1`` lists, for the ideal expectation values 0,
+        1/resolution, …, 1.  Every list contains the apparent expectation
+        values for bouts to `minimal_points`, …, `maximal_points` points.
+
+    :rtype: list
+    """
+    values = []
+    for i in range(resolution + 1):
+        p = float(i) / resolution
+        q = 1 - p
+        row = []
+        for n in range(minimal_points, maximal_points + 1):
+            p_n, q_n = p**n, q**n
+            # binomial(n-1+k, k) p^k and binomial(n-1+k, k) q^k
+            binomial_p = binomial_q = 1.0
+            value = p_n
+            for k in range(1, n):
+                binomial_p *= (n - 1 + k) * p / k
+                binomial_q *= (n - 1 + k) * q / k
+                value += (p_n * binomial_q * n + q_n * binomial_p * k) / (n + k)
+            row.append(value)
+        values.append(row)
+    return values
+
+class WinningHitTable(object):
+    """Apparent expectation values of the winning-hit problem in a contiguous
+    array, with linear interpolation between the ideal expectation values.
+
+    :ivar resolution: the number of steps between the ideal expectation values
+      0 and 1
+    :ivar maximal_points: the highest number of winning points in the table
+    :ivar values: the apparent expectation values, row by row, for bouts to 1,
+      2, … points in every row
+
+    :type resolution: int
+    :type maximal_points: int
+    :type values: array.array
+    """
+    def __init__(self, values):
+        """Class constructor.
+
+        :Parameters:
+          - `values`: the table in the form of `winning_hit_values`, starting
+            with bouts to 1 point
+
+        :type values: list
+        """
+        self.resolution = len(values) - 1
+        self.maximal_points = len(values[0])
+        self.values = array.array("d", itertools.chain(*values))
+    def extended(self, maximal_points):
+        """Returns a table for bouts up to more winning points.  The existing
+        values are kept, and the new ones are calculated with
+        `winning_hit_values`.
+
+        :Parameters:
+          - `maximal_points`: the highest number of winning points of the new
+            table
+
+        :type maximal_points: int
+
+        :Return:
+          - the new table
+
+        :rtype: `WinningHitTable`
+        """
+        old_values = [self.values[i * self.maximal_points:(i + 1) * self.maximal_points]
+                      for i in range(self.resolution + 1)]
+        new_values = winning_hit_values(maximal_points, self.resolution, self.maximal_points + 1)
+        return WinningHitTable([list(old_row) + new_row for old_row, new_row in zip(old_values, new_values)])
+    def interpolate(self, expectation, points):
+        """Returns the apparent expectation value of a bout.
+
+        :Parameters:
+          - `expectation`: the ideal expectation value.  It must be smaller than
+            1.
+          - `points`: the winning points of the bout.  It must not be larger
+            than `maximal_points`.
+
+        :type expectation: float
+        :type points: int
+
+        :Return:
+          - the apparent expectation value
+
+        :rtype: float
+        """
+        values = self.values
+        position = expectation * self.resolution
+        row = int(position)
+        lower = values[row * self.maximal_points + points - 1]
+        return (values[(row + 1) * self.maximal_points + points - 1] - lower) * (position - row) + lower
+    def interpolate_array(self, expectations, points):
+        """Returns the apparent expectation values of many bouts.  This needs
+        NumPy.
+
+        :Parameters:
+          - `expectations`: the ideal expectation values.  They must be smaller
+            than 1.
+          - `points`: the winning points of the bouts.  They must not be larger
+            than `maximal_points`.
+
+        :type expectations: numpy.ndarray
+        :type points: numpy.ndarray
+
+        :Return:
+          - the apparent expectation values
+
+        :rtype: numpy.ndarray
+        """
+        values = numpy.frombuffer(self.values, dtype=float).reshape(self.resolution + 1, self.maximal_points)
+        position = expectations * self.resolution
+        row = position.astype(int)
+        column = points - 1
+        lower = values[row, column]
+        return (values[row + 1, column] - lower) * (position - row) + lower
+
+winning_hit_table = WinningHitTable(apparent_expectation_values)
+
+def apparent_expectation_value(expectation, points):
+    """Returns the apparent expectation value of a bout, see
+    `apparent_expectation_values`.  If necessary, `winning_hit_table` is
+    extended for bouts to more than 15 points.
+
+    :Parameters:
+      - `expectation`: the ideal expectation value.  It must be smaller than 1.
+      - `points`: the winning points of the bout, i.e. the points of its
+        winner
+
+    :type expectation: float
+    :type points: int
+
+    :Return:
+      - the apparent expectation value
+
+    :rtype: float
+    """
+    global winning_hit_table
+    table = winning_hit_table
+    if points > table.maximal_points:
+        table = winning_hit_table = table.extended(points)
+    return table.interpolate(expectation, points)
+
+def apparent_expectation_value_array(expectations, points):
+    """Returns the apparent expectation values of many bouts, see
+    `apparent_expectation_value`.  This needs NumPy.
+
+    :Parameters:
+      - `expectations`: the ideal expectation values.  They must be smaller
+        than 1.
+      - `points`: the winning points of the bouts
+
+    :type expectations: numpy.ndarray
+    :type points: numpy.ndarray
+
+    :Return:
+      - the apparent expectation values
+
+    :rtype: numpy.ndarray
+    """
+    global winning_hit_table
+    table = winning_hit_table
+    if len(points) and points.max() > table.maximal_points:
+        table = winning_hit_table = table.extended(int(points.max()))
+    return table.interpolate_array(expectations, points)
+
+def set_preliminary_felo_ratings(first_fencer, second_fencer, points_first, points_second, fenced_to, parameters,
+                                 fencers_with_preliminary_felo_rating=None):
     """Calculates the new Felo numbers of the two fencers of a given bout and
     stores them at preliminary places in the fencer objects.  More accurately,
     the new Felo numbers are stored in the felo_rating_preliminary attribute of
@@ -427,21 +893,28 @@ def set_preliminary_felo_ratings(fencers, bout, parameters):
     merged with the real ones when all bouts of that day have been considered.
 
     :Parameters:
-      - `fencers`: all fencers.  The two fencers in it which take part in the
-        bout are modified.
-      - `bout`: the bout that is to be calculated.
+      - `first_fencer`: the first fencer of the bout.  It is modified.
+      - `second_fencer`: the second fencer of the bout.  It is modified.
+      - `points_first`: points won by the first fencer
+      - `points_second`: points won by the second fencer
+      - `fenced_to`: winning points of the bout, see `Bout`
       - `parameters`: all Felo parameters.
+      - `fencers_with_preliminary_felo_rating`: set to which the fencers are
+        added, for `adopt_preliminary_felo_ratings`.  Default:
+        ``Fencer.fencers_with_preliminary_felo_rating``.  Every calculation
+        should have a set of its own, so that it doesn't interfere with other
+        calculations.
 
-    :type fencers: dict
-    :type bout: Bout
+    :type first_fencer: Fencer
+    :type second_fencer: Fencer
+    :type points_first: int
+    :type points_second: int
+    :type fenced_to: int
     :type parameters: dict
+    :type fencers_with_preliminary_felo_rating: set
     """
-    first_fencer, second_fencer, points_first, points_second = \
-        bout.first_fencer, bout.second_fencer, \
-        bout.points_first, bout.points_second
-    max_points = max(points_first, points_second)
     total_points = points_first + points_second
-    if bout.fenced_to == 0:
+    if fenced_to == 0:
         weighting = parameters["weighting team bout"]
     else:
         # weighting roughly is the number of bouts fenced to 5 points
@@ -450,84 +923,103 @@ def set_preliminary_felo_ratings(fencers, bout, parameters):
         result_first = 0.5
     else:
         result_first = float(points_first) / total_points
-    if fencers[first_fencer].freshman and fencers[second_fencer].freshman:
+    if first_fencer.freshman and second_fencer.freshman:
         # Two freshmen, so the bout cannot be counted at all
         return
-    if fencers[first_fencer].freshman:
-        fencers[first_fencer].total_weighting += weighting
-        fencers[first_fencer].total_result += (result_first - 0.5) * weighting
-        fencers[first_fencer].total_felo_rating_opponents += \
-            fencers[second_fencer].felo_rating_exact * weighting
+    if first_fencer.freshman:
+        first_fencer.total_weighting += weighting
+        first_fencer.total_result += (result_first - 0.5) * weighting
+        first_fencer.total_felo_rating_opponents += \
+            second_fencer.felo_rating_exact * weighting
         return
-    elif fencers[second_fencer].freshman:
-        fencers[second_fencer].total_weighting += weighting
-        fencers[second_fencer].total_result += (0.5 - result_first) * weighting
-        fencers[second_fencer].total_felo_rating_opponents += \
-            fencers[first_fencer].felo_rating_exact * weighting
+    elif second_fencer.freshman:
+        second_fencer.total_weighting += weighting
+        second_fencer.total_result += (0.5 - result_first) * weighting
+        second_fencer.total_felo_rating_opponents += \
+            first_fencer.felo_rating_exact * weighting
         return
     # Use current (rather than preliminary) numbers for the calculation.  Just
     # don't *store* the results in the real attributes.
-    felo_first = fencers[first_fencer].felo_rating_exact
-    felo_second = fencers[second_fencer].felo_rating_exact
+    felo_first = first_fencer.felo_rating_exact
+    felo_second = second_fencer.felo_rating_exact
     expectation_first = 1 / (1 + 10**((felo_second - felo_first)/400.0))
-    if bout.fenced_to == 0 and max_points <= 15 and expectation_first < 1.0:
+    if fenced_to == 0 and expectation_first < 1.0 and (points_first or points_second):
         # Adjusting the expectation value to eliminate the bias due to the
         # winning-hit problem.  I interpolate between two adjactent points in
-        # the value array apparent_expectation_values.  Interpolating is
+        # the value array winning_hit_table.  Interpolating is
         # necessary, otherwise the bootstrapping doesn't converge.  Even with
         # this simple linear interpolating, convergence is significantly more
         # difficult than without the winning-hit adjustment at all.  This
         # adjustment is only necessary if a bout is not weighted according to
         # the total points fenced.  At the moment, this is only the case for
         # single bouts in a team relay competition.
-        expectation_first = (apparent_expectation_values[int(expectation_first*100)+1][max_points-1] -
-                             apparent_expectation_values[int(expectation_first*100)][max_points-1]) * \
-                             (expectation_first*100 - int(expectation_first*100)) + \
-                             apparent_expectation_values[int(expectation_first*100)][max_points-1]
+        expectation_first = apparent_expectation_value(expectation_first, max(points_first, points_second))
     improvement_first = (result_first - expectation_first) * weighting
-    fencers[first_fencer].felo_rating_preliminary += fencers[first_fencer].k_factor * improvement_first
-    fencers[second_fencer].felo_rating_preliminary -= fencers[second_fencer].k_factor * improvement_first
-    Fencer.fencers_with_preliminary_felo_rating.add(fencers[first_fencer])
-    Fencer.fencers_with_preliminary_felo_rating.add(fencers[second_fencer])
+    first_fencer.felo_rating_preliminary += first_fencer.k_factor * improvement_first
+    second_fencer.felo_rating_preliminary -= second_fencer.k_factor * improvement_first
+    if fencers_with_preliminary_felo_rating is None:
+        fencers_with_preliminary_felo_rating = Fencer.fencers_with_preliminary_felo_rating
+    fencers_with_preliminary_felo_rating.add(first_fencer)
+    fencers_with_preliminary_felo_rating.add(second_fencer)
 
-    fencers[first_fencer].total_weighting_preliminary += weighting
-    fencers[second_fencer].total_weighting_preliminary += weighting
+    first_fencer.total_weighting_preliminary += weighting
+    second_fencer.total_weighting_preliminary += weighting
 
-def parse_bouts(input_file, linenumber, fencers, parameters):
-    """Reads bouts from a Felo file, starting at the current position in that file.
-    It reads till the end of the file since the bouts are the last section in a
-    Felo file.
+bout_line_pattern = re.compile("\\s*(?:(?:(?P<year>\\d{4})-(?P<month>\\d{1,2})-(?P<day>\\d{1,2}))?"
+                               "(?:\\.?(?P<index>\\d+))?"+column_separator+")?"+
+                               "(?P<first>.+?)\\s*--\\s*(?P<second>.+?)"+column_separator+
+                               "(?P<points_first>\\d+):(?P<points_second>\\d+)\\s*"+
+                               "(?P<fenced_to>(?:/\\d+)|\\*)?\\s*\\Z")
+# Fast path for bout lines in the canonical form, i.e. with single spaces around
+# the "--", no "--" in the first name, and only tabs as column separators.  It
+# cannot backtrack beyond a column, which makes it much faster than the general
+# pattern.  Whenever it matches, its groups are exactly those that
+# bout_line_pattern would yield.
+simple_bout_line_pattern = \
+    re.compile("(?:(?P<year>\\d{4})-(?P<month>\\d{1,2})-(?P<day>\\d{1,2})(?:\\.(?P<index>\\d+))?\t+)?"
+               "(?P<first>[^\\s-][^\t-]*(?:-[^\t-]+)*)(?<=\\S) -- (?P<second>\\S[^\t]*)(?<=\\S)\t+"
+               "(?P<points_first>\\d+):(?P<points_second>\\d+)(?: ?(?P<fenced_to>/\\d+|\\*))?\\Z")
+
+def iter_bout_rows(input_file, linenumber, fencers, parameters, date=None):
+    """Reads bouts from a Felo file, starting at the current position in that
+    file, and yields their data one after the other.  It reads till the end of
+    the file since the bouts are the last section in a Felo file.  Since this
+    is a generator, the file must remain open until all bouts have been
+    consumed.
+
+    This is the low-level part of the bout parser.  Use `iter_bouts` for Bout
+    objects, or `parse_bouts` for a `BoutTable`.
 
     :Parameters:
       - `input_file`: an *open* file object where the items are read from
       - `linenumber`: number of already read lines in the input_file
       - `fencers`: all fencers.  Foreign fencers may be added to it
       - `parameters`: all Felo parameters
+      - `date`: the date of the bout preceding the current position in the
+        file, if any.  It is used for bouts without an explicit date.
 
     :type input_file: file
     :type linenumber: int
     :type fencers: dict
     :type parameters: dict
+    :type date: datetime.date
 
     :Return:
-      - list with all bouts that were read.
+      - iterator over tuples with date, index, first fencer name, second
+        fencer name, points of the first fencer, points of the second fencer,
+        and fenced_to of each bout, in the order of the file.
 
-    :rtype: list
+    :rtype: iterator
 
     :Exceptions:
       - `LineError`: if a line does not follow the Felo file syntax
     """
-    line_pattern = re.compile("\\s*(?:(?:(?P<year>\\d{4})-(?P<month>\\d{1,2})-(?P<day>\\d{1,2}))?"
-                              "(?:\\.?(?P<index>\\d+))?"+column_separator+")?"+
-                              "(?P<first>.+?)\\s*--\\s*(?P<second>.+?)"+column_separator+
-                              "(?P<points_first>\\d+):(?P<points_second>\\d+)\\s*"+
-                              "(?P<fenced_to>(?:/\\d+)|\\*)?\\s*\\Z")
-    bouts = []
+    date_fields = None
     for line in input_file:
         linenumber += 1
         line = clean_up_line(line)
         if not line: continue
-        match = line_pattern.match(line)
+        match = simple_bout_line_pattern.match(line) or bout_line_pattern.match(line)
         if not match:
             raise LineError(_('Line must follow the pattern "YYYY-MM-DD <TAB> name1 '
                               '-- name2 <TAB> points1:points2".'),
@@ -561,32 +1053,148 @@ def parse_bouts(input_file, linenumber, fencers, parameters):
                 raise LineError(_('Fencer "%s" is unknown.') % second_fencer, input_file.name, linenumber)
             # The -1 is irrelevant; it is set in the constructor anyway
             fencers[second_fencer] = Fencer(second_fencer, -1, parameters)
-        if not index:
-            index = "0"
         if year:
-            last_year, last_month, last_day = year, month, day
-        else:
-            try:
-                year, month, day = last_year, last_month, last_day
-            except NameError:
-                raise LineError(_('No date found for this bout.'), input_file.name, linenumber)
-        bouts.append(Bout(int(year), int(month), int(day), int(index), first_fencer, second_fencer,
-                                points_first, points_second, fenced_to))
+            if (year, month, day) != date_fields:
+                date_fields = year, month, day
+                date = datetime.date(int(year), int(month), int(day))
+        elif not date:
+            raise LineError(_('No date found for this bout.'), input_file.name, linenumber)
+        yield date, int(index or 0), first_fencer, second_fencer, points_first, points_second, fenced_to
+
+
+def iter_bouts(input_file, linenumber, fencers, parameters, date=None):
+    """Reads bouts from a Felo file, starting at the current position in that
+    file, and yields them one after the other.  It reads till the end of the
+    file since the bouts are the last section in a Felo file.  Since this is a
+    generator, the file must remain open until all bouts have been consumed.
+
+    :Parameters:
+      - `input_file`: an *open* file object where the items are read from
+      - `linenumber`: number of already read lines in the input_file
+      - `fencers`: all fencers.  Foreign fencers may be added to it
+      - `parameters`: all Felo parameters
+      - `date`: the date of the bout preceding the current position in the
+        file, if any.  It is used for bouts without an explicit date.
+
+    :type input_file: file
+    :type linenumber: int
+    :type fencers: dict
+    :type parameters: dict
+    :type date: datetime.date
+
+    :Return:
+      - iterator over all bouts in the order of the file
+
+    :rtype: iterator
+
+    :Exceptions:
+      - `LineError`: if a line does not follow the Felo file syntax
+    """
+    for date, index, first_fencer, second_fencer, points_first, points_second, fenced_to in \
+            iter_bout_rows(input_file, linenumber, fencers, parameters, date):
+        yield Bout(date.year, date.month, date.day, index, first_fencer, second_fencer,
+                   points_first, points_second, fenced_to)
+
+def parse_bouts(input_file, linenumber, fencers, parameters):
+    """Reads bouts from a Felo file, starting at the current position in that file.
+    It reads till the end of the file since the bouts are the last section in a
+    Felo file.
+
+    :Parameters:
+      - `input_file`: an *open* file object where the items are read from
+      - `linenumber`: number of already read lines in the input_file
+      - `fencers`: all fencers.  Foreign fencers may be added to it
+      - `parameters`: all Felo parameters
+
+    :type input_file: file
+    :type linenumber: int
+    :type fencers: dict
+    :type parameters: dict
+
+    :Return:
+      - all bouts that were read.
+
+    :rtype: BoutTable
+
+    :Exceptions:
+      - `LineError`: if a line does not follow the Felo file syntax
+    """
+    bouts = BoutTable()
+    add = bouts.add
+    for date, index, first_fencer, second_fencer, points_first, points_second, fenced_to in \
+            iter_bout_rows(input_file, linenumber, fencers, parameters):
+        add(date.toordinal(), index, first_fencer, second_fencer, points_first, points_second, fenced_to)
     return bouts
 
-def parse_felo_file(felo_file):
+def assure_chronological_order(bouts):
+    """Passes through the bouts of an iterator and checks on the fly that they
+    come in chronological order, as they would after sorting.  This way, the
+    bouts of a Felo file can be processed without reading all of them into
+    memory first.
+
+    :Parameters:
+      - `bouts`: iterator over bouts
+
+    :type bouts: iterator
+
+    :Return:
+      - iterator over the very same bouts
+
+    :rtype: iterator
+
+    :Exceptions:
+      - `ChronologyError`: if a bout is earlier than its predecessor
+    """
+    previous_bout = None
+    for bout in bouts:
+        if previous_bout is not None and bout < previous_bout:
+            raise ChronologyError(_(u"The bouts are not in chronological order."))
+        yield bout
+        previous_bout = bout
+
+def successive_pairs(bouts):
+    """Yields every bout together with the bout that follows it.  This is the
+    one-bout lookahead needed for detecting the end of a bout day, without the
+    need for random access to the bouts.
+
+    :Parameters:
+      - `bouts`: all bouts, in chronological order
+
+    :type bouts: iterable
+
+    :Return:
+      - iterator over tuples of a bout and its successor.  The successor of
+        the last bout is None.
+
+    :rtype: iterator
+    """
+    bouts = iter(bouts)
+    try:
+        bout = bouts.next()
+    except StopIteration:
+        return
+    for next_bout in bouts:
+        yield bout, next_bout
+        bout = next_bout
+    yield bout, None
+
+def parse_felo_file(felo_file, streaming=False):
     """Reads from a Felo file parameters, fencers, and bouts.
 
     :Parameters:
       - `felo_file`: the *open* file to be parsed
+      - `streaming`: if True, the bouts are not read in advance but returned as
+        an iterator which reads them from the file on demand.  Then, the file
+        must not be closed before all bouts have been consumed.
 
     :type felo_file: file
+    :type streaming: boolean
 
     :Return:
       - Felo parameters as a dictionary
       - a list with all really in the file given parameters
       - fencers as a dictionary (in the form "name: Fencer object")
-      - bouts as a list.
+      - bouts as a list, or as an iterator if `streaming` is True.
 
     :rtype: dict, list, dict, list
 
@@ -609,6 +1217,7 @@ def parse_felo_file(felo_file):
                                _(u"weighting team bout"): "weighting team bout",
                                _(u"path of gnuplot"): "path of gnuplot",
                                _(u"path of convert"): "path of convert",
+                               _(u"plot renderer"): "plot renderer",
                                _(u"fencers per plot"): "fencers per plot",
                                _(u"overlap in plots"): "overlap in plots"}
     parameters_native_language, linenumber = parse_items(felo_file)
@@ -661,6 +1270,9 @@ def parse_felo_file(felo_file):
     else:
         parameters.setdefault("path of gnuplot", "gnuplot")
         parameters.setdefault("path of convert", "convert")
+    parameters.setdefault("plot renderer", "built-in")
+    if parameters["plot renderer"] not in ("built-in", "gnuplot"):
+        raise FeloFormatError(_(u"Plot renderer \"%s\" is unknown.") % parameters["plot renderer"])
 
     initial_felo_ratings, linenumber = parse_items(felo_file, linenumber)
     fencers = {}
@@ -682,70 +1294,452 @@ def parse_felo_file(felo_file):
                                 maximal_felo_rating)
         fencers[current_fencer.name] = current_fencer
 
-    bouts = parse_bouts(felo_file, linenumber, fencers, parameters)
+    if streaming:
+        bouts = iter_bouts(felo_file, linenumber, fencers, parameters)
+    else:
+        bouts = parse_bouts(felo_file, linenumber, fencers, parameters)
     return parameters, given_parameters, fencers, bouts
 
-def fill_with_tabs(text, tab_col):
-    """Adds tabs to a string until a certain column is reached.
-
-    :Parameters:
-      - `text`: the string that should be expanded to a certain column
-      - `tab_col`: the tabulator column to which should be filled up.  It is *not*
-        a character column, so a value of, say, "4" means character column 32.
-
-    :type text: string
-    :type tab_col: int
+def default_cache_directory():
+    """Returns the directory where Felo caches data by default.  This is the
+    per-user cache directory of the operating system.
 
     :Return:
-      - The expanded string, i.e., "text" plus one or more tabs.
+      - path to the cache directory.  It needn't exist yet.
 
     :rtype: string
     """
-    number_of_tabs = tab_col - len(text.expandtabs()) / 8
-    return text + max(number_of_tabs, 1) * "\t"
+    if os.name == 'nt':
+        base_directory = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base_directory, "Felo", "cache")
+    base_directory = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_directory, "felo")
 
-def write_felo_file(filename, parameters, fencers, bouts):
-    """Write Felo parameters, fencers, and bouts to a Felo file, which is
-    overwritten if already existing.
+class ParsingCache(object):
+    """Persistent cache for parsed Felo files.  It saves re-parsing a Felo file
+    which hasn't changed since the last time, or which has only got new bouts
+    at its end.
 
-    :Parameters:
-      - `filename`: path to the Felo file to be written
-      - `parameters`: Felo parameters
-      - `fencers`: all fencers
-      - `bouts`: all bouts
+    Every Felo file (identified by its path) gets one binary cache file in the
+    cache directory, which contains the parsed parameters, fencers, and bouts,
+    together with a hash of the file contents they were parsed from.  If the
+    total size of the cache directory exceeds a limit, the least recently used
+    cache files are deleted.
 
-    :type filename: string
-    :type parameters: dict
-    :type fencers: dict
-    :type bouts: list
+    The cache files contain only plain data (strings, numbers, lists, and
+    dictionaries), serialised with `marshal`, so that nothing in them can make
+    the program execute code.  The cache never raises exceptions of its own.
+    If a cache file can't be read or written, or if it is unusable, the Felo
+    file is simply parsed as usual.
+
+    :ivar directory: the directory where the cache files are stored
+    :ivar max_size: the maximal total size of all cache files in bytes
+
+    :type directory: string
+    :type max_size: int
+
+    :cvar format_version: version of the cache file format.  Cache files with
+      another version are ignored.
+
+    :type format_version: int
     """
-    felo_file = codecs.open(filename, "w", "utf-8")
-    print>>felo_file, _(u"# Parameters")
-    print>>felo_file
-    parameterslist = parameters.items()
-    # sort case-insensitively
-    parameterslist.sort(lambda x,y: cmp(x[0].upper(),y[0].upper()))
-    for name, value in parameterslist:
-        print>>felo_file, fill_with_tabs(name, 4) + str(value)
-    print>>felo_file
-    print>>felo_file, 52 * "="
-    print>>felo_file, _(u"# Initial Felo ratings")
-    print>>felo_file, _(u"# Names of fencers who want to be hidden")
-    print>>felo_file, _(u"# in parentheses")
-    print>>felo_file
-    fencerslist = fencers.items()
-    fencerslist.sort()
-    for fencer in [entry[1] for entry in fencerslist]:
-        if fencer.hidden:
-            name = "(" + fencer.name + ")"
-        else:
-            name = fencer.name
-        print>>felo_file, fill_with_tabs(name, 3) + str(fencer.initial_felo_rating)
-    print>>felo_file
-    print>>felo_file, 52 * "="
-    print>>felo_file, _(u"# Bouts")
-    print>>felo_file
-    bouts.sort()
+    format_version = 2
+    __entry_keys = ("digest", "length", "bouts section", "parameters", "given parameters", "fencers", "bouts")
+    def __init__(self, directory=None, max_size=50*1024*1024):
+        """Class constructor.
+
+        :Parameters:
+          - `directory`: the directory where the cache files are stored.  It
+            is created if necessary.  Defaults to the result of
+            `default_cache_directory`.
+          - `max_size`: the maximal total size of all cache files in bytes
+
+        :type directory: string
+        :type max_size: int
+        """
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+        self.__entries = {}
+    def parse_felo_file(self, felo_file):
+        """Reads from a Felo file parameters, fencers, and bouts, using the
+        cache where possible.  Like `parse_felo_file`, it returns fresh objects
+        which the caller may modify.
+
+        :Parameters:
+          - `felo_file`: the *open* file to be parsed
+
+        :type felo_file: file
+
+        :Return:
+          - the same as `parse_felo_file`
+
+        :rtype: dict, list, dict, list
+
+        :Exceptions:
+          - `LineError`: if a line does not follow the Felo file syntax
+          - `FeloFormatError`: if an initial Felo rating or weighting is invalid
+        """
+        contents = felo_file.read()
+        if isinstance(contents, str):
+            contents = contents.decode("utf-8")
+        name = felo_file.name
+        # The translated parameter name makes the key language-dependent,
+        # because so is the set of valid parameter names.
+        key = self.__hash(u"%d\0%s\0%s" % (self.format_version, os.path.abspath(name), _(u"groupname")))
+        entry = self.__entries.get(key) or self.__load(key)
+        digest = self.__hash(contents)
+        if entry and entry["digest"] == digest:
+            unpacked_entry = self.__unpack(entry)
+            if unpacked_entry:
+                self.__touch(key)
+                return unpacked_entry
+            entry = None
+        length = entry and entry["length"]
+        unpacked_entry = None
+        # New lines can only be parsed as bouts if the cached contents already
+        # reached the bouts section.  Otherwise, they may contain e.g. the
+        # separator line and more fencers.
+        if entry and entry["bouts section"] and 0 < length < len(contents) and contents[length-1] == u"\n" and \
+                self.__hash(contents[:length]) == entry["digest"]:
+            unpacked_entry = self.__unpack(entry)
+        if unpacked_entry:
+            # Only new lines were appended, so parse just them.
+            parameters, given_parameters, fencers, bouts = unpacked_entry
+            tail = StringIO.StringIO(contents[length:])
+            tail.name = name
+            last_date = bouts[-1].date if bouts else None
+            bouts.extend(iter_bouts(tail, contents.count(u"\n", 0, length), fencers, parameters, last_date))
+        else:
+            felo_file = StringIO.StringIO(contents)
+            felo_file.name = name
+            parameters, given_parameters, fencers, bouts = parse_felo_file(felo_file)
+        self.__store(key, self.__pack(digest, len(contents), self.__reaches_bouts_section(contents), parameters,
+                                      given_parameters, fencers, bouts))
+        return parameters, given_parameters, fencers, bouts
+    @staticmethod
+    def __hash(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+    @staticmethod
+    def __reaches_bouts_section(contents):
+        """Returns whether the bouts section of a Felo file begins within the
+        given contents, i.e. whether they contain both separator lines.  See
+        `parse_items` for how separator lines are recognised.
+        """
+        separators = 0
+        for line in StringIO.StringIO(contents):
+            line = clean_up_line(line)
+            if line and line[0] in part_separator:
+                separators += 1
+                if separators == 2:
+                    return True
+        return False
+    @staticmethod
+    def __pack(digest, length, bouts_section, parameters, given_parameters, fencers, bouts):
+        """Converts the parse results into a compact dictionary which contains
+        only builtin types.  Fencers are stored by the arguments of their
+        constructor, and the bouts by the columns of the `BoutTable` as byte
+        strings, so that the entry is independent of later changes of the
+        objects by the caller.
+        """
+        fencer_arguments = []
+        for fencer in fencers.values():
+            name = "(" + fencer.name + ")" if fencer.hidden else fencer.name
+            fencer_arguments.append((name, fencer.initial_felo_rating, fencer.initial_total_weighting,
+                                     fencer.initial_maximal_felo_rating))
+        return {"digest": digest, "length": length, "bouts section": bouts_section, "parameters": parameters,
+                "given parameters": given_parameters, "fencers": fencer_arguments,
+                "bouts": bouts.__getstate__()}
+    @staticmethod
+    def __unpack(entry):
+        """Creates fresh parse results from a cache entry, or returns None if
+        the entry is unusable.
+        """
+        try:
+            parameters = entry["parameters"].copy()
+            fencers = {}
+            for name, felo_rating, initial_total_weighting, maximal_felo_rating in entry["fencers"]:
+                fencer = Fencer(name, felo_rating, parameters, initial_total_weighting, maximal_felo_rating)
+                fencers[fencer.name] = fencer
+            bouts = BoutTable()
+            bouts.__setstate__(entry["bouts"])
+            return parameters, list(entry["given parameters"]), fencers, bouts
+        except Exception:
+            # The cache file is corrupt.  Then, the Felo file is parsed anew.
+            return None
+    def __filename(self, key):
+        return os.path.join(self.directory, key + ".cache")
+    def __load(self, key):
+        try:
+            cache_file = open(self.__filename(key), "rb")
+            try:
+                entry = marshal.loads(cache_file.read())
+            finally:
+                cache_file.close()
+        except Exception:
+            # Besides I/O errors, a corrupt file may make marshal raise
+            # ValueError, EOFError, or TypeError.
+            return None
+        if not isinstance(entry, dict) or entry.get("format version") != self.format_version or \
+                not all(key in entry for key in self.__entry_keys) or \
+                not isinstance(entry["digest"], basestring) or not isinstance(entry["length"], (int, long)) or \
+                not isinstance(entry["parameters"], dict):
+            return None
+        self.__entries[key] = entry
+        return entry
+    def __touch(self, key):
+        try:
+            os.utime(self.__filename(key), None)
+        except OSError:
+            pass
+    def __store(self, key, entry):
+        entry["format version"] = self.format_version
+        self.__entries[key] = entry
+        filename = self.__filename(key)
+        temporary_filename = filename + ".tmp"
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            cache_file = open(temporary_filename, "wb")
+            try:
+                cache_file.write(marshal.dumps(entry, 2))
+            finally:
+                cache_file.close()
+            if os.path.exists(filename):
+                # Necessary on Windows
+                os.remove(filename)
+            os.rename(temporary_filename, filename)
+        except (IOError, OSError, ValueError):
+            return
+        self.__evict()
+    def __evict(self):
+        """Deletes the least recently used cache files until the total size is
+        below the limit.
+        """
+        cache_files = []
+        for filename in glob.glob(os.path.join(self.directory, "*.cache")):
+            try:
+                cache_files.append((os.path.getmtime(filename), os.path.getsize(filename), filename))
+            except OSError:
+                pass
+        cache_files.sort()
+        total_size = sum([size for __, size, __ in cache_files])
+        for __, size, filename in cache_files:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                continue
+            total_size -= size
+            self.__entries.pop(os.path.splitext(os.path.basename(filename))[0], None)
+
+class OutputManifest(object):
+    """Digests of the inputs of the files generated in an output folder, i.e.
+    the HTML file and the plots.  With it, only files whose inputs have changed
+    since the last time are generated again, and only they need to be uploaded
+    to the web server.
+
+    The manifest is stored in the output folder as a text file with one line
+    for every generated file, consisting of the digest and the file name.  Like
+    `ParsingCache`, it never raises exceptions of its own.  If the manifest
+    file can't be read, all files are considered changed; if it can't be
+    written, they are generated again next time.
+
+    :ivar folder: the output folder
+    :ivar filename: the path of the manifest file
+    :ivar changed_files: the names of the files in the output folder which were
+      generated since the manifest was read, in the order of their generation
+
+    :type folder: string
+    :type filename: string
+    :type changed_files: list of unicode
+
+    :cvar format_version: version of the manifest file format.  Manifest files
+      with another version are ignored.
+
+    :type format_version: int
+    """
+    format_version = 1
+    def __init__(self, folder, name):
+        """Class constructor.  It reads the manifest file if it exists.
+
+        :Parameters:
+          - `folder`: the output folder
+          - `name`: the name of the manifest file without the extension
+            ".manifest", usually the lower-case group name
+
+        :type folder: string
+        :type name: unicode
+        """
+        self.folder = folder
+        self.filename = os.path.join(folder, name + ".manifest")
+        self.changed_files = []
+        self.__digests = {}
+        try:
+            manifest_file = codecs.open(self.filename, encoding="utf-8")
+            try:
+                if manifest_file.readline() == u"Felo manifest %d\n" % self.format_version:
+                    for line in manifest_file:
+                        digest, filename = line.rstrip(u"\n").split(u" ", 1)
+                        self.__digests[filename] = digest
+            finally:
+                manifest_file.close()
+        except (IOError, ValueError, UnicodeError):
+            self.__digests = {}
+    @staticmethod
+    def digest(*inputs):
+        """Returns the digest of the inputs of a generated file.
+
+        :Parameters:
+          - `inputs`: everything the contents of the file depend on.  It must
+            consist of strings, numbers, ``None``, and lists and tuples of
+            them.
+
+        :Return:
+          the hexadecimal digest
+
+        :rtype: str
+        """
+        return hashlib.sha1(repr(inputs)).hexdigest()
+    def is_current(self, filenames, digest):
+        """Returns whether files were generated from the same inputs the last
+        time, and still exist.
+
+        :Parameters:
+          - `filenames`: the names of the files in the output folder
+          - `digest`: the digest of their current inputs, see `digest`
+
+        :type filenames: iterable of unicode
+        :type digest: str
+
+        :rtype: boolean
+        """
+        return all(self.__digests.get(filename) == digest and os.path.isfile(os.path.join(self.folder, filename))
+                   for filename in filenames)
+    def update(self, filenames, digest):
+        """Records that files have just been generated.
+
+        :Parameters:
+          - `filenames`: the names of the files in the output folder
+          - `digest`: the digest of their inputs, see `digest`
+
+        :type filenames: iterable of unicode
+        :type digest: str
+        """
+        for filename in filenames:
+            self.__digests[filename] = digest
+            if filename not in self.changed_files:
+                self.changed_files.append(filename)
+    def write_text(self, filename, text):
+        """Writes a text file in UTF-8 into the output folder, unless it
+        already has exactly this contents according to the manifest.
+
+        :Parameters:
+          - `filename`: the name of the file in the output folder
+          - `text`: the contents of the file
+
+        :type filename: unicode
+        :type text: unicode
+
+        :Return:
+          whether the file was written
+
+        :rtype: boolean
+
+        :Exceptions:
+          - `IOError`: if the file couldn't be written
+        """
+        contents = text.encode("utf-8")
+        digest = hashlib.sha1(contents).hexdigest()
+        if self.is_current([filename], digest):
+            return False
+        output_file = open(os.path.join(self.folder, filename), "wb")
+        try:
+            output_file.write(contents)
+        finally:
+            output_file.close()
+        self.update([filename], digest)
+        return True
+    def save(self):
+        """Writes the manifest file.
+        """
+        temporary_filename = self.filename + ".tmp"
+        try:
+            manifest_file = codecs.open(temporary_filename, "w", encoding="utf-8")
+            try:
+                manifest_file.write(u"Felo manifest %d\n" % self.format_version)
+                for filename in sorted(self.__digests):
+                    manifest_file.write(u"%s %s\n" % (self.__digests[filename], filename))
+            finally:
+                manifest_file.close()
+            if os.path.exists(self.filename):
+                # Necessary on Windows
+                os.remove(self.filename)
+            os.rename(temporary_filename, self.filename)
+        except (IOError, OSError):
+            pass
+
+def fill_with_tabs(text, tab_col):
+    """Adds tabs to a string until a certain column is reached.
+
+    :Parameters:
+      - `text`: the string that should be expanded to a certain column
+      - `tab_col`: the tabulator column to which should be filled up.  It is *not*
+        a character column, so a value of, say, "4" means character column 32.
+
+    :type text: string
+    :type tab_col: int
+
+    :Return:
+      - The expanded string, i.e., "text" plus one or more tabs.
+
+    :rtype: string
+    """
+    number_of_tabs = tab_col - len(text.expandtabs()) / 8
+    return text + max(number_of_tabs, 1) * "\t"
+
+def write_felo_file(filename, parameters, fencers, bouts):
+    """Write Felo parameters, fencers, and bouts to a Felo file, which is
+    overwritten if already existing.
+
+    :Parameters:
+      - `filename`: path to the Felo file to be written
+      - `parameters`: Felo parameters
+      - `fencers`: all fencers
+      - `bouts`: all bouts
+
+    :type filename: string
+    :type parameters: dict
+    :type fencers: dict
+    :type bouts: list
+    """
+    felo_file = codecs.open(filename, "w", "utf-8")
+    print>>felo_file, _(u"# Parameters")
+    print>>felo_file
+    parameterslist = parameters.items()
+    # sort case-insensitively
+    parameterslist.sort(lambda x,y: cmp(x[0].upper(),y[0].upper()))
+    for name, value in parameterslist:
+        print>>felo_file, fill_with_tabs(name, 4) + str(value)
+    print>>felo_file
+    print>>felo_file, 52 * "="
+    print>>felo_file, _(u"# Initial Felo ratings")
+    print>>felo_file, _(u"# Names of fencers who want to be hidden")
+    print>>felo_file, _(u"# in parentheses")
+    print>>felo_file
+    fencerslist = fencers.items()
+    fencerslist.sort()
+    for fencer in [entry[1] for entry in fencerslist]:
+        if fencer.hidden:
+            name = "(" + fencer.name + ")"
+        else:
+            name = fencer.name
+        print>>felo_file, fill_with_tabs(name, 3) + str(fencer.initial_felo_rating)
+    print>>felo_file
+    print>>felo_file, 52 * "="
+    print>>felo_file, _(u"# Bouts")
+    print>>felo_file
+    bouts.sort()
     for i, bout in enumerate(bouts):
         # Separate days for clarity
         if i > 0 and bouts[i-1].date.toordinal() != bout.date.toordinal():
@@ -906,6 +1900,33 @@ class BootstrappingError(Error):
         """
         Error.__init__(self, description)
 
+class SnapshotError(Error):
+    """Error class for snapshot files which cannot be read.
+    """
+    def __init__(self, description):
+        """Class constructor.
+
+        :Parameters:
+          - `description`: error message
+
+        :type description: string
+        """
+        Error.__init__(self, description)
+
+class ChronologyError(Error):
+    """Error class for bouts which were expected in chronological order but
+    turned out not to be.
+    """
+    def __init__(self, description):
+        """Class constructor.
+
+        :Parameters:
+          - `description`: error message
+
+        :type description: string
+        """
+        Error.__init__(self, description)
+
 class ExternalProgramError(Error):
     """Error class for external programs that were not found.
     """
@@ -919,32 +1940,396 @@ class ExternalProgramError(Error):
         """
         Error.__init__(self, description)
 
-def adopt_preliminary_felo_ratings():
+class PlotError(Error):
+    """Error class for plots which couldn't be generated.  All plot windows
+    are tried, and the errors of all of them are reported together.
+
+    :ivar errors: the file names of the failed plots without extension, and
+      the error messages
+
+    :type errors: list of (string, unicode)
+    """
+    def __init__(self, errors):
+        """Class constructor.
+
+        :Parameters:
+          - `errors`: the file names of the failed plots without extension,
+            and the error messages
+
+        :type errors: list of (string, unicode)
+        """
+        self.errors = errors
+        Error.__init__(self, _(u"Some plots couldn't be generated:") + u"\n" +
+                       u"\n".join(u"%s: %s" % (os.path.basename(filename_prefix), message)
+                                  for filename_prefix, message in errors))
+
+def adopt_preliminary_felo_ratings(fencers_with_preliminary_felo_rating=None):
     """Take all preliminary numbers (Felo and fenced points) and write them over
     the "real" numbers.  The preliminary numbers remain untouched and can be
     used for further calculations.
 
     For optimisation, only fencers in the set
-    fencers_with_preliminary_felo_rating, which is a class variable in Fencers,
-    are visited.
+    fencers_with_preliminary_felo_rating are visited.  Afterwards, it is
+    empty.
+
+    :Parameters:
+      - `fencers_with_preliminary_felo_rating`: the set which was passed to
+        `set_preliminary_felo_ratings`.  Default:
+        ``Fencer.fencers_with_preliminary_felo_rating``.
 
-    No Parameters and return values.
+    :type fencers_with_preliminary_felo_rating: set
     """
-    for fencer in Fencer.fencers_with_preliminary_felo_rating:
+    if fencers_with_preliminary_felo_rating is None:
+        fencers_with_preliminary_felo_rating = Fencer.fencers_with_preliminary_felo_rating
+    for fencer in fencers_with_preliminary_felo_rating:
         fencer.felo_rating = fencer.felo_rating_preliminary
         fencer.total_weighting = fencer.total_weighting_preliminary
-    Fencer.fencers_with_preliminary_felo_rating.clear()
+    fencers_with_preliminary_felo_rating.clear()
+
+minimal_vectorized_set_size = 24
+
+def rate_bouts_vectorized(parameters, fencers, bouts, start=0, checkpoints=None):
+    """Rates bouts like the core loop of `calculate_felo_ratings`, but with
+    NumPy array operations.  Plots are not supported.
+
+    The bouts of one set, i.e. with the same date and index, only read the
+    committed Felo ratings and only add to the preliminary numbers (or, for
+    freshmen, to their totals).  So they are independent of each other until
+    `adopt_preliminary_felo_ratings` is called.  Therefore, the expectation
+    values, winning-hit adjustments, and weightings of a whole set are
+    calculated with a few array operations, and the changes are summed up per
+    fencer.  Only the adoption of the new numbers is done fencer by fencer.
+
+    The results are equal to those of the pure Python path except for rounding
+    errors, because the floating point numbers are summed up in a different
+    order.
+
+    :Parameters:
+      - `parameters`: all Felo parameters
+      - `fencers`: all fencers
+      - `bouts`: bouts in chronological order
+      - `start`: number of bouts at the beginning which are skipped because
+        they are already taken into account
+      - `checkpoints`: checkpoints in which the fencer states at the ends of
+        the bout days are recorded
+
+    :type parameters: dict
+    :type fencers: dict
+    :type bouts: BoutTable
+    :type start: int
+    :type checkpoints: `RatingCheckpoints`
+    """
+    def column(column_name):
+        return numpy.frombuffer(getattr(bouts, column_name).tostring(), dtype=numpy.intc)[start:]
+    def sum_up(fencer_ids, *values):
+        """Sums up the values per fencer.  Returns the IDs of the fencers and
+        the sums as lists.
+        """
+        participants, positions = numpy.unique(fencer_ids, return_inverse=True)
+        return [participants.tolist()] + [numpy.bincount(positions, value).tolist() for value in values]
+
+    if len(bouts) <= start:
+        return
+    fencers_by_id = [fencers[name] for name in bouts.names]
+    fencers_with_preliminary_felo_rating = set()
+    ordinals, indices = column("ordinals"), column("indices")
+    first_fencers, second_fencers = column("first_fencers"), column("second_fencers")
+    points_first, points_second = column("points_first").astype(float), column("points_second").astype(float)
+    fenced_to = column("fenced_to")
+    total_points = points_first + points_second
+    weightings = numpy.where(fenced_to == 0, parameters["weighting team bout"], total_points / 6.76)
+    results_first = numpy.where(total_points == 0, 0.5, points_first / numpy.maximum(total_points, 1))
+    max_points = numpy.maximum(points_first, points_second).astype(int)
+    freshman = numpy.array([fencer.freshman for fencer in fencers_by_id], dtype=bool)
+    felo_ratings = numpy.array([0.0 if fencer.freshman else fencer.felo_rating_exact
+                                for fencer in fencers_by_id])
+    k_factors = numpy.array([fencer.k_factor for fencer in fencers_by_id], dtype=float)
+
+    first_freshman, second_freshman = freshman[first_fencers], freshman[second_fencers]
+    # For every kind of bouts with freshmen: the bouts, the freshmen, their
+    # opponents, and their results
+    freshmen_bouts = ((first_freshman & ~second_freshman, first_fencers, second_fencers, results_first - 0.5),
+                      (second_freshman & ~first_freshman, second_fencers, first_fencers, 0.5 - results_first))
+    regular = ~(first_freshman | second_freshman)
+    adjustable = regular & (fenced_to == 0) & (max_points > 0)
+    last_bouts_of_days = numpy.append(ordinals[1:] != ordinals[:-1], True)
+    set_ends = numpy.flatnonzero(numpy.append(last_bouts_of_days[:-1] | (indices[1:] != indices[:-1]), True)) + 1
+    set_starts = numpy.append(0, set_ends[:-1])
+    freshmen_counts = numpy.add.reduceat((first_freshman ^ second_freshman).astype(int), set_starts).tolist()
+    regular_counts = numpy.add.reduceat(regular.astype(int), set_starts).tolist()
+    adjustable_counts = numpy.add.reduceat(adjustable.astype(int), set_starts).tolist()
+    bout_rows = zip(first_fencers.tolist(), second_fencers.tolist(), column("points_first").tolist(),
+                    column("points_second").tolist(), fenced_to.tolist())
+    for a, b, number_of_freshmen, number_of_regular, number_of_adjustable in \
+            itertools.izip(set_starts.tolist(), set_ends.tolist(), freshmen_counts, regular_counts,
+                           adjustable_counts):
+        if b - a < minimal_vectorized_set_size:
+            # For small sets, the overhead of the array operations is larger
+            # than their benefit.
+            participants = set()
+            for first_id, second_id, bout_points_first, bout_points_second, bout_fenced_to in bout_rows[a:b]:
+                set_preliminary_felo_ratings(fencers_by_id[first_id], fencers_by_id[second_id], bout_points_first,
+                                             bout_points_second, bout_fenced_to, parameters,
+                                             fencers_with_preliminary_felo_rating)
+                participants.add(first_id)
+                participants.add(second_id)
+            adopt_preliminary_felo_ratings(fencers_with_preliminary_felo_rating)
+            for fencer_id in participants:
+                fencer = fencers_by_id[fencer_id]
+                if not fencer.freshman:
+                    felo_ratings[fencer_id] = fencer.felo_rating_exact
+                    k_factors[fencer_id] = fencer.k_factor
+        else:
+            if number_of_freshmen:
+                # Bouts against freshmen only contribute to the estimates for
+                # the freshmen.
+                for selected, own_fencers, opponents, results in freshmen_bouts:
+                    selection = numpy.flatnonzero(selected[a:b]) + a
+                    if len(selection):
+                        weighting = weightings[selection]
+                        for fencer_id, total_weighting, total_result, total_felo_rating_opponents in \
+                                itertools.izip(*sum_up(own_fencers[selection], weighting,
+                                                       results[selection] * weighting,
+                                                       felo_ratings[opponents[selection]] * weighting)):
+                            fencer = fencers_by_id[fencer_id]
+                            fencer.total_weighting += total_weighting
+                            fencer.total_result += total_result
+                            fencer.total_felo_rating_opponents += total_felo_rating_opponents
+            if number_of_regular:
+                if number_of_regular == b - a:
+                    selection = slice(a, b)
+                else:
+                    selection = numpy.flatnonzero(regular[a:b]) + a
+                first, second = first_fencers[selection], second_fencers[selection]
+                weighting = weightings[selection]
+                expectation_first = 1 / (1 + 10**((felo_ratings[second] - felo_ratings[first])/400.0))
+                if number_of_adjustable:
+                    # Winning-hit adjustment, see `set_preliminary_felo_ratings`.
+                    adjusted = adjustable[selection] & (expectation_first < 1.0)
+                    expectation_first[adjusted] = apparent_expectation_value_array(expectation_first[adjusted],
+                                                                                   max_points[selection][adjusted])
+                improvement_first = (results_first[selection] - expectation_first) * weighting
+                participants, felo_rating_changes, weighting_changes = \
+                    sum_up(numpy.concatenate((first, second)),
+                           numpy.concatenate((k_factors[first] * improvement_first,
+                                              -k_factors[second] * improvement_first)),
+                           numpy.concatenate((weighting, weighting)))
+                participating_fencers = [fencers_by_id[fencer_id] for fencer_id in participants]
+                for fencer, felo_rating_change, weighting_change in \
+                        itertools.izip(participating_fencers, felo_rating_changes, weighting_changes):
+                    fencer.felo_rating_preliminary += felo_rating_change
+                    fencer.total_weighting_preliminary += weighting_change
+                fencers_with_preliminary_felo_rating.update(participating_fencers)
+                adopt_preliminary_felo_ratings(fencers_with_preliminary_felo_rating)
+                felo_ratings[participants] = [fencer.felo_rating_exact for fencer in participating_fencers]
+                k_factors[participants] = [fencer.k_factor for fencer in participating_fencers]
+        if checkpoints is not None and last_bouts_of_days[b - 1]:
+            checkpoints.record(int(ordinals[b - 1]), fencers)
+
+def rate_bouts(parameters, fencers, bouts, vectorized=False, history=None, start=0, checkpoints=None):
+    """Rates all bouts once, starting with the current state of the fencers.
+    Nothing is plotted, and nothing is recorded unless `history` or
+    `checkpoints` is given, so this is the fastest way to do it, e.g. for one
+    cycle of the bootstrapping.
+
+    :Parameters:
+      - `parameters`: all Felo parameters
+      - `fencers`: all fencers
+      - `bouts`: all bouts, sorted
+      - `vectorized`: if True, `rate_bouts_vectorized` is used.  Then, `bouts`
+        must be a `BoutTable`.  It is ignored if `history` is given.
+      - `history`: if given, the Felo ratings at the ends of the bout days
+        are recorded in it
+      - `start`: number of bouts at the beginning which are skipped because
+        they are already taken into account
+      - `checkpoints`: if given, the fencer states at the ends of the bout
+        days are recorded in it
+
+    :type parameters: dict
+    :type fencers: dict
+    :type bouts: iterable
+    :type vectorized: boolean
+    :type history: `RatingHistory`
+    :type start: int
+    :type checkpoints: `RatingCheckpoints`
+    """
+    def add_active_fencers(fencer, today_active_fencers):
+        if "/" not in fencer:
+            today_active_fencers.add(fencer)
+        else:
+            # We have a team actually.  FixMe: Not yet supported by the
+            # rest of the program
+            fencers = fencer.split("/")
+            for fencer in fencers:
+                today_active_fencers.add(fencer.strip())
+
+    if vectorized and history is None:
+        rate_bouts_vectorized(parameters, fencers, bouts, start, checkpoints)
+        return
+    if history is not None:
+        history.start(fencers)
+    today_active_fencers = set()
+    fencers_with_preliminary_felo_rating = set()
+    for first_fencer, second_fencer, points_first, points_second, fenced_to, current_bout_daynumber, \
+            last_bout_of_this_set, last_bout_of_this_day in bout_rows(bouts, fencers, start):
+        set_preliminary_felo_ratings(first_fencer, second_fencer, points_first, points_second, fenced_to,
+                                     parameters, fencers_with_preliminary_felo_rating)
+        if history is not None:
+            add_active_fencers(first_fencer.name, today_active_fencers)
+            add_active_fencers(second_fencer.name, today_active_fencers)
+        if last_bout_of_this_set:
+            # Not one *day* is over but one set of bouts which took place with
+            # unknown order.
+            adopt_preliminary_felo_ratings(fencers_with_preliminary_felo_rating)
+            if last_bout_of_this_day and checkpoints is not None:
+                checkpoints.record(current_bout_daynumber, fencers)
+        # We must have a new day, so we don't record points within one day
+        # (too fine-grained, and no real times are known within one day
+        # anyway).  Which of the days are plotted is decided later by
+        # `RatingHistory.plot_days`.
+        if last_bout_of_this_day and history is not None:
+            history.record(current_bout_daynumber, fencers, today_active_fencers)
+            today_active_fencers = set()
+
+def estimate_felo_rating(total_weighting, total_result, total_felo_rating_opponents, parameters):
+    """Estimates the Felo rating of a freshman according to the Austrian
+    Method, see http://www.chess.at/bundesspielleitung/OESB/oesb_tuwo_06.pdf
+    section 5.1 on page 43.
+
+    :Parameters:
+      - `total_weighting`: the weighting of all bouts of the freshman
+      - `total_result`: the weighted results of all bouts of the freshman
+      - `total_felo_rating_opponents`: the weighted Felo ratings of all
+        opponents of the freshman
+      - `parameters`: all Felo parameters
+
+    :type total_weighting: float
+    :type total_result: float
+    :type total_felo_rating_opponents: float
+    :type parameters: dict
+
+    :Return:
+      - the estimated Felo rating, or 0.0 if there are not enough bouts for an
+        estimate
+
+    :rtype: float
+    """
+    if total_weighting < parameters["5 point bouts for estimate"] or total_weighting == 0:
+        return 0.0
+    A = total_result / total_weighting
+    B = total_weighting / (total_weighting + 2)
+    average_felo_rating_opponents = total_felo_rating_opponents / total_weighting
+    return average_felo_rating_opponents + (A * B * 700)
+
+def bootstrapping_totals(fencer):
+    """Returns the numbers of a fencer which grow with every bootstrapping
+    cycle, see `skip_bootstrapping_cycles`.
+
+    :Parameters:
+      - `fencer`: the fencer
+
+    :type fencer: `Fencer`
+
+    :Return:
+      - the total weighting, the preliminary total weighting, the total result,
+        and the total Felo rating of the opponents
+
+    :rtype: tuple
+    """
+    return (fencer.total_weighting, fencer.total_weighting_preliminary, fencer.total_result,
+            fencer.total_felo_rating_opponents)
+
+def skip_bootstrapping_cycles(parameters, fencers, previous_totals, maxcycles):
+    """Skips bootstrapping cycles which would only change the estimates for the
+    freshmen.
+
+    Once the Felo ratings of the other fencers don't change anymore, every
+    further bootstrapping cycle adds the same amounts to the totals of every
+    fencer.  The estimates for the freshmen are calculated from these totals,
+    and they converge only slowly.  So instead of doing those cycles, this
+    function adds the amounts for as many cycles as are necessary until the
+    estimates change less than the bootstrapping threshold from one cycle to
+    the next.  It stops earlier if the k factor of a fencer would change
+    during that time.  This doesn't apply to freshmen and foreign fencers,
+    because their k factors are never used.
+
+    :Parameters:
+      - `parameters`: all Felo parameters
+      - `fencers`: all fencers
+      - `previous_totals`: the result of `bootstrapping_totals` for every fencer
+        in `fencers`, before the last cycle
+      - `maxcycles`: the maximal number of cycles to be skipped
+
+    :type parameters: dict
+    :type fencers: list
+    :type previous_totals: list
+    :type maxcycles: int
+
+    :Return:
+      - the number of skipped cycles
+
+    :rtype: int
+    """
+    threshold = parameters["threshold bootstrapping"]
+    increments = [[current - previous for current, previous in
+                   itertools.izip(bootstrapping_totals(fencer), totals)]
+                  for fencer, totals in itertools.izip(fencers, previous_totals)]
+    cycles = maxcycles
+    for fencer, (weighting_increment, __, __, __) in itertools.izip(fencers, increments):
+        if not (fencer.freshman or fencer.foreign_fencer) and weighting_increment > 0 and \
+                fencer.total_weighting < parameters["5 point bouts freshmen"]:
+            cycles = min(cycles, int(math.ceil((parameters["5 point bouts freshmen"] - fencer.total_weighting) /
+                                               weighting_increment)))
+    necessary_cycles = 0
+    for fencer, (weighting_increment, __, result_increment, opponents_increment) in \
+            itertools.izip(fencers, increments):
+        if fencer.freshman and weighting_increment > 0:
+            def estimate(k):
+                return estimate_felo_rating(fencer.total_weighting + k * weighting_increment,
+                                            fencer.total_result + k * result_increment,
+                                            fencer.total_felo_rating_opponents + k * opponents_increment,
+                                            parameters)
+            k = necessary_cycles
+            while k < cycles and abs(estimate(k + 1) - estimate(k)) >= threshold:
+                k += 1
+            necessary_cycles = k
+    for fencer, (weighting_increment, preliminary_weighting_increment, result_increment, opponents_increment) in \
+            itertools.izip(fencers, increments):
+        if weighting_increment or preliminary_weighting_increment:
+            fencer.total_weighting += necessary_cycles * weighting_increment
+            fencer.total_weighting_preliminary += necessary_cycles * preliminary_weighting_increment
+        if fencer.freshman:
+            fencer.total_result += necessary_cycles * result_increment
+            fencer.total_felo_rating_opponents += necessary_cycles * opponents_increment
+    return necessary_cycles
 
 class Fencer(object):
     """Class for fencer data.  Basically, it is a mere container for the
     attributes.
 
+    The instances use ``__slots__`` because there may be very many of them and
+    because they are accessed in the innermost loop of the rating calculation.
+    For the same reason, the k factor and the estimated Felo rating of
+    freshmen are cached.  They are re-calculated only if the numbers they
+    depend on change.
+
     :cvar fencers_with_preliminary_felo_rating: all fencers which still have
       their Felo number in felo_rating_preliminary, so that it must be copied to
-      felo_rating is a bout day is completely processed.
+      felo_rating is a bout day is completely processed.  It is only the
+      default for `set_preliminary_felo_ratings`; the calculations in this
+      module use sets of their own.
+
+    :ivar k_factor: k factor (see Elo formula) of this fencer.  It is kept up to
+      date by the fencer itself, so never set it from outside.
     
     :type fencers_with_preliminary_felo_rating: set
+    :type k_factor: int
     """
+    __slots__ = ("name", "hidden", "parameters", "foreign_fencer", "freshman", "initial_felo_rating",
+                 "initial_total_weighting", "initial_maximal_felo_rating", "maximal_felo_rating",
+                 "felo_rating_preliminary", "total_weighting_preliminary", "k_factor", "columnindex",
+                 "old_felo_rating", "__felo_rating", "__felo_rating_exact", "__k_factor",
+                 "__total_weighting", "__total_result", "__total_felo_rating_opponents")
     fencers_with_preliminary_felo_rating = set()
     def __init__(self, name, felo_rating, parameters, initial_total_weighting=0, maximal_felo_rating=0):
         """Class constructor.
@@ -964,13 +2349,16 @@ class Fencer(object):
         else:
             self.name = name
         self.parameters = parameters
+        self.freshman = felo_rating == 0
+        self.foreign_fencer = name.find("<") != -1
+        self.__felo_rating_exact = None
+        self.__k_factor = self.parameters["k factor others"]
+        self.__total_result = self.__total_felo_rating_opponents = 0.0
         # total_weighting is the number of bouts that the fencers has fenced,
         # in units of "bout to 5 points"-equivalents.
         self.total_weighting = self.initial_total_weighting = self.total_weighting_preliminary = \
             initial_total_weighting
-        self.__k_factor = self.parameters["k factor others"]
         self.maximal_felo_rating = 0
-        self.foreign_fencer = name.find("<") != -1
         if self.foreign_fencer:
             try:
                 self.__felo_rating = int(re.search(r"<(\d+)>", name).group(1))
@@ -978,50 +2366,126 @@ class Fencer(object):
                     raise ValueError
             except (ValueError, AttributeError):
                 raise Error("Foreign fencer '%s' has invalid Felo rating" % name)
-        self.freshman = felo_rating == 0
+            self.__felo_rating_exact = self.__felo_rating
         self.initial_maximal_felo_rating = maximal_felo_rating
         if not self.freshman:
             if maximal_felo_rating:
                 self.felo_rating = maximal_felo_rating
             self.felo_rating = self.initial_felo_rating = self.felo_rating_preliminary = felo_rating
         else:
-            self.total_felo_rating_opponents = 0.0
-            self.initial_felo_rating = 0
-            self.total_result = 0.0
+            self.initial_felo_rating = self.felo_rating_preliminary = 0
+    def __estimate_felo_rating(self):
+        return estimate_felo_rating(self.__total_weighting, self.__total_result,
+                                    self.__total_felo_rating_opponents, self.parameters)
     def __get_felo_rating_exact(self):
-        if not self.freshman:
-            return self.__felo_rating
-        else:
-            # Estimate initial Felo number according to the Austrian Method,
-            # see http://www.chess.at/bundesspielleitung/OESB/oesb_tuwo_06.pdf
-            # section 5.1 on page 43.
-            if self.total_weighting < self.parameters["5 point bouts for estimate"] or \
-                    self.total_weighting == 0:
-                return 0.0
-            A = self.total_result / self.total_weighting
-            B = self.total_weighting / (self.total_weighting + 2)
-            average_felo_rating_opponents = self.total_felo_rating_opponents / self.total_weighting
-            return average_felo_rating_opponents + (A * B * 700)
+        felo_rating_exact = self.__felo_rating_exact
+        if felo_rating_exact is None:
+            felo_rating_exact = self.__felo_rating_exact = self.__estimate_felo_rating()
+        return felo_rating_exact
     def __get_felo_rating(self):
         return int(round(self.felo_rating_exact))
     def __set_felo_rating(self, felo_rating):
         if not self.freshman and not self.foreign_fencer:
-            self.__felo_rating = max(felo_rating, self.parameters["minimal felo rating"])
-            self.maximal_felo_rating = max(self.maximal_felo_rating, self.felo_rating)
-            if self.__felo_rating >= self.parameters["felo rating top fencers"]:
-                self.__k_factor = self.parameters["k factor top fencers"]
+            parameters = self.parameters
+            if felo_rating < parameters["minimal felo rating"]:
+                felo_rating = parameters["minimal felo rating"]
+            self.__felo_rating = self.__felo_rating_exact = felo_rating
+            rounded_felo_rating = int(round(felo_rating))
+            if rounded_felo_rating > self.maximal_felo_rating:
+                self.maximal_felo_rating = rounded_felo_rating
+            if felo_rating >= parameters["felo rating top fencers"] and \
+                    self.__k_factor != parameters["k factor top fencers"]:
+                self.__k_factor = parameters["k factor top fencers"]
+                self.__update_k_factor()
     felo_rating_exact = property(__get_felo_rating_exact, __set_felo_rating,
                                  doc="""Felo rating with decimal fraction.
                                         @type: float""")
     felo_rating = property(__get_felo_rating, __set_felo_rating,
                            doc="""Felo rating, rounded to integer.
                                   @type: int""")
-    def __get_k_factor(self):
-        if self.total_weighting < self.parameters["5 point bouts freshmen"]:
-            return self.parameters["k factor freshmen"]
-        return self.__k_factor
-    k_factor = property(__get_k_factor, doc="""k factor (see Elo formula) of this fencer.
-                                               @type: int""")
+    def __update_k_factor(self):
+        if self.__total_weighting < self.parameters["5 point bouts freshmen"]:
+            self.k_factor = self.parameters["k factor freshmen"]
+        else:
+            self.k_factor = self.__k_factor
+    def __get_total_weighting(self):
+        return self.__total_weighting
+    def __set_total_weighting(self, total_weighting):
+        self.__total_weighting = total_weighting
+        # This is __update_k_factor() inlined, because this is called very often.
+        parameters = self.parameters
+        if total_weighting < parameters["5 point bouts freshmen"]:
+            self.k_factor = parameters["k factor freshmen"]
+        else:
+            self.k_factor = self.__k_factor
+        if self.freshman:
+            self.__felo_rating_exact = None
+    total_weighting = property(__get_total_weighting, __set_total_weighting,
+                               doc="""Number of bouts that the fencer has fenced, in units of
+                                      "bout to 5 points"-equivalents.
+                                      @type: float""")
+    def __get_total_result(self):
+        return self.__total_result
+    def __set_total_result(self, total_result):
+        self.__total_result = total_result
+        if self.freshman:
+            self.__felo_rating_exact = None
+    total_result = property(__get_total_result, __set_total_result,
+                            doc="""Sum of the weighted results of a freshman, used for
+                                   estimating the initial Felo rating.
+                                   @type: float""")
+    def __get_total_felo_rating_opponents(self):
+        return self.__total_felo_rating_opponents
+    def __set_total_felo_rating_opponents(self, total_felo_rating_opponents):
+        self.__total_felo_rating_opponents = total_felo_rating_opponents
+        if self.freshman:
+            self.__felo_rating_exact = None
+    total_felo_rating_opponents = property(__get_total_felo_rating_opponents,
+                                           __set_total_felo_rating_opponents,
+                                           doc="""Sum of the weighted Felo ratings of the opponents of a
+                                                  freshman, used for estimating the initial Felo
+                                                  rating.
+                                                  @type: float""")
+    def __get_initial_values(self):
+        return (self.hidden, self.foreign_fencer, self.initial_felo_rating, self.initial_total_weighting,
+                self.initial_maximal_felo_rating)
+    initial_values = property(__get_initial_values,
+                              doc="""The values with which the fencer was created.  Two fencers with
+                                     equal initial values have the same rating state if they fenced the
+                                     same bouts.
+                                     @type: tuple""")
+    def __get_state(self):
+        felo_rating = None if self.freshman else self.__felo_rating
+        return (felo_rating, self.felo_rating_preliminary, self.__total_weighting, self.total_weighting_preliminary,
+                self.__total_result, self.__total_felo_rating_opponents, self.maximal_felo_rating,
+                self.__k_factor)
+    def __set_state(self, state):
+        felo_rating, self.felo_rating_preliminary, total_weighting, self.total_weighting_preliminary, \
+            self.__total_result, self.__total_felo_rating_opponents, self.maximal_felo_rating, \
+            self.__k_factor = state
+        if not self.freshman:
+            self.__felo_rating = self.__felo_rating_exact = felo_rating
+        self.total_weighting = total_weighting
+    state = property(__get_state, __set_state,
+                     doc="""The complete rating state of the fencer, i.e. the real and
+                            preliminary Felo rating and totals, the maximal Felo rating, and
+                            the k factor.  It can be saved and restored later, e.g. for
+                            continuing a calculation.
+                            @type: tuple""")
+    def reset_felo_rating(self, felo_rating):
+        """Sets the Felo rating and the preliminary Felo rating without
+        changing the maximal Felo rating or the k factor.  This is used for
+        extrapolated Felo ratings during bootstrapping, which should leave no
+        other traces.  Freshmen and foreign fencers are not changed.
+
+        :Parameters:
+          - `felo_rating`: the new Felo rating
+
+        :type felo_rating: float
+        """
+        if not self.freshman and not self.foreign_fencer:
+            self.felo_rating_preliminary = felo_rating
+            self.__felo_rating = self.__felo_rating_exact = max(felo_rating, self.parameters["minimal felo rating"])
     def __cmp__(self, other):
         """Sort by Felo rating, descending."""
         return -cmp(self.felo_rating_exact, other.felo_rating_exact)
@@ -1032,19 +2496,1443 @@ class Fencer(object):
         """Informal string representation of the fencer."""
         return self.name + " (" + unicode(self.felo_rating) + ")"
 
-def calculate_felo_ratings(parameters, fencers, bouts, plot=False, estimate_freshmen=False,
-                           bootstrapping=False, maxcycles=1000, bootstrapping_callback=None):
-    """Calculate the new Felo ratings, taking a whole bunch of bouts into
-    account.  If wanted, generate plots with the development of the Felo
-    numbers.
+class AndersonAcceleration(object):
+    """Anderson acceleration of a fixed-point iteration x = G(x), where x is a
+    vector of floats.  Instead of simply continuing with G(x), the next point
+    is the combination of the last values of G which minimises the linearised
+    residual G(x) - x.  See D. G. Anderson, J. ACM 12 (1965), 547, or H. F.
+    Walker and P. Ni, SIAM J. Numer. Anal. 49 (2011), 1715.
 
-    :Parameters:
+    It only needs the values of G, and it is done in pure Python, which is
+    fast enough because the vectors are only as long as the number of fencers.
+    """
+    def __init__(self, depth=5):
+        """Class constructor.
+
+        :Parameters:
+          - `depth`: maximal number of previous iterations which are taken into
+            account
+
+        :type depth: int
+        """
+        self.depth = depth
+        self.__last_residual = self.__last_value = None
+        self.__residual_differences = []
+        self.__value_differences = []
+    def restart(self):
+        """Forgets all previous iterations, so that the next step is a plain
+        fixed-point step.
+        """
+        self.__last_residual = self.__last_value = None
+        self.__residual_differences = []
+        self.__value_differences = []
+    def extrapolate(self, x, value):
+        """Calculates the next point of the iteration.
+
+        :Parameters:
+          - `x`: the current point
+          - `value`: G(x)
+
+        :type x: list of float
+        :type value: list of float
+
+        :Return:
+          - the next point
+
+        :rtype: list of float
+        """
+        def dot(a, b):
+            return sum(itertools.imap(float.__mul__, a, b))
+        residual = [float(g - x_i) for g, x_i in itertools.izip(value, x)]
+        if self.__last_residual is not None:
+            self.__residual_differences.append([r - last_r for r, last_r in
+                                                itertools.izip(residual, self.__last_residual)])
+            self.__value_differences.append([g - last_g for g, last_g in
+                                             itertools.izip(value, self.__last_value)])
+            del self.__residual_differences[:-self.depth]
+            del self.__value_differences[:-self.depth]
+        self.__last_residual, self.__last_value = residual, value
+        if not self.__residual_differences:
+            return list(value)
+        # Solve the least-squares problem min |residual - D gamma| via the
+        # normal equations, with a little regularisation.
+        differences = self.__residual_differences
+        m = len(differences)
+        matrix = [[dot(differences[i], differences[j]) for j in range(m)] + [dot(differences[i], residual)]
+                  for i in range(m)]
+        regularisation = 1e-10 * max(sum(matrix[i][i] for i in range(m)), 1e-300)
+        for i in range(m):
+            matrix[i][i] += regularisation
+        for i in range(m):
+            pivot_row = max(range(i, m), key=lambda row: abs(matrix[row][i]))
+            matrix[i], matrix[pivot_row] = matrix[pivot_row], matrix[i]
+            if matrix[i][i] == 0:
+                self.restart()
+                return list(value)
+            for row in range(i + 1, m):
+                factor = matrix[row][i] / matrix[i][i]
+                for column in range(i, m + 1):
+                    matrix[row][column] -= factor * matrix[i][column]
+        gamma = [0.0] * m
+        for i in reversed(range(m)):
+            gamma[i] = (matrix[i][m] - sum(matrix[i][j] * gamma[j] for j in range(i + 1, m))) / matrix[i][i]
+        next_x = list(value)
+        for gamma_i, value_differences in itertools.izip(gamma, self.__value_differences):
+            for k, value_difference in enumerate(value_differences):
+                next_x[k] -= gamma_i * value_difference
+        return next_x
+
+class RatingCheckpoints(object):
+    """Rating states of all fencers at the ends of bout days, so that a
+    re-calculation of the Felo ratings can start at the latest day which is not
+    affected by changes of the bouts.
+
+    Normally, new bouts are only appended at the end of the bouts section.
+    Then, only the new bouts need to be rated.  A bout inserted in the past
+    invalidates only the checkpoints from its date onward.
+
+    A checkpoint is identified by the digest of the Felo parameters and of all
+    bouts up to and including its day, see `BoutTable.day_digests`.  Not every
+    day gets a checkpoint: Only the latest day and the days 1, 2, 4, 8, …  bout
+    days before it are kept.  So the number of checkpoints grows only
+    logarithmically with the number of bout days.
+
+    Additionally, checkpoints can be requested for certain dates, e.g. the ends
+    of seasons.  They are never thinned out.
+
+    Pass an instance to `calculate_felo_ratings` in all subsequent calls.  The
+    fencers passed to it must be in their initial state, i.e. freshly read
+    from the Felo file.
+
+    The checkpoints can be written to a snapshot file and read from it, so
+    that a later program run can continue where an earlier one stopped.
+    Snapshot files are passed around, so they contain only plain data (names,
+    numbers, and digests), serialised with `marshal`, and are checked
+    thoroughly when read.  Nothing in them can make the program execute code.
+
+    :cvar format_version: version of the snapshot file format.  Snapshot files
+      with another version are rejected.
+
+    :type format_version: int
+    """
+    format_version = 1
+    def __init__(self, dates=()):
+        """Class constructor.
+
+        :Parameters:
+          - `dates`: dates for which checkpoints are recorded in any case.  The
+            checkpoint belongs to the last bout day on or before the date.
+
+        :type dates: iterable of datetime.date
+        """
+        self.dates = list(dates)
+        # Every checkpoint is a tuple (ordinal, number of bouts, digest, fencer
+        # states), sorted chronologically.
+        self.__checkpoints = []
+        self.__initial_values = {}
+        self.__day_ordinals = []
+        self.__day_indices = {}
+        self.__pinned_days = set()
+        self.__pending_days = {}
+    def __last_day_until(self, date):
+        """Returns the date ordinal of the last bout day on or before `date`,
+        or None if there is no such day.
+        """
+        i = bisect.bisect_right(self.__day_ordinals, date.toordinal()) - 1
+        return self.__day_ordinals[i] if i >= 0 else None
+    def __thin_out(self):
+        """Removes checkpoints so that of the checkpoints with a distance of
+        2^(n-1) to 2^n-1 bout days to the latest day, only the latest one
+        remains.  Checkpoints for requested dates are kept.
+        """
+        number_of_days = len(self.__day_indices)
+        kept_checkpoints = {}
+        for checkpoint in self.__checkpoints:
+            if checkpoint[0] in self.__pinned_days:
+                kept_checkpoints[("pinned", checkpoint[0])] = checkpoint
+            else:
+                distance = number_of_days - 1 - self.__day_indices[checkpoint[0]]
+                kept_checkpoints[distance.bit_length()] = checkpoint
+        self.__checkpoints = sorted(kept_checkpoints.values())
+    def restore(self, parameters, fencers, bouts, resume=True):
+        """Prepares a calculation of the Felo ratings.  All checkpoints which
+        don't match the bouts are discarded.  If `resume` is True, the fencers
+        are set to the state of the latest valid checkpoint.  Additionally,
+        the days at which new checkpoints should be recorded are determined.
+
+        :Parameters:
+          - `parameters`: all Felo parameters
+          - `fencers`: all fencers, in their initial state
+          - `bouts`: all bouts, sorted chronologically
+          - `resume`: whether the fencers should be set to the state of the
+            latest checkpoint
+
+        :type parameters: dict
+        :type fencers: dict
+        :type bouts: BoutTable
+        :type resume: boolean
+
+        :Return:
+          - the number of bouts which are already taken into account by the
+            fencer states, i.e. the bouts which mustn't be rated again
+
+        :rtype: int
+        """
+        day_digests = bouts.day_digests(repr(sorted(parameters.items())))
+        initial_values = dict((name, fencer.initial_values) for name, fencer in fencers.iteritems())
+        for name, values in initial_values.iteritems():
+            if self.__initial_values.get(name, values) != values:
+                self.__checkpoints = []
+                break
+        self.__initial_values = initial_values
+        valid_days = set(day_digests)
+        self.__checkpoints = [checkpoint for checkpoint in self.__checkpoints if checkpoint[:3] in valid_days]
+        self.__day_ordinals = [ordinal for ordinal, __, __ in day_digests]
+        self.__day_indices = dict((ordinal, i) for i, ordinal in enumerate(self.__day_ordinals))
+        self.__pinned_days = set(self.__last_day_until(date) for date in self.dates)
+        self.__pinned_days.discard(None)
+        self.__thin_out()
+        # A requested date without checkpoint means that we must start before
+        # it.
+        missing_days = self.__pinned_days - set(checkpoint[0] for checkpoint in self.__checkpoints)
+        if missing_days:
+            first_missing_day = min(missing_days)
+            self.__checkpoints = [checkpoint for checkpoint in self.__checkpoints
+                                  if checkpoint[0] < first_missing_day]
+        start = 0
+        if resume and self.__checkpoints:
+            __, start, __, states = self.__checkpoints[-1]
+            for name, state in states.iteritems():
+                if name in fencers:
+                    fencers[name].state = state
+        else:
+            self.__checkpoints = []
+        self.__pending_days = {}
+        distance = 0
+        while distance < len(day_digests):
+            ordinal, number_of_bouts, digest = day_digests[-1 - distance]
+            if number_of_bouts <= start:
+                break
+            self.__pending_days[ordinal] = (number_of_bouts, digest)
+            distance = 2 * distance or 1
+        for ordinal in self.__pinned_days:
+            __, number_of_bouts, digest = day_digests[self.__day_indices[ordinal]]
+            if number_of_bouts > start:
+                self.__pending_days[ordinal] = (number_of_bouts, digest)
+        return start
+    def record(self, ordinal, fencers):
+        """Records the states of all fencers at the end of a bout day if this
+        day was chosen for a checkpoint by `restore`.  Must be called after
+        the preliminary Felo ratings of the day have been adopted.
+
+        :Parameters:
+          - `ordinal`: date ordinal of the bout day which is over
+          - `fencers`: all fencers
+
+        :type ordinal: int
+        :type fencers: dict
+        """
+        try:
+            number_of_bouts, digest = self.__pending_days.pop(ordinal)
+        except KeyError:
+            return
+        states = dict((name, fencer.state) for name, fencer in fencers.iteritems())
+        self.__checkpoints.append((ordinal, number_of_bouts, digest, states))
+        if not self.__pending_days:
+            self.__thin_out()
+    def __get_date(self):
+        if self.__checkpoints:
+            return datetime.date.fromordinal(self.__checkpoints[-1][0])
+    date = property(__get_date, doc="""The bout day of the latest checkpoint, or None if there is no
+                                       checkpoint.
+                                       @type: datetime.date""")
+    def write(self, snapshot_file, date=None):
+        """Writes the checkpoints to a snapshot file.
+
+        :Parameters:
+          - `snapshot_file`: the file to be written to; it must be opened in
+            binary mode
+          - `date`: if given, the snapshot contains the state as of this date,
+            i.e. only the checkpoints up to the last bout day on or before this
+            date.  This day must have a checkpoint, so it should be in `dates`
+            during the calculation.
+
+        :type snapshot_file: file
+        :type date: datetime.date
+
+        :Exceptions:
+          - `SnapshotError`: if there is no checkpoint for `date`
+        """
+        checkpoints = self.__checkpoints
+        if date is not None:
+            last_day = self.__last_day_until(date)
+            if last_day not in [checkpoint[0] for checkpoint in checkpoints]:
+                raise SnapshotError(_(u"There is no checkpoint for %s.") % date.isoformat())
+            checkpoints = [checkpoint for checkpoint in checkpoints if checkpoint[0] <= last_day]
+        # The fencer names are stored only once, and the states of every
+        # checkpoint are a list in the same order.
+        names = sorted(self.__initial_values)
+        snapshot = {"names": names,
+                    "initial values": [self.__initial_values[name] for name in names],
+                    "checkpoints": [(ordinal, number_of_bouts, digest, [states.get(name) for name in names])
+                                    for ordinal, number_of_bouts, digest, states in checkpoints]}
+        snapshot_file.write("Felo snapshot %d\n" % self.format_version)
+        snapshot_file.write(marshal.dumps(snapshot, 2))
+    def read(self, snapshot_file):
+        """Reads checkpoints from a snapshot file written by `write`.  They
+        replace all current checkpoints.
+
+        :Parameters:
+          - `snapshot_file`: the file to be read from; it must be opened in
+            binary mode
+
+        :type snapshot_file: file
+
+        :Exceptions:
+          - `SnapshotError`: if the file is not a valid snapshot file of the
+            current format version
+        """
+        if snapshot_file.readline() != "Felo snapshot %d\n" % self.format_version:
+            raise SnapshotError(_(u"Invalid snapshot file or unsupported snapshot version."))
+        # Whatever goes wrong while decoding the file means that it is
+        # corrupt.
+        try:
+            snapshot = marshal.loads(snapshot_file.read())
+            names = snapshot["names"]
+            initial_values = snapshot["initial values"]
+            if not (isinstance(names, list) and isinstance(initial_values, list) and
+                    len(names) == len(initial_values) and
+                    all(isinstance(name, unicode) for name in names) and
+                    all(self.__is_tuple_of_numbers(values, 5) for values in initial_values)):
+                raise SnapshotError(_(u"Snapshot file is corrupt."))
+            checkpoints = []
+            for ordinal, number_of_bouts, digest, states in snapshot["checkpoints"]:
+                if not (isinstance(ordinal, int) and isinstance(number_of_bouts, int) and
+                        isinstance(digest, str) and isinstance(states, list) and len(states) == len(names) and
+                        all(state is None or self.__is_tuple_of_numbers(state, 8) for state in states)):
+                    raise SnapshotError(_(u"Snapshot file is corrupt."))
+                checkpoints.append((ordinal, number_of_bouts, digest,
+                                    dict((name, state) for name, state in zip(names, states) if state is not None)))
+            initial_values = dict(zip(names, initial_values))
+        except SnapshotError:
+            raise
+        except Exception:
+            raise SnapshotError(_(u"Snapshot file is corrupt."))
+        ordinals = [checkpoint[0] for checkpoint in checkpoints]
+        if ordinals != sorted(set(ordinals)):
+            raise SnapshotError(_(u"Snapshot file is corrupt."))
+        self.__initial_values, self.__checkpoints = initial_values, checkpoints
+        self.__day_ordinals = []
+        self.__day_indices = {}
+        self.__pending_days = {}
+    @staticmethod
+    def __is_tuple_of_numbers(values, length):
+        """Returns whether `values` is a tuple of the given length which
+        contains only numbers, booleans, and None, like a fencer state or the
+        initial values of a fencer.
+        """
+        return isinstance(values, tuple) and len(values) == length and \
+            all(value is None or isinstance(value, (int, long, float)) for value in values)
+
+class RatingHistory(object):
+    """Development of the Felo ratings of all fencers, recorded at the end of
+    every bout day by `calculate_felo_ratings`.
+
+    For every fencer, only the bout days on which he fenced are stored, as two
+    compact arrays with the day numbers (date ordinals) and the Felo ratings at
+    the end of these days.  On all other days, his Felo rating is the one of
+    the last day on which he fenced, or his initial Felo rating.  So the
+    history is recorded once and can be used for the plots, for exports, and
+    for queries like `felo_rating_at` and `ranking_at`, without rating the
+    bouts again.  They find the day by binary search.
+
+    :ivar days: the day numbers of all bout days, in chronological order
+    :ivar initial_felo_ratings: the Felo ratings of all fencers before the
+      first bout day, with the fencer names as keys
+    :ivar visible_fencers: the names of the fencers who are neither hidden nor
+      freshmen nor foreign fencers, i.e. who are in the ranking of
+      `calculate_felo_ratings`
+
+    :type days: array.array of int
+    :type initial_felo_ratings: dict
+    :type visible_fencers: set
+    """
+    def __init__(self):
+        """Class constructor.  The history is empty at first.
+        """
+        self.days = array.array("i")
+        self.initial_felo_ratings = {}
+        self.visible_fencers = set()
+        self.__fencer_days = {}
+        self.__felo_ratings = {}
+    def start(self, fencers):
+        """Removes everything recorded so far, takes the current Felo
+        ratings of all fencers as the initial ones, and determines the
+        `visible_fencers`.
+
+        :Parameters:
+          - `fencers`: all fencers
+
+        :type fencers: dict
+        """
+        self.days = array.array("i")
+        self.initial_felo_ratings = dict((name, fencer.felo_rating_exact) for name, fencer in fencers.iteritems())
+        self.visible_fencers = set(name for name, fencer in fencers.iteritems()
+                                   if not (fencer.hidden or fencer.freshman or fencer.foreign_fencer))
+        self.__fencer_days = {}
+        self.__felo_ratings = {}
+    def record(self, day, fencers, active_fencers):
+        """Records the end of a bout day.
+
+        :Parameters:
+          - `day`: the day number of the bout day
+          - `fencers`: all fencers
+          - `active_fencers`: the names of the fencers who fenced on that day.
+            Names which are not in `fencers` are ignored.
+
+        :type day: int
+        :type fencers: dict
+        :type active_fencers: set
+        """
+        self.days.append(day)
+        for name in active_fencers:
+            fencer = fencers.get(name)
+            if fencer is not None:
+                if name not in self.__fencer_days:
+                    self.__fencer_days[name] = array.array("i")
+                    self.__felo_ratings[name] = array.array("d")
+                self.__fencer_days[name].append(day)
+                self.__felo_ratings[name].append(fencer.felo_rating_exact)
+    def fencer_history(self, name):
+        """Returns the recorded bout days of a fencer.
+
+        :Parameters:
+          - `name`: name of the fencer
+
+        :type name: unicode
+
+        :Return:
+          - the day numbers of the days on which the fencer fenced
+          - his Felo ratings at the end of these days
+
+        :rtype: array.array of int, array.array of float
+        """
+        return self.__fencer_days.get(name, array.array("i")), self.__felo_ratings.get(name, array.array("d"))
+    def __fencer_index(self, name, ordinal, lo=0):
+        """Returns the index of the last recorded day of a fencer on or before a
+        date ordinal, or -1 if he hasn't fenced until then.
+        """
+        return bisect.bisect_right(self.__fencer_days.get(name, ()), ordinal, lo) - 1
+    def felo_rating_at(self, name, date):
+        """Returns the Felo rating of a fencer at the end of a certain day.
+
+        :Parameters:
+          - `name`: name of the fencer
+          - `date`: the day
+
+        :type name: unicode
+        :type date: datetime.date
+
+        :Return:
+          the Felo rating after all bouts on or before `date`
+
+        :rtype: float
+
+        :Exceptions:
+          - `Error`: if the fencer is unknown
+        """
+        try:
+            felo_rating = self.initial_felo_ratings[name]
+        except KeyError:
+            raise Error(_(u"Unknown fencer '%s'.") % name)
+        i = self.__fencer_index(name, date.toordinal())
+        return self.__felo_ratings[name][i] if i >= 0 else felo_rating
+    def felo_ratings_at(self, name, dates):
+        """Returns the Felo ratings of a fencer at the end of many days.
+
+        :Parameters:
+          - `name`: name of the fencer
+          - `dates`: the days
+
+        :type name: unicode
+        :type dates: iterable of datetime.date
+
+        :Return:
+          the Felo ratings after all bouts on or before the respective dates
+
+        :rtype: list of float
+
+        :Exceptions:
+          - `Error`: if the fencer is unknown
+        """
+        try:
+            initial_felo_rating = self.initial_felo_ratings[name]
+        except KeyError:
+            raise Error(_(u"Unknown fencer '%s'.") % name)
+        ordinals = [date.toordinal() for date in dates]
+        felo_ratings = self.__felo_ratings.get(name)
+        result = [None] * len(ordinals)
+        # Going through the dates in chronological order, the search can
+        # start where the previous one ended.
+        i = 0
+        for index in sorted(range(len(ordinals)), key=ordinals.__getitem__):
+            i = self.__fencer_index(name, ordinals[index], max(i, 0))
+            result[index] = felo_ratings[i] if i >= 0 else initial_felo_rating
+        return result
+    def ranking_at(self, date, names=None):
+        """Returns the ranking at the end of a certain day.
+
+        :Parameters:
+          - `date`: the day
+          - `names`: the names of the fencers in the ranking.  Default:
+            `visible_fencers`, like in the ranking of `calculate_felo_ratings`.
+
+        :type date: datetime.date
+        :type names: iterable of unicode
+
+        :Return:
+          the fencers as (name, Felo rating) tuples, sorted by descending Felo
+          rating, and by name for equal Felo ratings
+
+        :rtype: list of (unicode, float)
+
+        :Exceptions:
+          - `Error`: if a fencer is unknown
+        """
+        return self.rankings_at([date], names)[0]
+    def rankings_at(self, dates, names=None):
+        """Returns the rankings at the end of many days, e.g. at the ends of
+        all seasons.
+
+        :Parameters:
+          - `dates`: the days
+          - `names`: the names of the fencers in the rankings.  Default:
+            `visible_fencers`, like in the ranking of `calculate_felo_ratings`.
+
+        :type dates: iterable of datetime.date
+        :type names: iterable of unicode
+
+        :Return:
+          one ranking for every date, see `ranking_at`
+
+        :rtype: list of list of (unicode, float)
+
+        :Exceptions:
+          - `Error`: if a fencer is unknown
+        """
+        dates = list(dates)
+        names = self.visible_fencers if names is None else list(names)
+        rankings = [[] for date in dates]
+        for name in names:
+            for ranking, felo_rating in zip(rankings, self.felo_ratings_at(name, dates)):
+                ranking.append((name, felo_rating))
+        for ranking in rankings:
+            ranking.sort(key=lambda entry: (-entry[1], entry[0]))
+        return rankings
+    def plot_days(self, earliest_date, maximal_days, min_tic_distance):
+        """Returns the bout days which are plotted.  These are the days not
+        before `earliest_date` and at most `maximal_days` before today.
+
+        :Parameters:
+          - `earliest_date`: the earliest date in the plot in ISO notation
+          - `maximal_days`: the maximal age of a day in the plot
+          - `min_tic_distance`: the minimal distance of two labels on the x
+            axis in days
+
+        :type earliest_date: str
+        :type maximal_days: int
+        :type min_tic_distance: int
+
+        :Return:
+          - the day numbers of the plotted days
+          - the day numbers which get labels on the x axis
+
+        :rtype: list of int, list of int
+        """
+        year, month, day, __, __, __, __, __, __ = time.localtime()
+        current_daynumber = datetime.date(year, month, day).toordinal()
+        days = [day for day in self.days if datetime.date.fromordinal(day).isoformat() >= earliest_date and
+                current_daynumber - day <= maximal_days]
+        # Generate tic marks not too densely; labels must be at least the the
+        # minimal tic distance apart.
+        tic_days = []
+        last_tic_day = 0
+        for day in days:
+            if day - last_tic_day >= min_tic_distance:
+                last_tic_day = day
+                tic_days.append(day)
+        return days, tic_days
+    def plot_curve(self, name, days):
+        """Returns the Felo ratings of a fencer for a plot.  Only the days on
+        which he fenced get a value, so that the lines in the plot are not
+        cluttered with points in which nothing happened.  Exceptions are the
+        first day of the plot and the last bout day, so that every line reaches
+        from the left to the right border.
+
+        :Parameters:
+          - `name`: name of the fencer
+          - `days`: the day numbers of the plotted days, in chronological
+            order, see `plot_days`
+
+        :type name: unicode
+        :type days: list of int
+
+        :Return:
+          the Felo ratings at the end of `days`, with ``None`` for all days on
+          which the fencer didn't fence
+
+        :rtype: list of float
+        """
+        fencer_days, felo_ratings = self.fencer_history(name)
+        last_day = self.days[-1] if self.days else None
+        felo_rating = self.initial_felo_ratings.get(name)
+        curve = []
+        i = 0
+        for j, day in enumerate(days):
+            active = False
+            while i < len(fencer_days) and fencer_days[i] <= day:
+                felo_rating = felo_ratings[i]
+                active = fencer_days[i] == day
+                i += 1
+            curve.append(felo_rating if active or j == 0 or day == last_day else None)
+        return curve
+
+class BootstrappingWarmStart(object):
+    """Converged Felo ratings of earlier bootstrappings, so that the next
+    bootstrapping of the same group starts from them rather than from the
+    initial Felo ratings.  If only a few bouts were added in the meantime, it
+    converges within a few cycles.
+
+    Every group (identified by its name) gets one file in the cache directory.
+    It contains the rating states of all bootstrapped fencers at the fixed
+    point (see `Fencer.state`), together with the digest of the Felo
+    parameters and of the bouts they were calculated from, see
+    `BoutTable.day_digests`.  The states are only used if these bouts are
+    still the beginning of the current bouts, i.e. if bouts were only appended
+    since then.  Fencers who are new, or whose initial values have changed,
+    start in their initial state as usual.
+
+    The estimates of the freshmen converge most slowly, because their totals
+    grow with every cycle, so that later cycles change them less and less.  So
+    their totals are restored, too.  But if a freshman has new bouts, his old
+    totals would outweigh them for very many cycles.  Therefore, such a
+    freshman starts in his initial state.
+
+    Like the files of `ParsingCache`, the files contain only plain data
+    (names, numbers, and digests), serialised with `marshal`, and the warm
+    start never raises exceptions of its own.  Files which can't be read or
+    which are unusable are ignored.
+
+    :ivar directory: the directory where the files are stored
+
+    :type directory: string
+
+    :cvar format_version: version of the file format.  Files with another
+      version are ignored.
+
+    :type format_version: int
+    """
+    format_version = 2
+    def __init__(self, directory=None):
+        """Class constructor.
+
+        :Parameters:
+          - `directory`: the directory where the files are stored.  Default:
+            `default_cache_directory()`
+
+        :type directory: string
+        """
+        self.directory = directory or default_cache_directory()
+        self.__entries = {}
+    def restore(self, parameters, fencers, bouts):
+        """Sets the rating states of the fencers to the result of the last
+        bootstrapping of their group, if it is still applicable.  Foreign
+        fencers are not changed.
+
+        :Parameters:
+          - `parameters`: all Felo parameters
+          - `fencers`: all fencers, in their initial state
+          - `bouts`: all bouts, sorted
+
+        :type parameters: dict
+        :type fencers: dict
+        :type bouts: `BoutTable`
+
+        :Return:
+          - the number of fencers whose state was set
+
+        :rtype: int
+        """
+        key = self.__key(parameters)
+        entry = self.__entries.get(key) or self.__load(key)
+        if not entry or entry["bouts"] not in self.__fingerprints(parameters, bouts):
+            return 0
+        states = entry["states"]
+        weightings = self.__freshman_weightings(parameters, fencers, bouts)
+        number_of_fencers = 0
+        for fencer in fencers.values():
+            if fencer.name in states and not fencer.foreign_fencer:
+                initial_values, state, weighting = states[fencer.name]
+                if initial_values != fencer.initial_values or \
+                        fencer.freshman and weighting != weightings.get(fencer.name):
+                    continue
+                fencer.state = state
+                number_of_fencers += 1
+        return number_of_fencers
+    def store(self, parameters, fencers, bouts):
+        """Saves the current rating states of the fencers as the result of a
+        bootstrapping, for the next call of `restore`.
+
+        :Parameters:
+          - `parameters`: all Felo parameters
+          - `fencers`: all fencers, in their states at the fixed point
+          - `bouts`: all bouts, sorted
+
+        :type parameters: dict
+        :type fencers: dict
+        :type bouts: `BoutTable`
+        """
+        key = self.__key(parameters)
+        weightings = self.__freshman_weightings(parameters, fencers, bouts)
+        states = dict((fencer.name, (fencer.initial_values, fencer.state, weightings.get(fencer.name)))
+                      for fencer in fencers.values() if not fencer.foreign_fencer)
+        entry = {"format version": self.format_version, "bouts": self.__fingerprints(parameters, bouts)[-1],
+                 "states": states}
+        self.__entries[key] = entry
+        filename = self.__filename(key)
+        temporary_filename = filename + ".tmp"
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            warm_start_file = open(temporary_filename, "wb")
+            try:
+                warm_start_file.write(marshal.dumps(entry, 2))
+            finally:
+                warm_start_file.close()
+            if os.path.exists(filename):
+                # Necessary on Windows
+                os.remove(filename)
+            os.rename(temporary_filename, filename)
+        except (IOError, OSError, ValueError):
+            pass
+    @staticmethod
+    def __freshman_weightings(parameters, fencers, bouts):
+        """Returns the weighting which one pass over the bouts adds to the
+        total weighting of every freshman, with the same weighting of a bout as
+        in `set_preliminary_felo_ratings`.  It changes exactly if the freshman
+        has got new bouts.
+        """
+        names = bouts.names
+        freshmen = [fencers[name].freshman for name in names]
+        weightings = {}
+        for first_id, second_id, points_first, points_second, fenced_to in \
+                itertools.izip(bouts.first_fencers, bouts.second_fencers, bouts.points_first, bouts.points_second,
+                               bouts.fenced_to):
+            if freshmen[first_id] == freshmen[second_id]:
+                continue
+            if fenced_to == 0:
+                weighting = parameters["weighting team bout"]
+            else:
+                weighting = (points_first + points_second) / 6.76
+            name = names[first_id] if freshmen[first_id] else names[second_id]
+            weightings[name] = weightings.get(name, 0) + weighting
+        return weightings
+    @staticmethod
+    def __fingerprints(parameters, bouts):
+        """Returns the fingerprints of all beginnings of the bouts which end
+        with a bout day, in chronological order.  A fingerprint is the number
+        of bouts together with their digest.  The first one stands for no bouts
+        at all.
+        """
+        seed = repr(sorted(parameters.items()))
+        return [(0, hashlib.sha1(seed).digest())] + \
+            [(number_of_bouts, digest) for __, number_of_bouts, digest in bouts.day_digests(seed)]
+    @staticmethod
+    def __key(parameters):
+        return hashlib.sha1(parameters["groupname"].encode("utf-8")).hexdigest()
+    @staticmethod
+    def __is_tuple_of_numbers(values, length):
+        """Returns whether `values` is a tuple of the given length which
+        contains only numbers, booleans, and None.
+        """
+        return isinstance(values, tuple) and len(values) == length and \
+            all(value is None or isinstance(value, (int, long, float)) for value in values)
+    def __filename(self, key):
+        return os.path.join(self.directory, key + ".warm")
+    def __load(self, key):
+        try:
+            warm_start_file = open(self.__filename(key), "rb")
+            try:
+                entry = marshal.loads(warm_start_file.read())
+            finally:
+                warm_start_file.close()
+        except Exception:
+            # Besides I/O errors, a corrupt file may make marshal raise
+            # ValueError, EOFError, or TypeError.
+            return None
+        if not isinstance(entry, dict) or entry.get("format version") != self.format_version or \
+                not isinstance(entry.get("states"), dict) or not isinstance(entry.get("bouts"), tuple):
+            return None
+        # Only take over entries which `Fencer.state` accepts.
+        for name, values in entry["states"].iteritems():
+            if not (isinstance(name, unicode) and isinstance(values, tuple) and len(values) == 3 and
+                    self.__is_tuple_of_numbers(values[0], 5) and self.__is_tuple_of_numbers(values[1], 8) and
+                    (values[2] is None or isinstance(values[2], (int, long, float)))):
+                return None
+        self.__entries[key] = entry
+        return entry
+
+class CancellationToken(object):
+    """Token with which a running bootstrapping can be cancelled, e.g. from a
+    button of a graphical user interface.  It works across the worker
+    processes of `bootstrap_felo_ratings_in_parallel`, too.
+    """
+    def __init__(self):
+        self.__event = multiprocessing.Event()
+    def cancel(self):
+        """Requests the cancellation.  The bootstrapping stops after the
+        current cycle.
+        """
+        self.__event.set()
+    def __get_cancelled(self):
+        return self.__event.is_set()
+    cancelled = property(__get_cancelled, doc="""Whether the cancellation was requested.
+                                                 @type: boolean""")
+
+def bootstrapping_report(cycle, fencers, threshold, seconds, number_of_slowest_fencers=5):
+    """Summarises a bootstrapping cycle for the monitor of
+    `bootstrap_felo_ratings`.  The change of a fencer is the difference
+    between the Felo rating at the start of the cycle and at its end.  Foreign
+    fencers are not taken into account.
+
+    :Parameters:
+      - `cycle`: the number of the cycle, starting at 1
+      - `fencers`: all fencers, with their Felo ratings at the start of the
+        cycle in the attribute ``old_felo_rating``
+      - `threshold`: the bootstrapping threshold
+      - `seconds`: the duration of the cycle in seconds
+      - `number_of_slowest_fencers`: how many of the fencers with the largest
+        changes are included
+
+    :type cycle: int
+    :type fencers: list
+    :type threshold: float
+    :type seconds: float
+    :type number_of_slowest_fencers: int
+
+    :Return:
+      - the report with the keys ``"cycle"``, ``"maximal change"``, ``"RMS
+        change"``, ``"unconverged fencers"`` (the number of fencers whose
+        change is not below the threshold), ``"slowest fencers"`` (a list of
+        the names and changes of the fencers with the largest changes, largest
+        first), and ``"seconds"``.  It can be converted to JSON as is.
+
+    :rtype: dict
+    """
+    changes = [(abs(fencer.old_felo_rating - fencer.felo_rating_exact), fencer.name)
+               for fencer in fencers if not fencer.foreign_fencer]
+    slowest_fencers = heapq.nlargest(number_of_slowest_fencers, changes)
+    return {"cycle": cycle, "maximal change": max(changes)[0] if changes else 0,
+            "RMS change": math.sqrt(sum([change**2 for change, __ in changes]) / len(changes)) if changes else 0,
+            "unconverged fencers": len([None for change, __ in changes if change >= threshold]),
+            "slowest fencers": [[name, change] for change, name in slowest_fencers], "seconds": seconds}
+
+def bootstrap_felo_ratings(parameters, fencers, bouts, maxcycles=1000, bootstrapping_callback=None,
+                           vectorized=False, accelerated=False, statistics=None, deadline=None, cancellation=None,
+                           monitor=None):
+    """Goes through the bouts multiple times, using the resulting Felo ratings
+    as new starting ratings, until they have converged.  Afterwards, the
+    fencers are in the state at the fixed point, so that a last pass over the
+    bouts yields the final Felo ratings.
+
+    The residual of a cycle is the largest change of a Felo rating in it.  The
+    bootstrapping has converged if it is below the bootstrapping threshold.
+
+    If a deadline or a cancellation token is given, the bootstrapping may stop
+    early, and it doesn't raise an exception if `maxcycles` is not enough.  If
+    it stops without convergence, the fencers are left in the state after the
+    cycle with the smallest residual.
+
+    :Parameters:
+      - `parameters`: all Felo parameters
+      - `fencers`: all fencers
+      - `bouts`: all bouts, sorted
+      - `maxcycles`: the maximal number of cycles.  If it is not enough, an
+        exception is raised.
+      - `bootstrapping_callback`: callabale object which takes as the only
+        parameter a float between 0 and 1 indicating the progress
+      - `vectorized`: if True, the bouts are rated with
+        `rate_bouts_vectorized`.  Then, `bouts` must be a `BoutTable`.
+      - `accelerated`: if True, the bootstrapping is accelerated with
+        `AndersonAcceleration` and `skip_bootstrapping_cycles`.  Only the Felo
+        ratings of regular fencers are guaranteed to be the same as without
+        acceleration; the estimates of freshmen may differ slightly.
+      - `statistics`: if given, ``"bootstrapping cycles"``, ``"bootstrapping
+        residual"``, and, if accelerated, ``"skipped bootstrapping cycles"``
+        are written into it
+      - `deadline`: point in time (as returned by ``time.time()``) after which
+        no new cycle is started
+      - `cancellation`: token with which the bootstrapping can be stopped
+        after the current cycle
+      - `monitor`: callable object which is called after every cycle with
+        the result of `bootstrapping_report` as the only parameter
+
+    :type parameters: dict
+    :type fencers: dict
+    :type bouts: list or `BoutTable`
+    :type maxcycles: int
+    :type bootstrapping_callback: callable
+    :type vectorized: boolean
+    :type accelerated: boolean
+    :type statistics: dict
+    :type deadline: float
+    :type cancellation: `CancellationToken`
+    :type monitor: callable
+
+    :Return:
+      - the residual of the resulting state
+
+    :rtype: float
+
+    :Exceptions:
+      - `BootstrappingError`: if the bootstrapping didn't converge
+    """
+    threshold = parameters["threshold bootstrapping"]
+    all_fencers = fencers.values()
+    best_effort = deadline is not None or cancellation is not None
+    if best_effort:
+        smallest_residual, best_states = None, None
+    if accelerated:
+        acceleration = AndersonAcceleration()
+        extrapolated_fencers = [fencer for fencer in all_fencers if not (fencer.freshman or fencer.foreign_fencer)]
+        skipped_cycles = 0
+    for i in range(maxcycles):
+        if i % 10 == 0 and bootstrapping_callback:
+            bootstrapping_callback(float(i)/(maxcycles-1))
+        if monitor:
+            start_time = time.time()
+        for fencer in all_fencers:
+            fencer.old_felo_rating = fencer.felo_rating_exact
+        if accelerated:
+            previous_totals = [bootstrapping_totals(fencer) for fencer in all_fencers]
+        rate_bouts(parameters, fencers, bouts, vectorized)
+        residual = max([abs(fencer.old_felo_rating - fencer.felo_rating_exact) for fencer in all_fencers] or [0])
+        if statistics is not None:
+            statistics["bootstrapping cycles"] = i + 1
+            statistics["bootstrapping residual"] = residual
+        if monitor:
+            monitor(bootstrapping_report(i + 1, all_fencers, threshold, time.time() - start_time))
+        if residual < threshold:
+            break
+        if best_effort:
+            if smallest_residual is None or residual < smallest_residual:
+                smallest_residual, best_states = residual, [fencer.state for fencer in all_fencers]
+            if (deadline is not None and time.time() >= deadline) or \
+                    (cancellation is not None and cancellation.cancelled) or i == maxcycles - 1:
+                for fencer, state in itertools.izip(all_fencers, best_states):
+                    fencer.state = state
+                if statistics is not None:
+                    statistics["bootstrapping residual"] = smallest_residual
+                return smallest_residual
+        if accelerated:
+            # The convergence test above is always done with the result of a
+            # plain cycle, so the fixed point is the same as without
+            # acceleration.
+            old_felo_ratings = [fencer.old_felo_rating for fencer in extrapolated_fencers]
+            felo_ratings = [fencer.felo_rating_exact for fencer in extrapolated_fencers]
+            if max([abs(felo_rating - old_felo_rating) for felo_rating, old_felo_rating
+                    in itertools.izip(felo_ratings, old_felo_ratings)] or [0]) < threshold:
+                skipped_cycles += skip_bootstrapping_cycles(parameters, all_fencers, previous_totals,
+                                                            maxcycles - i - 1)
+                if statistics is not None:
+                    statistics["skipped bootstrapping cycles"] = skipped_cycles
+            for fencer, felo_rating in itertools.izip(extrapolated_fencers,
+                                                      acceleration.extrapolate(old_felo_ratings, felo_ratings)):
+                fencer.reset_felo_rating(felo_rating)
+    if i == maxcycles - 1 and not best_effort:
+        raise BootstrappingError(_(u"The bootstrapping didn't converge."))
+    return residual
+
+def connected_components(fencers, bouts):
+    """Splits the fencers and bouts into groups which don't influence each
+    other.  Two fencers are in the same group if they fenced against each
+    other, directly or through common opponents.  Foreign fencers don't
+    connect groups, because their Felo ratings never change.  Bouts between
+    two foreign fencers belong to no group, and neither do fencers without
+    bouts.
+
+    :Parameters:
+      - `fencers`: all fencers
+      - `bouts`: all bouts, sorted
+
+    :type fencers: dict
+    :type bouts: `BoutTable`
+
+    :Return:
+      - the groups as tuples with the names of their fencers (without
+        foreign fencers) and a `BoutTable` with their bouts, in the order of
+        `bouts`.  The groups with the most
+        bouts come first.
+
+    :rtype: list
+    """
+    names = bouts.names
+    foreign = [fencers[name].foreign_fencer for name in names]
+    parents = range(len(names))
+    def find(fencer_id):
+        while parents[fencer_id] != fencer_id:
+            parents[fencer_id] = parents[parents[fencer_id]]
+            fencer_id = parents[fencer_id]
+        return fencer_id
+    for first_id, second_id in itertools.izip(bouts.first_fencers, bouts.second_fencers):
+        if not (foreign[first_id] or foreign[second_id]):
+            parents[find(first_id)] = find(second_id)
+    groups = {}
+    for i in xrange(len(bouts)):
+        first_id, second_id = bouts.first_fencers[i], bouts.second_fencers[i]
+        fencer_id = second_id if foreign[first_id] else first_id
+        if foreign[fencer_id]:
+            continue
+        group_bouts = groups.setdefault(find(fencer_id), BoutTable())
+        group_bouts.add(bouts.ordinals[i], bouts.indices[i], names[first_id], names[second_id],
+                        bouts.points_first[i], bouts.points_second[i], bouts.fenced_to[i])
+    components = []
+    for group_bouts in groups.values():
+        group_names = [name for name in group_bouts.names if not fencers[name].foreign_fencer]
+        components.append((group_names, group_bouts))
+    components.sort(key=lambda component: len(component[1]), reverse=True)
+    return components
+
+worker_cancellation = None
+
+def initialize_worker(cancellation):
+    """Initialises a worker process of `bootstrap_felo_ratings_in_parallel`.
+    The cancellation token can't be passed with the tasks, because it must be
+    inherited by the worker processes.
+
+    :Parameters:
+      - `cancellation`: token with which the bootstrapping can be stopped
+
+    :type cancellation: `CancellationToken`
+    """
+    global worker_cancellation
+    worker_cancellation = cancellation
+
+def bootstrap_component(arguments):
+    """Bootstraps one group of fencers of `connected_components` in a worker
+    process of `bootstrap_felo_ratings_in_parallel`.  The fencers are
+    re-created in the worker from their initial values and current states.
+
+    :Parameters:
+      - `arguments`: the index of the group, the Felo parameters, a list with
+        the name, initial Felo rating, initial total weighting, initial
+        maximal Felo rating, and state of every fencer of the group (hidden
+        fencers in parentheses), the bouts of the group, the arguments
+        `maxcycles`, `vectorized`, `accelerated`, `deadline`, and
+        `cancellation` of `bootstrap_felo_ratings`, and whether reports should
+        be made.  If no cancellation token is given, the one of
+        `initialize_worker` is used.
+
+    :type arguments: tuple
+
+    :Return:
+      - the states of the fencers of the group at the fixed point (or the best
+        state so far), the statistics of the bootstrapping, and the reports of
+        all cycles (if wanted), see `bootstrapping_report`
+
+    :rtype: dict, dict, list
+
+    :Exceptions:
+      - `BootstrappingError`: if the bootstrapping didn't converge
+    """
+    index, parameters, fencer_arguments, bouts, maxcycles, vectorized, accelerated, deadline, cancellation, \
+        monitored = arguments
+    fencers = {}
+    for name, felo_rating, initial_total_weighting, maximal_felo_rating, state in fencer_arguments:
+        fencer = Fencer(name, felo_rating, parameters, initial_total_weighting, maximal_felo_rating)
+        fencer.state = state
+        fencers[fencer.name] = fencer
+    statistics = {}
+    reports = []
+    bootstrap_felo_ratings(parameters, fencers, bouts, maxcycles, vectorized=vectorized, accelerated=accelerated,
+                           statistics=statistics, deadline=deadline,
+                           cancellation=cancellation or worker_cancellation,
+                           monitor=reports.append if monitored else None)
+    for report in reports:
+        report["component"] = index
+    return dict((name, fencer.state) for name, fencer in fencers.iteritems()), statistics, reports
+
+def bootstrap_felo_ratings_in_parallel(parameters, fencers, bouts, maxcycles=1000, bootstrapping_callback=None,
+                                       vectorized=False, accelerated=False, statistics=None, deadline=None,
+                                       cancellation=None, monitor=None, processes=None):
+    """Like `bootstrap_felo_ratings`, but every group of fencers who don't
+    influence each other, see `connected_components`, is bootstrapped in a
+    worker process of its own, and only until it has converged.  If there is
+    only one group, `bootstrap_felo_ratings` is simply called in this process.
+
+    The foreign fencers are not changed at all, and neither are fencers
+    without bouts.
+
+    :Parameters:
+      - `parameters`: all Felo parameters
+      - `fencers`: all fencers
+      - `bouts`: all bouts, sorted
+      - `maxcycles`: the maximal number of cycles of every group
+      - `bootstrapping_callback`: callabale object which takes as the only
+        parameter a float between 0 and 1 indicating the fraction of groups
+        which are finished
+      - `vectorized`: if True, the bouts are rated with
+        `rate_bouts_vectorized`.
+      - `accelerated`: if True, the bootstrapping is accelerated, see
+        `bootstrap_felo_ratings`.
+      - `statistics`: if given, ``"bootstrapping components"``, the number of
+        groups, is written into it, and the maxima of the statistics of
+        `bootstrap_felo_ratings` over all groups
+      - `deadline`: point in time (as returned by ``time.time()``) after which
+        no group starts a new cycle
+      - `cancellation`: token with which the bootstrapping of all groups can
+        be stopped after their current cycles
+      - `monitor`: callable object which is called with the report of every
+        cycle of every group, see `bootstrapping_report`.  The reports of a
+        group are passed when the group is finished, with its index in the
+        result of `connected_components` as the additional key
+        ``"component"``.
+      - `processes`: the maximal number of worker processes.  Default: the
+        number of CPUs
+
+    :type parameters: dict
+    :type fencers: dict
+    :type bouts: `BoutTable`
+    :type maxcycles: int
+    :type bootstrapping_callback: callable
+    :type vectorized: boolean
+    :type accelerated: boolean
+    :type statistics: dict
+    :type deadline: float
+    :type cancellation: `CancellationToken`
+    :type monitor: callable
+    :type processes: int
+
+    :Return:
+      - the largest residual of all groups, see `bootstrap_felo_ratings`
+
+    :rtype: float
+
+    :Exceptions:
+      - `BootstrappingError`: if the bootstrapping of a group didn't converge
+    """
+    components = connected_components(fencers, bouts)
+    if statistics is not None:
+        statistics["bootstrapping components"] = len(components)
+    if len(components) < 2:
+        return bootstrap_felo_ratings(parameters, fencers, bouts, maxcycles, bootstrapping_callback, vectorized,
+                                      accelerated, statistics, deadline, cancellation, monitor)
+    processes = min(processes or multiprocessing.cpu_count(), len(components))
+    tasks = []
+    for index, (__, component_bouts) in enumerate(components):
+        fencer_arguments = []
+        # The foreign fencers are needed for rating the bouts, too.
+        for name in component_bouts.names:
+            fencer = fencers[name]
+            fencer_arguments.append(("(" + name + ")" if fencer.hidden else name, fencer.initial_felo_rating,
+                                     fencer.initial_total_weighting, fencer.initial_maximal_felo_rating,
+                                     fencer.state))
+        tasks.append((index, parameters, fencer_arguments, component_bouts, maxcycles, vectorized, accelerated,
+                      deadline, cancellation if processes == 1 else None, monitor is not None))
+    # With only one process, the groups are still bootstrapped separately,
+    # because then, every group needs only as many cycles as it takes to
+    # converge.
+    pool = multiprocessing.Pool(processes, initialize_worker, (cancellation,)) if processes > 1 else None
+    residual = 0
+    try:
+        results = pool.imap_unordered(bootstrap_component, tasks) if pool else \
+            itertools.imap(bootstrap_component, tasks)
+        for i, (states, component_statistics, reports) in enumerate(results):
+            residual = max(residual, component_statistics["bootstrapping residual"])
+            for name, state in states.iteritems():
+                fencer = fencers[name]
+                if not fencer.foreign_fencer:
+                    fencer.state = state
+            if statistics is not None:
+                for key, value in component_statistics.iteritems():
+                    statistics[key] = max(statistics.get(key, 0), value)
+            if monitor:
+                for report in reports:
+                    monitor(report)
+            if bootstrapping_callback:
+                bootstrapping_callback(float(i + 1) / len(tasks))
+        if pool:
+            pool.close()
+    except:
+        if pool:
+            pool.terminate()
+        raise
+    finally:
+        if pool:
+            pool.join()
+    return residual
+
+class RatingEngine(object):
+    """Rates the same fencers and bouts many times, e.g. for what-if scenarios
+    with other parameters, hypothetical bouts, or without certain bouts.  The
+    Felo file needs to be parsed only once.
+
+    The engine keeps the initial values of the fencers and a sorted copy of the
+    bouts, which must not be changed afterwards.  Every call of `run` creates
+    fresh fencers and rates them, so the runs don't influence each other, and
+    they may take place in several threads at the same time.
+
+    :ivar parameters: all Felo parameters
+    :ivar bouts: all bouts, sorted chronologically
+
+    :type parameters: dict
+    :type bouts: `BoutTable`
+    """
+    def __init__(self, parameters, fencers, bouts):
+        """Class constructor.
+
+        :Parameters:
+          - `parameters`: all Felo parameters
+          - `fencers`: all fencers.  Only their initial values are used.
+          - `bouts`: all bouts
+
+        :type parameters: dict
+        :type fencers: dict
+        :type bouts: iterable
+        """
+        self.parameters = parameters.copy()
+        self.__names = set(fencers)
+        self.__fencer_arguments = []
+        for fencer in fencers.values():
+            name = "(" + fencer.name + ")" if fencer.hidden else fencer.name
+            self.__fencer_arguments.append((name, fencer.initial_felo_rating, fencer.initial_total_weighting,
+                                            fencer.initial_maximal_felo_rating))
+        self.bouts = BoutTable(bouts)
+        self.bouts.sort()
+    def create_fencers(self, parameters=None):
+        """Creates all fencers in their initial state.
+
+        :Parameters:
+          - `parameters`: the Felo parameters of the fencers.  Default: the
+            parameters of the engine.
+
+        :type parameters: dict
+
+        :Return:
+          - all fencers
+
+        :rtype: dict
+        """
+        parameters = parameters or self.parameters
+        fencers = {}
+        for name, felo_rating, initial_total_weighting, maximal_felo_rating in self.__fencer_arguments:
+            fencer = Fencer(name, felo_rating, parameters, initial_total_weighting, maximal_felo_rating)
+            fencers[fencer.name] = fencer
+        return fencers
+    def scenario_bouts(self, added_bouts=(), dropped_bouts=()):
+        """Returns the bouts of a scenario.
+
+        :Parameters:
+          - `added_bouts`: hypothetical bouts.  They are sorted into the other
+            bouts; within their bout set, they come last.
+          - `dropped_bouts`: indices of bouts in `bouts` which are left out
+
+        :type added_bouts: iterable of `Bout`
+        :type dropped_bouts: iterable of int
+
+        :Return:
+          - the sorted bouts of the scenario.  If nothing is added or dropped,
+            it is `bouts` itself, which must not be changed.
+
+        :rtype: `BoutTable`
+
+        :Exceptions:
+          - `Error`: if a fencer of a hypothetical bout is unknown
+        """
+        added_bouts, dropped_bouts = list(added_bouts), set(dropped_bouts)
+        if not added_bouts and not dropped_bouts:
+            return self.bouts
+        kept = [i not in dropped_bouts for i in xrange(len(self.bouts))]
+        bouts = BoutTable()
+        for column_name in BoutTable.column_names:
+            column = getattr(self.bouts, column_name)
+            setattr(bouts, column_name, array.array(column.typecode, itertools.compress(column, kept)))
+        bouts.names = list(self.bouts.names)
+        bouts.fencer_ids = self.bouts.fencer_ids.copy()
+        for bout in added_bouts:
+            for name in (bout.first_fencer, bout.second_fencer):
+                if name not in self.__names:
+                    raise Error(_(u"Unknown fencer '%s' in hypothetical bout.") % name)
+            bouts.append(bout)
+        if added_bouts:
+            bouts.sort()
+        return bouts
+    def run(self, parameters=None, added_bouts=(), dropped_bouts=(), bootstrapping=False, maxcycles=1000,
+            vectorized=False, accelerated=False, statistics=None, history=None):
+        """Rates all bouts of a scenario with fresh fencers.
+
+        :Parameters:
+          - `parameters`: Felo parameters which differ from those of the
+            engine
+          - `added_bouts`: hypothetical bouts, see `scenario_bouts`
+          - `dropped_bouts`: indices of bouts in `bouts` which are left out
+          - `bootstrapping`: whether the initial Felo ratings are bootstrapped
+            first, see `bootstrap_felo_ratings`
+          - `maxcycles`: the maximal number of bootstrapping cycles
+          - `vectorized`: whether the bouts are rated with NumPy, if it is
+            installed, see `rate_bouts_vectorized`
+          - `accelerated`: whether the bootstrapping is accelerated
+          - `statistics`: if given, the statistics of the bootstrapping are
+            written into it
+          - `history`: if given, the development of the Felo ratings is
+            recorded in it, so that the ratings and rankings at any date can be
+            queried afterwards, see `RatingHistory`
+
+        :type parameters: dict
+        :type added_bouts: iterable of `Bout`
+        :type dropped_bouts: iterable of int
+        :type bootstrapping: boolean
+        :type maxcycles: int
+        :type vectorized: boolean
+        :type accelerated: boolean
+        :type statistics: dict
+        :type history: `RatingHistory`
+
+        :Return:
+          - all fencers with their resulting Felo ratings
+
+        :rtype: dict
+
+        :Exceptions:
+          - `BootstrappingError`: if the bootstrapping didn't converge
+          - `Error`: if a fencer of a hypothetical bout is unknown
+        """
+        if parameters:
+            parameters, overridden_parameters = self.parameters.copy(), parameters
+            parameters.update(overridden_parameters)
+        else:
+            parameters = self.parameters
+        fencers = self.create_fencers(parameters)
+        bouts = self.scenario_bouts(added_bouts, dropped_bouts)
+        vectorized = vectorized and numpy is not None
+        if bootstrapping:
+            bootstrap_felo_ratings(parameters, fencers, bouts, maxcycles, vectorized=vectorized,
+                                   accelerated=accelerated, statistics=statistics)
+        rate_bouts(parameters, fencers, bouts, vectorized, history)
+        return fencers
+
+def map_plot_windows(function, tasks, threads=False, processes=None):
+    """Calls a function for every plot window in a pool of workers.
+
+    :Parameters:
+      - `function`: the function, which takes one task as its only parameter.
+        If processes are used, it must be on the module level.
+      - `tasks`: the parameters of the function for all windows
+      - `threads`: whether threads rather than processes are used.  Threads
+        suffice if the function waits for external programs.
+      - `processes`: the maximal number of workers.  Default: the number of
+        CPUs
+
+    :type function: callable
+    :type tasks: list
+    :type threads: boolean
+    :type processes: int
+
+    :Return:
+      - the results of the function for all tasks, in the same order
+
+    :rtype: list
+    """
+    processes = min(processes or multiprocessing.cpu_count(), len(tasks))
+    if processes <= 1:
+        return map(function, tasks)
+    pool = (multiprocessing.pool.ThreadPool if threads else multiprocessing.Pool)(processes)
+    try:
+        results = pool.map(function, tasks)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return results
+
+def write_rating_plot(arguments):
+    """Writes one plot window with `felo_plot.RatingPlot.write`.  This is the
+    task of the worker processes, therefore, all parameters are passed in one
+    tuple.
+
+    :Parameters:
+      - `arguments`: the plot, and the path of its files without the
+        extensions
+
+    :type arguments: (`felo_plot.RatingPlot`, string)
+
+    :Return:
+      - the error message, or ``None`` if the plot was written
+
+    :rtype: unicode
+    """
+    plot, filename_prefix = arguments
+    try:
+        plot.write(filename_prefix)
+    except EnvironmentError, error:
+        return unicode(str(error), preferred_encoding, "replace")
+
+def convert_plot_window(arguments):
+    """Converts the PostScript file of one plot window to PNG and PDF with
+    ImageMagick, and deletes it.  This is the task of the worker threads,
+    therefore, all parameters are passed in one tuple.
+
+    :Parameters:
+      - `arguments`: the path of convert, the PostScript file, the PNG file,
+        and the PDF file
+
+    :type arguments: (string, string, string, string)
+
+    :Return:
+      - the error message, or ``None`` if the plot was converted
+
+    :rtype: unicode
+
+    :Exceptions:
+      - `OSError`: if convert wasn't found
+    """
+    path_of_convert, postscript_file_name, png_file_name, pdf_file_name = arguments
+    if os.path.isfile(pdf_file_name):
+        # Otherwise, convert doesn't generate a fresh PDF
+        os.remove(pdf_file_name)
+    try:
+        for command in ([path_of_convert, postscript_file_name, "-rotate", "90", png_file_name],
+                        [path_of_convert, postscript_file_name, pdf_file_name]):
+            return_code = call(command)
+            if return_code:
+                return _(u"convert failed with exit code %d.") % return_code
+    finally:
+        if os.path.isfile(postscript_file_name):
+            os.remove(postscript_file_name)
+
+def calculate_felo_ratings(parameters, fencers, bouts, plot=False, estimate_freshmen=False,
+                           bootstrapping=False, maxcycles=1000, bootstrapping_callback=None, checkpoints=None,
+                           vectorized=False, accelerated=False, statistics=None, warm_start=None,
+                           parallel=False, time_budget=None, cancellation=None, bootstrapping_monitor=None,
+                           history=None, manifest=None):
+    """Calculate the new Felo ratings, taking a whole bunch of bouts into
+    account.  If wanted, generate plots with the development of the Felo
+    numbers.
+
+    :Parameters:
       - `parameters`: all Felo parameters
       - `fencers`: all fencers
       - `bouts`: all bouts, which is sorted chronologically by this function if
-        necessary
+        necessary.  It may also be an iterator over bouts in chronological
+        order, e.g. from `parse_felo_file` with ``streaming=True``; then, the
+        bouts are rated as they come in and are never held in memory as a
+        whole (except for bootstrapping, which needs them multiple times).
       - `plot`: if True, plots as PNG and PDF are generated.  The file name is the
-        group name in the Felo parameters.
+        group name in the Felo parameters.  The parameter ``"plot renderer"``
+        says whether they are drawn by `felo_plot.RatingPlot` or by gnuplot
+        and ImageMagick.
       - `bootstrapping`: if True, try to estimate good starting Felo numbers by
         going through the bouts multiple times, using the result numbers as new
         starting numbers, until the numbers have converged.
@@ -1054,113 +3942,92 @@ def calculate_felo_ratings(parameters, fencers, bouts, plot=False, estimate_fres
       - `bootstrapping_callback`: callabale object which takes as the only
         parameter a float between 0 and 1 indicating the progress while
         bootstrapping.  It may update a progress bar, for example.
+      - `checkpoints`: rating states of previous calculations.  If given, only
+        the bouts after the latest checkpoint which is still valid are rated,
+        and new checkpoints are recorded.  It is ignored for bootstrapping.
+        If plots are generated or a history is recorded, all bouts are rated.
+      - `vectorized`: if True, the bouts are rated set by set with NumPy array
+        operations, see `rate_bouts_vectorized`.  This is much faster for
+        large bout sets.  If NumPy is not installed, or if plots are
+        generated, the pure Python path is used anyway.
+      - `accelerated`: if True, the bootstrapping is accelerated with
+        `AndersonAcceleration` and `skip_bootstrapping_cycles`.  It usually
+        needs much fewer cycles.  Only the Felo ratings of the regular fencers
+        are the same as without acceleration (within the bootstrapping
+        threshold).  The estimated Felo ratings of freshmen may differ by up to
+        about one point, because they are averages over all cycles and
+        thus depend on the path to the fixed point.
+      - `statistics`: if given, statistics of the calculation are written into
+        this dictionary.  At the moment, this is ``"bootstrapping cycles"``,
+        the number of passes over all bouts during bootstrapping,
+        ``"bootstrapping residual"``, the largest change of a Felo rating in
+        the last of them, and for accelerated bootstrapping ``"skipped
+        bootstrapping cycles"``, see `skip_bootstrapping_cycles`.  If a warm start was given, it also
+        contains ``"warm-started fencers"``, the number of fencers who started
+        with the result of the last bootstrapping.
+      - `warm_start`: if given, the bootstrapping starts with the Felo ratings
+        at the fixed point of the last bootstrapping of the group, if they are
+        still applicable, and the new fixed point is saved in it.  It is only
+        used for bootstrapping.
+      - `parallel`: if True, groups of fencers who don't influence each other
+        are bootstrapped in parallel worker processes, see
+        `bootstrap_felo_ratings_in_parallel`.  Then, ``"bootstrapping
+        components"`` is added to the statistics, and the other bootstrapping
+        statistics are the maxima over all groups.
+      - `time_budget`: if given, no new bootstrapping cycle is started after
+        so many seconds.  Then, and if `cancellation` is given, the
+        bootstrapping never raises `BootstrappingError`.  Instead, if it
+        doesn't converge, the best result so far is taken, and its
+        ``"bootstrapping residual"`` in the statistics tells how far it is
+        from convergence, see `bootstrap_felo_ratings`.
+      - `cancellation`: token with which the bootstrapping can be stopped,
+        e.g. from another thread or a GUI event handler
+      - `bootstrapping_monitor`: callable object which gets a report of every
+        bootstrapping cycle with the changes of the Felo ratings and the
+        duration, see `bootstrapping_report`
+      - `history`: if given, the development of the Felo ratings is recorded
+        in it.  Then, the pure Python path is used.  The plots are drawn from
+        it, too.
+      - `manifest`: if given, only those plots are generated whose curves
+        have changed since the last time, and the generated files are
+        recorded in it.  It is not saved here.
 
     :type parameters: dict
     :type fencers: dict
-    :type bouts: list
+    :type bouts: list or iterator
     :type plot: boolean
     :type bootstrapping: boolean
     :type maxcycles: int
     :type estimate_freshmen: boolean
     :type bootstrapping_callback: callable
+    :type checkpoints: `RatingCheckpoints`
+    :type vectorized: boolean
+    :type accelerated: boolean
+    :type statistics: dict
+    :type warm_start: `BootstrappingWarmStart`
+    :type parallel: boolean
+    :type time_budget: float
+    :type cancellation: `CancellationToken`
+    :type bootstrapping_monitor: callable
+    :type history: `RatingHistory`
+    :type manifest: `OutputManifest`
 
     :Return:
       - list (not a dictionary!) of all visible fencers, sorted by descending
         Felo number, or, if C{estimate_freshmen} is True, a list with all
         freshmen
-      - the suffixes of the generated plots
+      - the suffixes of the plots, including those which were not generated
+        because they are still current according to `manifest`
 
     :rtype: list, list
 
     :Exceptions:
       - `BootstrappingError`: if the bootstrapping didn't converge
       - `ExternalProgramError`: if an external program is not found
+      - `PlotError`: if some plots couldn't be generated
+      - `ChronologyError`: if `bouts` is an iterator which doesn't yield the
+        bouts in chronological order
     """
-    def calculate_felo_ratings_core(parameters, fencers, bouts, plot, data_file_name=None):
-        """Calculate the new Felo ratings, taking a whole bunch of bouts into
-        account.  If wanted, generate plots with the development of the Felo
-        numbers.  Some things that are necessary before and after are not done
-        here, because it is only the "core" routine.
-
-        :Parameters:
-          - `parameters`: dictionary with all Felo parameters
-          - `fencers`: dictionary with all fencers
-          - `bouts`: list of bouts, which is sorted chronologically if necessary
-          - `plot`: If True, plots as PNG and PDF are generated.  The file name is the
-            group name in the Felo parameters.
-          - `data_file_name`: just a copy of the variable of the same name
-            from the enclosing scope.  It's the filename of the datafile
-            plotted by Gnuplot.
-
-        :type parameters: dict
-        :type fencers: dict
-        :type bouts: list
-        :type plot: boolean
-        :type data_file_name: string
-
-        :Return:
-          - the accumulated xtics, but only if C{plot==True}
-
-        :rtype: string
-        """
-        def add_active_fencers(fencer, today_active_fencers):
-            if "/" not in fencer:
-                today_active_fencers.add(fencer)
-            else:
-                # We have a team actually.  FixMe: Not yet supported by the
-                # rest of the program
-                fencers = fencer.split("/")
-                for fencer in fencers:
-                    today_active_fencers.add(fencer.strip())
-                    
-        if plot:
-            data_file = open(data_file_name, "w")
-            # xtics holds the Gnuplot command for the x axis labels (i.e. the dates).
-            xtics = ""
-            last_xtics_daynumber = 0
-        today_active_fencers = set()
-        first_data_row = True
-        for i, bout in enumerate(bouts):
-            set_preliminary_felo_ratings(fencers, bout, parameters)
-            add_active_fencers(bout.first_fencer, today_active_fencers)
-            add_active_fencers(bout.second_fencer, today_active_fencers)
-            if i == len(bouts) - 1 or bout.date_string != bouts[i+1].date_string:
-                # Not one *day* is over but one set of bouts which took place with
-                # unknown order.
-                adopt_preliminary_felo_ratings()
-            current_bout_daynumber = bout.date.toordinal()
-            last_bout_of_this_day = \
-                i == len(bouts) - 1 or bouts[i+1].date.toordinal() != current_bout_daynumber
-            year, month, day, __, __, __, __, __, __ = time.localtime()
-            current_daynumber = datetime.date(year, month, day).toordinal()
-            # There are three conditions so that plot points are created: We
-            # must have a new day, so we don't generate points within one day
-            # (too fine-grained, and no real times are known within one day
-            # anyway); the Felo ratings must be after the minimal date given in
-            # the parameters section; *and* the Felo ratings must not be older
-            # than the maximal days in the plot.
-            if plot and last_bout_of_this_day and \
-                    bout.date_string[:10] >= parameters["earliest date in plot"] and \
-                    current_daynumber - current_bout_daynumber <= parameters["maximal days in plot"]:
-                data_file.write(str(current_bout_daynumber))
-                # Generate tic marks not too densely; labels must be at least
-                # the the minimal tic distance apart.
-                if current_bout_daynumber - last_xtics_daynumber >= parameters["min distance of plot tics"]:
-                    last_xtics_daynumber = current_bout_daynumber
-                    xtics += bout.date.strftime(str(_(u"'%Y-%m-%d'"))) + " %d," % current_bout_daynumber
-                for fencer in visible_fencers:
-                    if fencer.name in today_active_fencers or first_data_row or i == len(bouts) - 1:
-                        value = str(fencer.felo_rating_exact)
-                    else:
-                        value = "NaN"
-                    data_file.write("\t" + value)
-                data_file.write(os.linesep)
-                first_data_row = False
-            if last_bout_of_this_day:
-                today_active_fencers = set()
-        if plot:
-            data_file.close()
-            return xtics
     def construct_supplement(path):
         """Builds a message with the path where felo_rating.py looked for an
         external program but didn't find it.
@@ -1192,22 +4059,46 @@ def calculate_felo_ratings(parameters, fencers, bouts, plot=False, estimate_fres
         # Store the column index of the data file in the fencer object.  Needed
         # by Gnuplot.
         fencer.columnindex = index + 2
-    bouts.sort()
     if bootstrapping:
-        for i in range(maxcycles):
-            if i % 10 == 0 and bootstrapping_callback:
-                bootstrapping_callback(float(i)/(maxcycles-1))
-            for fencer in fencers.values():
-                fencer.old_felo_rating = fencer.felo_rating_exact
-            calculate_felo_ratings_core(parameters, fencers, bouts, plot=False)
-            for fencer in fencers.values():
-                if abs(fencer.old_felo_rating - fencer.felo_rating_exact) >= parameters["threshold bootstrapping"]:
-                    break
-            else:
-                break
-        if i == maxcycles - 1:
-            raise BootstrappingError(_(u"The bootstrapping didn't converge."))
-    xtics = calculate_felo_ratings_core(parameters, fencers, bouts, plot, data_file_name)
+        checkpoints = None
+    vectorized = vectorized and numpy is not None
+    if isinstance(bouts, (list, BoutTable)):
+        bouts.sort()
+    elif bootstrapping:
+        bouts = BoutTable(bouts)
+        bouts.sort()
+    else:
+        bouts = assure_chronological_order(bouts)
+    if (checkpoints is not None or vectorized) and not isinstance(bouts, BoutTable):
+        bouts = BoutTable(bouts)
+    start = 0
+    if checkpoints is not None:
+        start = checkpoints.restore(parameters, fencers, bouts, resume=not plot and history is None)
+    if bootstrapping:
+        if (warm_start is not None or parallel) and not isinstance(bouts, BoutTable):
+            bouts = BoutTable(bouts)
+        if warm_start is not None:
+            warm_started_fencers = warm_start.restore(parameters, fencers, bouts)
+            if statistics is not None:
+                statistics["warm-started fencers"] = warm_started_fencers
+        deadline = time.time() + time_budget if time_budget is not None else None
+        if parallel:
+            bootstrap_felo_ratings_in_parallel(parameters, fencers, bouts, maxcycles, bootstrapping_callback,
+                                               vectorized, accelerated, statistics, deadline, cancellation,
+                                               bootstrapping_monitor)
+        else:
+            bootstrap_felo_ratings(parameters, fencers, bouts, maxcycles, bootstrapping_callback, vectorized,
+                                   accelerated, statistics, deadline, cancellation, bootstrapping_monitor)
+        if warm_start is not None:
+            warm_start.store(parameters, fencers, bouts)
+    if plot and history is None:
+        history = RatingHistory()
+    rate_bouts(parameters, fencers, bouts, vectorized, history, start, checkpoints)
+    if plot:
+        plot_days, tic_days = history.plot_days(parameters["earliest date in plot"],
+                                                parameters["maximal days in plot"],
+                                                parameters["min distance of plot tics"])
+        curves = dict((fencer.name, history.plot_curve(fencer.name, plot_days)) for fencer in visible_fencers)
     visible_fencers.sort()    # Descending by Felo rating
     suffixes = []
     if plot:
@@ -1224,55 +4115,354 @@ def calculate_felo_ratings(parameters, fencers, bouts, plot=False, estimate_fres
         else:
             number_windows = 1
             suffixes = [""]
-        # Call gnuplot and convert to generate the PNG and PDF plots.  Note: We
-        # don't generate HTML tables here.  These must be provided separately.
-        gnuplot_script_file_name = tempfile_prefix + ".gp"
-        gnuplot_script = codecs.open(gnuplot_script_file_name, "w", encoding="latin-1", errors="replace")
-        gnuplot_script.write(u"set term postscript color; set encoding iso_8859_1;"
-                             u"set key outside; set xtics rotate; set grid xtics ytics;"
-                             u"set xtics nomirror (%s)" % xtics[:-1])
+        windows = []
         for i in range(number_windows):
-            gnuplot_script.write(u"; set output '%s'; plot " % (tempfile_prefix + suffixes[i] + ".ps"))
             lower_limit = reduced_window_width * i
             upper_limit = reduced_window_width * i + parameters["fencers per plot"]
-            if upper_limit > len(visible_fencers):
-                upper_limit = len(visible_fencers)
-            for j in range(lower_limit, upper_limit):
-                fencer = visible_fencers[j]
-                gnuplot_script.write(u"'%s' using 1:%d with lines lw 5 title '%s'" %
-                                     (data_file_name, fencer.columnindex, fencer.name))
-                if j < upper_limit - 1:
-                    gnuplot_script.write(", ")
-        gnuplot_script.close()
-        try:
-            call([parameters["path of gnuplot"], gnuplot_script_file_name])
-        except OSError:
-            raise ExternalProgramError(_(u'The program "gnuplot" wasn\'t found.  %s'
-                                         u'However, it is needed for the plots.  '
-                                         u'Please install it from http://www.gnuplot.info/.') %
-                                       construct_supplement(parameters["path of gnuplot"]))
-        os.remove(data_file_name)
-        os.remove(gnuplot_script_file_name)
-        for suffix in suffixes:
-            postscript_file_name = tempfile_prefix + suffix + ".ps"
-            png_file_name = destination_file_prefix + suffix + ".png"
-            pdf_file_name = destination_file_prefix + suffix + ".pdf"
-            if os.path.isfile(pdf_file_name):
-                # Otherwise, convert doesn't generate a fresh PDF
-                os.remove(pdf_file_name)
+            windows.append(visible_fencers[lower_limit:upper_limit])
+        # Note: We don't generate HTML tables here.  These must be provided
+        # separately.
+        # Every window is rendered or converted by a worker of its own, and
+        # the errors are collected.  Windows whose plots are still current
+        # according to the manifest are skipped.
+        tic_format = str(_(u"'%Y-%m-%d'")).strip("'")
+        extensions = [".png", ".pdf"]
+        window_files, digests = {}, {}
+        for suffix, window in zip(suffixes, windows):
+            window_files[suffix] = [bouts_base_filename + suffix + extension for extension in extensions]
+            digests[suffix] = OutputManifest.digest(parameters["plot renderer"], tic_format, plot_days, tic_days,
+                                                    [(fencer.name, curves[fencer.name]) for fencer in window])
+        suffixes_and_windows = [(suffix, window) for suffix, window in zip(suffixes, windows)
+                                if manifest is None or not manifest.is_current(window_files[suffix], digests[suffix])]
+        generated_suffixes = [suffix for suffix, __ in suffixes_and_windows]
+        filename_prefixes = [destination_file_prefix + suffix for suffix in generated_suffixes]
+        if not suffixes_and_windows:
+            errors = []
+        elif parameters["plot renderer"] == "built-in":
+            tasks = []
+            for filename_prefix, (__, window) in zip(filename_prefixes, suffixes_and_windows):
+                tasks.append((felo_plot.RatingPlot(plot_days, tic_days,
+                                                   [(fencer.name, curves[fencer.name]) for fencer in window],
+                                                   tic_format), filename_prefix))
+            errors = map_plot_windows(write_rating_plot, tasks)
+        else:
+            # Call gnuplot and convert to generate the PNG and PDF plots.
+            columns = [curves[fencer.name] for fencer in sorted(visible_fencers, key=lambda fencer: fencer.columnindex)]
+            data_file = open(data_file_name, "w")
+            for i, day in enumerate(plot_days):
+                data_file.write(str(day))
+                for value in (column[i] for column in columns):
+                    data_file.write("\t" + (str(value) if value is not None else "NaN"))
+                data_file.write(os.linesep)
+            data_file.close()
+            # xtics holds the Gnuplot command for the x axis labels (i.e. the dates).
+            xtics = "".join(datetime.date.fromordinal(day).strftime(str(_(u"'%Y-%m-%d'"))) + " %d," % day
+                            for day in tic_days)
+            gnuplot_script_file_name = tempfile_prefix + ".gp"
+            gnuplot_script = codecs.open(gnuplot_script_file_name, "w", encoding="latin-1", errors="replace")
+            gnuplot_script.write(u"set term postscript color; set encoding iso_8859_1;"
+                                 u"set key outside; set xtics rotate; set grid xtics ytics;"
+                                 u"set xtics nomirror (%s)" % xtics[:-1])
+            for suffix, window in suffixes_and_windows:
+                gnuplot_script.write(u"; set output '%s'; plot " % (tempfile_prefix + suffix + ".ps"))
+                gnuplot_script.write(u", ".join(u"'%s' using 1:%d with lines lw 5 title '%s'" %
+                                                (data_file_name, fencer.columnindex, fencer.name)
+                                                for fencer in window))
+            gnuplot_script.close()
+            try:
+                call([parameters["path of gnuplot"], gnuplot_script_file_name])
+            except OSError:
+                raise ExternalProgramError(_(u'The program "gnuplot" wasn\'t found.  %s'
+                                             u'However, it is needed for the plots.  '
+                                             u'Please install it from http://www.gnuplot.info/.') %
+                                           construct_supplement(parameters["path of gnuplot"]))
+            os.remove(data_file_name)
+            os.remove(gnuplot_script_file_name)
+            tasks = [(parameters["path of convert"], tempfile_prefix + suffix + ".ps", filename_prefix + ".png",
+                      filename_prefix + ".pdf")
+                     for suffix, filename_prefix in zip(generated_suffixes, filename_prefixes)]
             try:
-                call([parameters["path of convert"], postscript_file_name, "-rotate", "90", png_file_name])
-                call([parameters["path of convert"], postscript_file_name, pdf_file_name])
+                errors = map_plot_windows(convert_plot_window, tasks, threads=True)
             except OSError:
                 raise ExternalProgramError(_(u'The program "convert" of ImageMagick wasn\'t found.  %s'
                                              u'However, it is needed for the plots.  '
                                              u'Please install it from http://www.imagemagick.org/.') %
                                            construct_supplement(parameters["path of convert"]))
-            os.remove(tempfile_prefix + suffix + ".ps")
+        if manifest is not None:
+            for suffix, error in zip(generated_suffixes, errors):
+                if not error:
+                    manifest.update(window_files[suffix], digests[suffix])
+        errors = [(filename_prefix, error) for filename_prefix, error in zip(filename_prefixes, errors) if error]
+        if errors:
+            raise PlotError(errors)
     if estimate_freshmen:
         return [fencer for fencer in fencers.values() if fencer.freshman], suffixes
     return visible_fencers, suffixes
 
+def calculate_felo_ratings_from_file(felo_file, plot=False, estimate_freshmen=False):
+    """Reads a Felo file and calculates the Felo ratings in one forward pass.
+    The bouts are rated while they are read, so the memory consumption doesn't
+    depend on the length of the bout history.  Only if the bouts in the file
+    turn out not to be in chronological order, the file is read again as a
+    whole and the bouts are sorted before the calculation.
+
+    :Parameters:
+      - `felo_file`: the *open* file to be parsed.  It must be seekable.
+      - `plot`: if True, plots as PNG and PDF are generated.
+      - `estimate_freshmen`: if True, try to calculate estimates for freshmen.
+
+    :type felo_file: file
+    :type plot: boolean
+    :type estimate_freshmen: boolean
+
+    :Return:
+      - Felo parameters as a dictionary
+      - fencers as a dictionary (in the form "name: Fencer object")
+      - the result list of `calculate_felo_ratings`
+      - the suffixes of the generated plots
+
+    :rtype: dict, dict, list, list
+
+    :Exceptions:
+      - `LineError`: if a line does not follow the Felo file syntax
+      - `FeloFormatError`: if an initial Felo rating or weighting is invalid
+      - `ExternalProgramError`: if an external program is not found
+    """
+    parameters, __, fencers, bouts = parse_felo_file(felo_file, streaming=True)
+    try:
+        resultslist, suffixes = calculate_felo_ratings(parameters, fencers, bouts, plot, estimate_freshmen)
+    except ChronologyError:
+        # The partial calculation is worthless, so start over with sorted bouts
+        felo_file.seek(0)
+        parameters, __, fencers, bouts = parse_felo_file(felo_file)
+        resultslist, suffixes = calculate_felo_ratings(parameters, fencers, bouts, plot, estimate_freshmen)
+    return parameters, fencers, resultslist, suffixes
+
+class OutcomeTable(object):
+    """Winning chances of bouts to a certain number of points, depending on the
+    expectation value of the first fencer, i.e. the fraction of the single
+    points that the first fencer makes.  The table has one row for every
+    expectation value 0, 0.01, …, 0.99, like the ``auf*.dat`` files; higher
+    expectation values get the last row.  For bouts to 5, 10, and 15 points,
+    the values are read from the ``auf*.dat`` files; for all others, they are
+    calculated, see `calculate_outcome_table`.
+
+    :ivar results: the expectation values of the rows
+    :ivar winning_chances: the winning chances of the first fencer
+    :ivar point_differences: the expected differences of the points
+
+    :type results: array.array
+    :type winning_chances: array.array
+    :type point_differences: array.array
+    """
+    def __init__(self, table_file=None):
+        """Class constructor.
+
+        :Parameters:
+          - `table_file`: the ``auf*.dat`` file with the table.  Lines starting
+            with "#" are comments.  The other lines contain the expectation
+            value, the winning chance, and the point difference, in ascending
+            order of the expectation value.  If not given, the table is empty.
+
+        :type table_file: file
+
+        :Exceptions:
+          - `ValueError`: if a line of the file is invalid
+        """
+        self.results, self.winning_chances, self.point_differences = \
+            array.array("d"), array.array("d"), array.array("d")
+        if table_file:
+            for line in table_file:
+                if line[0] != "#":
+                    result, winning_chance, point_difference = line.split()
+                    self.append(float(result), float(winning_chance), float(point_difference))
+    def append(self, result, winning_chance, point_difference):
+        """Adds a row at the end of the table.
+
+        :Parameters:
+          - `result`: the expectation value of the first fencer
+          - `winning_chance`: the winning chance of the first fencer
+          - `point_difference`: the expected difference of the points
+
+        :type result: float
+        :type winning_chance: float
+        :type point_difference: float
+        """
+        self.results.append(result)
+        self.winning_chances.append(winning_chance)
+        self.point_differences.append(point_difference)
+    def write(self, table_file):
+        """Writes the table in the format of the ``auf*.dat`` files.
+
+        :Parameters:
+          - `table_file`: the file to write to
+
+        :type table_file: file
+        """
+        table_file.write("# Trefferchance  Gewinnchance  Trefferdifferenz\n")
+        for row in itertools.izip(self.results, self.winning_chances, self.point_differences):
+            table_file.write("%g\t%g\t%g\n" % row)
+    def row(self, expectation):
+        """Returns the index of the first row whose expectation value is
+        closer than 0.0051 to the given one, or the last row if there is none.
+
+        :Parameters:
+          - `expectation`: the expectation value of the first fencer
+
+        :type expectation: float
+
+        :Return:
+          - the index of the row
+
+        :rtype: int
+        """
+        results = self.results
+        last_row = len(results) - 1
+        # The rows are 0.01 apart, so this is the right row up to rounding
+        # errors, which are corrected below.
+        row = min(max(int(math.floor((expectation - 0.0051) * last_row)) + 1, 0), last_row)
+        while row > 0 and abs(expectation - results[row - 1]) < 0.0051:
+            row -= 1
+        while row < last_row and abs(expectation - results[row]) >= 0.0051:
+            row += 1
+        return row
+    def rows(self, expectations):
+        """Returns the indices of the rows for many expectation values, see
+        `row`.  This needs NumPy.
+
+        :Parameters:
+          - `expectations`: the expectation values of the first fencers
+
+        :type expectations: numpy.ndarray
+
+        :Return:
+          - the indices of the rows
+
+        :rtype: numpy.ndarray
+        """
+        results = numpy.frombuffer(self.results, dtype=float)
+        last_row = len(results) - 1
+        rows = numpy.clip(numpy.floor((expectations - 0.0051) * last_row).astype(int) + 1, 0, last_row)
+        while True:
+            backward = (rows > 0) & (abs(expectations - results[rows - 1]) < 0.0051)
+            if not backward.any():
+                break
+            rows[backward] -= 1
+        while True:
+            forward = (rows < last_row) & (abs(expectations - results[rows]) >= 0.0051)
+            if not forward.any():
+                break
+            rows[forward] += 1
+        return rows
+
+def calculate_outcome_table(fenced_to, resolution=100):
+    """Calculates the outcome table for bouts to the given number of points.
+    Every single point is made by the first fencer with the probability given
+    by the expectation value, independently of the other points.  The
+    probabilities of all scores are calculated exactly, score by score, so
+    this also works for long bouts, e.g. the relay of a team bout.
+
+    The rows and the rounding are like in the ``auf*.dat`` files, so that the
+    table doesn't change when it is written to a file and read again, and
+    `OutcomeTable.row` finds the same rows as for the shipped tables.
+
+    :Parameters:
+      - `fenced_to`: number of winning points in the bout
+      - `resolution`: the number of rows.  The expectation values of the rows
+        are 0, 1/`resolution`, …, 1 - 1/`resolution`.
+
+    :type fenced_to: int
+    :type resolution: int
+
+    :Return:
+      - the outcome table
+
+    :rtype: `OutcomeTable`
+    """
+    table = OutcomeTable()
+    for i in range(resolution):
+        expectation = i / float(resolution)
+        # probabilities[b] is the probability that the score a:b is reached,
+        # where a is the current row of the score table.  The first fencer wins
+        # from (n-1):b, the second from a:(n-1).
+        probabilities = [(1 - expectation)**b for b in range(fenced_to)]
+        winning_chance = point_difference = 0
+        for a in range(fenced_to):
+            if a > 0:
+                probabilities[0] *= expectation
+                for b in range(1, fenced_to):
+                    probabilities[b] = probabilities[b] * expectation + probabilities[b - 1] * (1 - expectation)
+            point_difference -= probabilities[-1] * (1 - expectation) * (fenced_to - a)
+        for b, probability in enumerate(probabilities):
+            winning_chance += probability * expectation
+            point_difference += probability * expectation * (fenced_to - b)
+        table.append(expectation, float("%g" % winning_chance), float("%g" % point_difference))
+    return table
+
+outcome_tables = {}
+
+def outcome_table(fenced_to):
+    """Returns the outcome table for bouts to the given number of points.  For
+    5, 10, and 15 points, it is read from the ``auf*.dat`` file.  All others
+    are calculated with `calculate_outcome_table` and stored in the cache
+    directory, see `default_cache_directory`.  Either way, this happens only
+    once, and then the table is kept in `outcome_tables`.
+
+    :Parameters:
+      - `fenced_to`: number of winning points in the bout
+
+    :type fenced_to: int
+
+    :Return:
+      - the outcome table
+
+    :rtype: `OutcomeTable`
+
+    :Exceptions:
+      - `Error`: if the bout is fenced to less than one point
+    """
+    try:
+        return outcome_tables[fenced_to]
+    except KeyError:
+        pass
+    if fenced_to < 1:
+        raise Error(_(u"A bout must be fenced to at least one point."))
+    filename = "auf%d.dat" % fenced_to
+    cache_directory = default_cache_directory()
+    for directory in (datapath, cache_directory):
+        try:
+            table_file = open(os.path.join(directory, filename))
+        except IOError:
+            continue
+        try:
+            try:
+                table = OutcomeTable(table_file)
+            except ValueError:
+                continue
+        finally:
+            table_file.close()
+        break
+    else:
+        table = calculate_outcome_table(fenced_to)
+        cache_filename = os.path.join(cache_directory, filename)
+        temporary_filename = cache_filename + ".tmp"
+        try:
+            if not os.path.isdir(cache_directory):
+                os.makedirs(cache_directory)
+            table_file = open(temporary_filename, "w")
+            try:
+                table.write(table_file)
+            finally:
+                table_file.close()
+            if os.path.exists(cache_filename):
+                # Necessary on Windows
+                os.remove(cache_filename)
+            os.rename(temporary_filename, cache_filename)
+        except (IOError, OSError):
+            pass
+    outcome_tables[fenced_to] = table
+    return table
+
 def expectation_value(first_fencer, second_fencer):
     """Returns the expected winning value of the first given fencer in a bout
     with the second.  The winning value is actually the fraction of won single
@@ -1301,8 +4491,7 @@ def prognosticate_bout(first_fencer, second_fencer, fenced_to):
       - `first_fencer`: first fencer, for whom the winning chance is to be
         calculated.
       - `second_fencer`: second fencer, opponent in the bout.
-      - `fenced_to`: number of winning points in the bout.  Must be 5, 10, or
-        15.
+      - `fenced_to`: number of winning points in the bout
 
     :type first_fencer: Fencer
     :type second_fencer: Fencer
@@ -1313,26 +4502,396 @@ def prognosticate_bout(first_fencer, second_fencer, fenced_to):
         winning probability of the first fencer in percent.
 
     :rtype: int, int, int
+
+    :Exceptions:
+      - `Error`: if the bout is fenced to less than one point
     """
-    expectation_first = expectation_value(first_fencer, second_fencer)
-    if expectation_first > 0.5:
-        points_first = fenced_to
-        points_second = int(round(fenced_to * (1/expectation_first - 1)))
-    else:
-        points_first = int(round(fenced_to / (1/expectation_first - 1)))
-        points_second = fenced_to
-    for line in file(datapath+"/auf%d.dat" % fenced_to):
-        if line[0] != "#":
-            result_first, winning_chance_first, __ = line.split()
-            result_first, winning_chance_first = float(result_first), float(winning_chance_first)
-            if abs(expectation_first - result_first) < 0.0051:
-                break
-    if points_first == points_second:
+    return prognosticate_bouts([(first_fencer, second_fencer)], fenced_to)[0]
+
+def prognosticate_bouts(pairs, fenced_to):
+    """Estimates the most probable results of many bouts, see
+    `prognosticate_bout`.
+
+    :Parameters:
+      - `pairs`: the first and the second fencer of every bout
+      - `fenced_to`: number of winning points in the bouts
+
+    :type pairs: iterable of (Fencer, Fencer)
+    :type fenced_to: int
+
+    :Return:
+      - for every bout, the points of the first fencer, the points of the
+        second fencer, and the winning probability of the first fencer in
+        percent.
+
+    :rtype: list of (int, int, int)
+
+    :Exceptions:
+      - `Error`: if the bout is fenced to less than one point
+    """
+    table = outcome_table(fenced_to)
+    row, winning_chances = table.row, table.winning_chances
+    prognoses = []
+    for first_fencer, second_fencer in pairs:
+        expectation_first = expectation_value(first_fencer, second_fencer)
         if expectation_first > 0.5:
-            points_second -= 1
+            points_first = fenced_to
+            points_second = int(round(fenced_to * (1/expectation_first - 1)))
+        else:
+            points_first = int(round(fenced_to / (1/expectation_first - 1)))
+            points_second = fenced_to
+        if points_first == points_second:
+            if expectation_first > 0.5:
+                points_second -= 1
+            else:
+                points_first -= 1
+        prognoses.append((points_first, points_second,
+                          int(round(winning_chances[row(expectation_first)] * 100))))
+    return prognoses
+
+class PredictionMatrix(object):
+    """Prognoses for all bouts between the fencers of a tournament entry, e.g.
+    for seeding the pools.  For every ordered pair of fencers, it contains the
+    expectation value of the first fencer, the most probable result, and the
+    winning chance of the first fencer, exactly as `expectation_value` and
+    `prognosticate_bout` would return them.  The fencers are rated with their
+    current ``felo_rating_exact``.
+
+    All matrices are stored row by row in flat arrays, i.e. the bout of the
+    fencer i against the fencer j is at the index i*N+j.  If NumPy is
+    installed, they are calculated in one vectorized pass.
+
+    :ivar names: the names of the fencers, in the order of the rows and
+      columns
+    :ivar fenced_to: number of winning points in the bouts
+    :ivar expectations: the expectation values of the first fencers
+    :ivar points_first: the most probable points of the first fencers
+    :ivar points_second: the most probable points of the second fencers
+    :ivar winning_chances: the winning chances of the first fencers in percent
+
+    :type names: list of unicode
+    :type fenced_to: int
+    :type expectations: array.array
+    :type points_first: array.array
+    :type points_second: array.array
+    :type winning_chances: array.array
+    """
+    format_version = 1
+    def __init__(self, fencers, fenced_to):
+        """Class constructor.
+
+        :Parameters:
+          - `fencers`: the fencers of the tournament entry
+          - `fenced_to`: number of winning points in the bouts
+
+        :type fencers: list of `Fencer`
+        :type fenced_to: int
+        """
+        self.names = [fencer.name for fencer in fencers]
+        self.fenced_to = fenced_to
+        self.__indices = dict((name, i) for i, name in enumerate(self.names))
+        table = outcome_table(fenced_to)
+        if numpy is not None:
+            felo_ratings = numpy.array([fencer.felo_rating_exact for fencer in fencers], dtype=float)
+            expectations = 1 / (1 + 10**((felo_ratings[numpy.newaxis, :] - felo_ratings[:, numpy.newaxis]) / 400.0))
+            favorite = expectations > 0.5
+            ratios = 1 / expectations - 1
+            # This is the rounding of Python's ``round`` for positive numbers.
+            points_first = numpy.where(favorite, fenced_to, numpy.floor(fenced_to / ratios + 0.5)).astype(int)
+            points_second = numpy.where(favorite, numpy.floor(fenced_to * ratios + 0.5), fenced_to).astype(int)
+            draw = points_first == points_second
+            points_first[draw & ~favorite] -= 1
+            points_second[draw & favorite] -= 1
+            winning_chances = numpy.floor(numpy.frombuffer(table.winning_chances, dtype=float)
+                                          [table.rows(expectations.ravel())] * 100 + 0.5)
+            self.expectations = array.array("d", expectations.ravel().tostring())
+            self.points_first = array.array("H", points_first.ravel().astype(numpy.uint16).tostring())
+            self.points_second = array.array("H", points_second.ravel().astype(numpy.uint16).tostring())
+            self.winning_chances = array.array("B", winning_chances.astype(numpy.uint8).tostring())
+        else:
+            pairs = [(first_fencer, second_fencer) for first_fencer in fencers for second_fencer in fencers]
+            self.expectations = array.array("d", [expectation_value(first_fencer, second_fencer)
+                                                  for first_fencer, second_fencer in pairs])
+            self.points_first, self.points_second, self.winning_chances = \
+                array.array("H"), array.array("H"), array.array("B")
+            for points_first, points_second, winning_chance in prognosticate_bouts(pairs, fenced_to):
+                self.points_first.append(points_first)
+                self.points_second.append(points_second)
+                self.winning_chances.append(winning_chance)
+    def __getitem__(self, names):
+        """Returns the prognosis for one bout.
+
+        :Parameters:
+          - `names`: the names of the first and the second fencer
+
+        :type names: (unicode, unicode)
+
+        :Return:
+          - the expectation value of the first fencer, the points of the first
+            fencer, the points of the second fencer, and the winning
+            probability of the first fencer in percent
+
+        :rtype: float, int, int, int
+
+        :Exceptions:
+          - `KeyError`: if one of the fencers is not in the matrix
+        """
+        first_name, second_name = names
+        i = self.__indices[first_name] * len(self.names) + self.__indices[second_name]
+        return self.expectations[i], self.points_first[i], self.points_second[i], self.winning_chances[i]
+    def write_csv(self, csv_file):
+        """Writes the matrix as a CSV file with a header line.  Every further
+        line contains one bout: the names of the two fencers, the expectation
+        value of the first fencer, the most probable points of both fencers,
+        and the winning chance of the first fencer in percent.  The names are
+        encoded in UTF-8.  Bouts of fencers with themselves are left out.
+
+        :Parameters:
+          - `csv_file`: the file to write to.  It should be opened in binary
+            mode.
+
+        :type csv_file: file
+        """
+        writer = csv.writer(csv_file)
+        writer.writerow(["first fencer", "second fencer", "expectation", "points first", "points second",
+                         "winning chance"])
+        names = [name.encode("utf-8") for name in self.names]
+        number_of_fencers = len(names)
+        for i, first_name in enumerate(names):
+            for j, second_name in enumerate(names):
+                if i != j:
+                    k = i * number_of_fencers + j
+                    writer.writerow([first_name, second_name, "%.6f" % self.expectations[k], self.points_first[k],
+                                     self.points_second[k], self.winning_chances[k]])
+    def write_binary(self, binary_file):
+        """Writes the matrix in a compact binary format.  It starts with the
+        line "Felo prediction matrix" followed by the format version, a line
+        with the number N of fencers and the winning points, and N lines with
+        the names of the fencers in UTF-8.  Then, the flat arrays follow in
+        little-endian byte order: `expectations` as 64-bit floats,
+        `points_first` and `points_second` as unsigned 16-bit integers, and
+        `winning_chances` as unsigned bytes.  This way, they can be read
+        directly into arrays, e.g. with ``numpy.fromfile``.
+
+        :Parameters:
+          - `binary_file`: the file to write to.  It must be opened in binary
+            mode.
+
+        :type binary_file: file
+        """
+        binary_file.write("Felo prediction matrix %d\n%d %d\n" %
+                          (self.format_version, len(self.names), self.fenced_to))
+        for name in self.names:
+            binary_file.write(name.encode("utf-8") + "\n")
+        for values in (self.expectations, self.points_first, self.points_second, self.winning_chances):
+            if sys.byteorder == "big":
+                values = array.array(values.typecode, values)
+                values.byteswap()
+            values.tofile(binary_file)
+
+def simulate_bouts(random_state, probabilities, fenced_to):
+    """Simulates many bouts touch by touch.  Every touch is made by the first
+    fencer with the probability given by his expectation value, see
+    `expectation_value`, which is also the model of `OutcomeTable`.  This needs
+    NumPy.
+
+    :Parameters:
+      - `random_state`: the random number generator
+      - `probabilities`: the expectation values of the first fencers
+      - `fenced_to`: number of winning points in the bouts
+
+    :type random_state: numpy.random.RandomState
+    :type probabilities: numpy.ndarray
+    :type fenced_to: int
+
+    :Return:
+      - the points of the first fencers, the points of the second fencers
+
+    :rtype: numpy.ndarray, numpy.ndarray
+    """
+    # After 2n-1 touches, one fencer has certainly won, so I simulate that many
+    # and count only the touches until the bout was over.
+    touches = random_state.random_sample(probabilities.shape + (2 * fenced_to - 1,)) < \
+        probabilities[..., numpy.newaxis]
+    points_first = touches.cumsum(axis=-1) - touches
+    points_second = numpy.arange(2 * fenced_to - 1) - points_first
+    running = (points_first < fenced_to) & (points_second < fenced_to)
+    return (touches & running).sum(axis=-1), (~touches & running).sum(axis=-1)
+
+def tableau_order(size):
+    """Returns the seeds in the order of their places in a direct elimination
+    tableau, so that the best seeds meet as late as possible.  The best seed of
+    every bout comes first, so byes are always the second fencers.
+
+    :Parameters:
+      - `size`: the number of places in the tableau; must be a power of two
+
+    :type size: int
+
+    :Return:
+      - the seeds in the order of the tableau, counting from zero
+
+    :rtype: list of int
+    """
+    order = [0]
+    while len(order) < size:
+        order = [seed for seed in order for seed in (seed, 2 * len(order) - 1 - seed)]
+    return order
+
+def simulate_tournament_batch(arguments):
+    """Simulates a batch of tournaments, see `simulate_tournaments`.  This is
+    the task of the worker processes, therefore, all parameters are passed in
+    one tuple.
+
+    :Parameters:
+      - `arguments`: the Felo ratings of the fencers in the order of their
+        seeding, the size of the pools, the winning points of the pool bouts
+        and of the direct elimination bouts, the number of tournaments, the
+        random seed, and the index of the batch
+
+    :type arguments: tuple
+
+    :Return:
+      - how often every fencer reached every place.  The rows are the
+        fencers, the columns the places.
+
+    :rtype: numpy.ndarray
+    """
+    felo_ratings, pool_size, pool_fenced_to, elimination_fenced_to, number, seed, batch_index = arguments
+    random_state = numpy.random.RandomState([seed, batch_index])
+    felo_ratings = numpy.array(felo_ratings, dtype=float)
+    number_of_fencers = len(felo_ratings)
+    expectations = 1 / (1 + 10**((felo_ratings[numpy.newaxis, :] - felo_ratings[:, numpy.newaxis]) / 400.0))
+    simulations = numpy.arange(number)[:, numpy.newaxis]
+
+    # Pools, filled in serpentine order
+    number_of_pools = -(-number_of_fencers // pool_size)
+    pools = [[] for i in range(number_of_pools)]
+    for i in range(number_of_fencers):
+        row, column = divmod(i, number_of_pools)
+        pools[column if row % 2 == 0 else number_of_pools - 1 - column].append(i)
+    pairs = [(first, second) for pool in pools for first, second in itertools.combinations(pool, 2)]
+    first_fencers = numpy.array([first for first, __ in pairs], dtype=int)
+    second_fencers = numpy.array([second for __, second in pairs], dtype=int)
+    # With these, the results of the bouts are summed up per fencer.
+    first_incidence = numpy.zeros((len(pairs), number_of_fencers))
+    first_incidence[numpy.arange(len(pairs)), first_fencers] = 1
+    second_incidence = numpy.zeros((len(pairs), number_of_fencers))
+    second_incidence[numpy.arange(len(pairs)), second_fencers] = 1
+    points_first, points_second = simulate_bouts(
+        random_state, numpy.tile(expectations[first_fencers, second_fencers], (number, 1)), pool_fenced_to)
+    victories = numpy.dot(points_first > points_second, first_incidence) + \
+        numpy.dot(points_second > points_first, second_incidence)
+    touches_scored = numpy.dot(points_first, first_incidence) + numpy.dot(points_second, second_incidence)
+    touches_received = numpy.dot(points_second, first_incidence) + numpy.dot(points_first, second_incidence)
+    number_of_bouts = first_incidence.sum(axis=0) + second_incidence.sum(axis=0)
+    ratios = victories / numpy.maximum(number_of_bouts, 1)
+    # Ranking after the pools: victory ratio, indicator, touches scored, and
+    # finally the lot.
+    ranking = numpy.lexsort((random_state.random_sample((number, number_of_fencers)), -touches_scored,
+                             touches_received - touches_scored, -ratios), axis=-1)
+    seeds = numpy.empty_like(ranking)
+    seeds[simulations, ranking] = numpy.arange(number_of_fencers)
+
+    # Direct elimination
+    places = numpy.zeros((number, number_of_fencers), dtype=int)
+    size = 1
+    while size < number_of_fencers:
+        size *= 2
+    order = numpy.array(tableau_order(size))
+    tableau = numpy.where(order < number_of_fencers, ranking[:, numpy.minimum(order, number_of_fencers - 1)], -1)
+    while tableau.shape[1] > 1:
+        first_fencers, second_fencers = tableau[:, 0::2], tableau[:, 1::2]
+        bye = second_fencers < 0
+        probabilities = expectations[first_fencers, numpy.where(bye, first_fencers, second_fencers)]
+        # For the winner only, 2n-1 touches suffice again.
+        first_wins = bye | (random_state.binomial(2 * elimination_fenced_to - 1, probabilities) >=
+                            elimination_fenced_to)
+        winners = numpy.where(first_wins, first_fencers, second_fencers)
+        losers = numpy.where(first_wins, second_fencers, first_fencers)
+        remaining = winners.shape[1]
+        if remaining == 2:
+            # There is no bout for the third place.
+            losers_places = numpy.repeat(3, losers.size).reshape(losers.shape)
         else:
-            points_first -= 1
-    return points_first, points_second, int(round(winning_chance_first * 100))
+            # The losers of one round are ranked by their seeds.
+            loser_seeds = numpy.where(losers >= 0, seeds[simulations, numpy.maximum(losers, 0)], size)
+            losers_places = remaining + 1 + loser_seeds.argsort(axis=1).argsort(axis=1)
+        real = losers >= 0
+        places[numpy.broadcast_to(simulations, losers.shape)[real], losers[real]] = losers_places[real]
+        tableau = winners
+    places[simulations[:, 0], tableau[:, 0]] = 1
+    return numpy.bincount((numpy.arange(number_of_fencers) * number_of_fencers + places - 1).ravel(),
+                          minlength=number_of_fencers**2).reshape(number_of_fencers, number_of_fencers)
+
+def simulate_tournaments(fencers, number=10000, pool_size=7, pool_fenced_to=5, elimination_fenced_to=15, seed=0,
+                         processes=None, batch_size=1000):
+    """Simulates many tournaments with pools and a direct elimination tableau,
+    based on the current Felo ratings of the fencers.  The fencers are
+    distributed over the pools in the order of their seeding.  Everybody
+    advances to the direct elimination, seeded by the pool results, where
+    there is no bout for the third place.  The other losers of one round are
+    ranked by their seeds.
+
+    The tournaments are simulated in batches, each with a random generator of
+    its own which is seeded with `seed` and the index of the batch.  So the
+    result only depends on `seed` and `batch_size`, no matter how many
+    processes there are.  This needs NumPy.
+
+    :Parameters:
+      - `fencers`: the fencers of the tournament entry in the order of their
+        seeding
+      - `number`: the number of tournaments to simulate
+      - `pool_size`: the maximal number of fencers in one pool
+      - `pool_fenced_to`: winning points of the pool bouts
+      - `elimination_fenced_to`: winning points of the direct elimination
+        bouts
+      - `seed`: random seed
+      - `processes`: the maximal number of worker processes.  Default: the
+        number of CPUs
+      - `batch_size`: the number of tournaments simulated in one go
+
+    :type fencers: list of `Fencer`
+    :type number: int
+    :type pool_size: int
+    :type pool_fenced_to: int
+    :type elimination_fenced_to: int
+    :type seed: int
+    :type processes: int
+    :type batch_size: int
+
+    :Return:
+      - for every fencer name, how often the fencer reached every place.  The
+        first element of the list is the number of victories.
+
+    :rtype: dict mapping unicode to list of int
+
+    :Exceptions:
+      - `Error`: if NumPy is not installed
+    """
+    if numpy is None:
+        raise Error(_(u"The simulation of tournaments needs NumPy."))
+    felo_ratings = tuple(fencer.felo_rating_exact for fencer in fencers)
+    tasks = [(felo_ratings, pool_size, pool_fenced_to, elimination_fenced_to,
+              min(batch_size, number - batch_index * batch_size), seed, batch_index)
+             for batch_index in range(-(-number // batch_size))]
+    processes = min(processes or multiprocessing.cpu_count(), len(tasks))
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+    counts = numpy.zeros((len(fencers), len(fencers)), dtype=int)
+    try:
+        for batch_counts in (pool.imap_unordered(simulate_tournament_batch, tasks) if pool else
+                             itertools.imap(simulate_tournament_batch, tasks)):
+            counts += batch_counts
+        if pool:
+            pool.close()
+    except:
+        if pool:
+            pool.terminate()
+        raise
+    finally:
+        if pool:
+            pool.join()
+    return dict((fencer.name, fencer_counts) for fencer, fencer_counts in zip(fencers, counts.tolist()))
 
 if __name__ == '__main__':
     """If called as a program, it interprets the command line parameters and
@@ -1340,12 +4899,27 @@ if __name__ == '__main__':
     the result lists on the screen or writes them to a file.  It's a quick and
     simple way to calculate numbers, and it may be enough for many purposes.
     """
-    import sys, optparse
+    import sys, optparse, json
     option_parser = optparse.OptionParser()
     option_parser.add_option("-p", "--plots", action="store_true", dest="plots",
                              help=_(u"Generate plots with the Felo ratings"), default=False)
     option_parser.add_option("-b", "--bootstrap", action="store_true", dest="bootstrap",
                              help=_(u"Try to estimate good initial values for all fencers"), default=False)
+    option_parser.add_option("--accelerated", action="store_true", dest="accelerated",
+                             help=_(u"Accelerate the convergence of the bootstrapping; the estimates "
+                                    u"for freshmen may differ slightly"), default=False)
+    option_parser.add_option("--time-budget", type="float", dest="time_budget",
+                             help=_(u"Stop the bootstrapping after so many seconds and take the best result "
+                                    u"so far"), default=None, metavar=_(u"SECONDS"))
+    option_parser.add_option("--bootstrapping-log", type="string", dest="bootstrapping_log",
+                             help=_(u"Write a JSON line with the changes of the Felo ratings for every "
+                                    u"bootstrapping cycle into this file"), default=None, metavar=_(u"FILENAME"))
+    option_parser.add_option("--parallel", action="store_true", dest="parallel",
+                             help=_(u"Bootstrap independent groups of fencers in parallel processes"),
+                             default=False)
+    option_parser.add_option("--warm-start", action="store_true", dest="warm_start",
+                             help=_(u"Start the bootstrapping with the result of the previous one"),
+                             default=False)
     option_parser.add_option("--max-cycles", type="int",
                              dest="max_cycles", help=_(u"Maximal iteration steps during bootstrapping."
                                                        "  Default: 1000"),
@@ -1355,6 +4929,34 @@ if __name__ == '__main__':
     option_parser.add_option("--write-back", action="store_true", dest="write_back",
                              help=_(u"Write the new initial values back into the Felo file"),
                              default=False)
+    option_parser.add_option("--cache", action="store_true", dest="cache",
+                             help=_(u"Cache the parsed Felo files for subsequent runs"), default=False)
+    option_parser.add_option("--vectorized", action="store_true", dest="vectorized",
+                             help=_(u"Rate large bout sets with NumPy, if it is installed"), default=False)
+    option_parser.add_option("--snapshot", type="string", dest="snapshot_file",
+                             help=_(u"Continue from the rating state saved in this file, if possible, and "
+                                    u"save the new state in it"), default=None, metavar=_(u"FILENAME"))
+    option_parser.add_option("--snapshot-date", type="string", dest="snapshot_date",
+                             help=_(u"Save the rating state as of this date rather than the latest one"),
+                             default=None, metavar=_(u"YYYY-MM-DD"))
+    option_parser.add_option("--prediction-matrix", type="string", dest="prediction_matrix",
+                             help=_(u"Write the prognoses of all bouts between the fencers into this file, as CSV "
+                                    u"if its name ends with .csv, else in binary form"),
+                             default=None, metavar=_(u"FILENAME"))
+    option_parser.add_option("--simulate-tournaments", type="int", dest="simulated_tournaments",
+                             help=_(u"Simulate so many tournaments with pools and direct elimination and print "
+                                    u"the distribution of the places"), default=None, metavar=_(u"NUMBER"))
+    option_parser.add_option("--random-seed", type="int", dest="random_seed",
+                             help=_(u"Random seed for the simulated tournaments.  Default: 0"),
+                             default=0, metavar=_(u"NUMBER"))
+    option_parser.add_option("--entries", type="string", dest="entries",
+                             help=_(u"File with the names of the fencers for the prediction matrix or the "
+                                    u"simulated tournaments, one per line, in the order of their seeding.  "
+                                    u"Default: all fencers of the result list"),
+                             default=None, metavar=_(u"FILENAME"))
+    option_parser.add_option("--fenced-to", type="int", dest="fenced_to",
+                             help=_(u"Winning points of the bouts in the prediction matrix.  Default: 15"),
+                             default=15, metavar=_(u"NUMBER"))
     option_parser.add_option("--version", action="store_true", dest="version",
                              help=_(u"Print out version number and copying information"),
                              default=False)
@@ -1377,27 +4979,128 @@ There is NO WARRANTY, to the extent permitted by law.""")
     try:
         if options.estimate_freshmen and options.bootstrap:
             raise Error(_(u"You cannot bootstrap and estimate freshmen at the same time."))
+        if options.prediction_matrix and len(felo_filenames) > 1:
+            raise Error(_(u"A prediction matrix can only be calculated for one Felo file."))
         if options.output_file:
             output_file = codecs.open(options.output_file, "w")
         else:
             output_file = sys.stdout
+        if options.cache:
+            parsing_cache = ParsingCache()
+        warm_start = BootstrappingWarmStart() if options.warm_start else None
+        bootstrapping_log = open(options.bootstrapping_log, "w") if options.bootstrapping_log else None
+        checkpoints = None
+        if options.snapshot_file:
+            if len(felo_filenames) > 1:
+                raise Error(_(u"A snapshot can only be used with one Felo file."))
+            snapshot_date = None
+            if options.snapshot_date:
+                try:
+                    snapshot_date = datetime.datetime.strptime(options.snapshot_date, "%Y-%m-%d").date()
+                except ValueError:
+                    raise Error(_(u"Invalid snapshot date."))
+            checkpoints = RatingCheckpoints([snapshot_date] if snapshot_date else [])
+            if os.path.exists(options.snapshot_file):
+                snapshot_file = open(options.snapshot_file, "rb")
+                try:
+                    checkpoints.read(snapshot_file)
+                finally:
+                    snapshot_file.close()
         for i, felo_filename in enumerate(felo_filenames):
-            parameters, given_parameters, fencers, bouts = \
-                parse_felo_file(codecs.open(felo_filename, encoding="utf-8"))
-            resultslist, __ = calculate_felo_ratings(parameters, fencers, bouts, options.plots,
-                                                     options.estimate_freshmen,
-                                                     options.bootstrap, options.max_cycles)
+            felo_file = codecs.open(felo_filename, encoding="utf-8")
+            statistics = {}
+            if bootstrapping_log:
+                def bootstrapping_monitor(report, felo_filename=felo_filename):
+                    report["file"] = felo_filename
+                    bootstrapping_log.write(json.dumps(report) + "\n")
+            else:
+                bootstrapping_monitor = None
+            if options.cache:
+                parameters, given_parameters, fencers, bouts = parsing_cache.parse_felo_file(felo_file)
+                resultslist, __ = calculate_felo_ratings(parameters, fencers, bouts, options.plots,
+                                                         options.estimate_freshmen,
+                                                         options.bootstrap, options.max_cycles,
+                                                         checkpoints=checkpoints, vectorized=options.vectorized,
+                                                         accelerated=options.accelerated, statistics=statistics,
+                                                         warm_start=warm_start, parallel=options.parallel,
+                                                         time_budget=options.time_budget,
+                                                         bootstrapping_monitor=bootstrapping_monitor)
+            elif options.bootstrap or checkpoints is not None or options.vectorized:
+                parameters, given_parameters, fencers, bouts = parse_felo_file(felo_file)
+                resultslist, __ = calculate_felo_ratings(parameters, fencers, bouts, options.plots,
+                                                         options.estimate_freshmen,
+                                                         options.bootstrap, options.max_cycles,
+                                                         checkpoints=checkpoints, vectorized=options.vectorized,
+                                                         accelerated=options.accelerated, statistics=statistics,
+                                                         warm_start=warm_start, parallel=options.parallel,
+                                                         time_budget=options.time_budget,
+                                                         bootstrapping_monitor=bootstrapping_monitor)
+            else:
+                # Without bootstrapping, one pass suffices, so the bouts needn't
+                # be kept in memory.
+                parameters, fencers, resultslist, __ = \
+                    calculate_felo_ratings_from_file(felo_file, options.plots, options.estimate_freshmen)
+            felo_file.close()
+            if options.bootstrap:
+                print>>sys.stderr, "felo_rating:", (_(u"Bootstrapping took %d cycles.") %
+                                                    statistics["bootstrapping cycles"]).encode(preferred_encoding)
+                if statistics["bootstrapping residual"] >= parameters["threshold bootstrapping"]:
+                    print>>sys.stderr, "felo_rating:", \
+                        (_(u"The bootstrapping didn't converge.  The Felo ratings may still change by %g.") %
+                         statistics["bootstrapping residual"]).encode(preferred_encoding)
+            if checkpoints is not None and not options.bootstrap:
+                # Write to memory first so that the old snapshot survives errors.
+                snapshot = StringIO.StringIO()
+                checkpoints.write(snapshot, snapshot_date)
+                snapshot_file = open(options.snapshot_file, "wb")
+                try:
+                    snapshot_file.write(snapshot.getvalue())
+                finally:
+                    snapshot_file.close()
             if options.write_back and (options.bootstrap or options.estimate_freshmen):
                 for fencer in fencers.values():
                     if (options.bootstrap and not fencer.freshman) or \
                             (options.estimate_freshmen and fencer.freshman):
                         fencer.initial_felo_rating = fencer.felo_rating
                 write_back_fencers_to_file(felo_filename, fencers)
+            if options.entries:
+                entries = []
+                for line in codecs.open(options.entries, encoding="utf-8"):
+                    name = line.strip()
+                    if name:
+                        if name not in fencers:
+                            raise Error(_('Fencer "%s" is unknown.') % name)
+                        entries.append(fencers[name])
+            else:
+                entries = resultslist
+            if options.prediction_matrix:
+                prediction_matrix = PredictionMatrix(entries, options.fenced_to)
+                prediction_matrix_file = open(options.prediction_matrix, "wb")
+                try:
+                    if options.prediction_matrix.lower().endswith(".csv"):
+                        prediction_matrix.write_csv(prediction_matrix_file)
+                    else:
+                        prediction_matrix.write_binary(prediction_matrix_file)
+                finally:
+                    prediction_matrix_file.close()
             if len(felo_filenames) > 1:
                 if i >= 1: print>>output_file
                 print>>output_file, parameters["groupname"] + ":"
             for fencer in resultslist:
                 print>>output_file, "    " + fencer.name + (19-len(fencer.name))*" " + "\t" + \
                     unicode(fencer.felo_rating)
+            if options.simulated_tournaments:
+                places = simulate_tournaments(entries, options.simulated_tournaments, seed=options.random_seed)
+                print>>output_file
+                print>>output_file, _(u"Simulated tournaments:"), options.simulated_tournaments
+                print>>output_file, "    " + 19*" " + "\t" + _(u"mean place") + "\t" + _(u"1st") + "\t" + \
+                    _(u"top 3") + "\t" + _(u"top 8")
+                for fencer in entries:
+                    counts = places[fencer.name]
+                    mean_place = sum((i + 1) * count for i, count in enumerate(counts)) / float(sum(counts))
+                    print>>output_file, "    " + fencer.name + (19-len(fencer.name))*" " + "\t" + \
+                        u"%.1f\t%.1f%%\t%.1f%%\t%.1f%%" % \
+                        (mean_place, 100.0 * counts[0] / sum(counts), 100.0 * sum(counts[:3]) / sum(counts),
+                         100.0 * sum(counts[:8]) / sum(counts))
     except Error, e:
         print>>sys.stderr, "felo_rating:", e.description